@@ -153,7 +153,9 @@ def clear_candles_database_cache(authorization: Optional[str] = Header(None)):
         return authenticator.unauthorized_response()
 
     from jesse.services.cache import cache
+    from jesse.services.candles_cache import candles_cache
     cache.flush()
+    candles_cache.flush()
 
     return JSONResponse({
         'status': 'success',
@@ -209,6 +211,67 @@ def install_live(strict: bool) -> None:
     install(is_live_plugin_already_installed=jh.has_live_trade_plugin(), strict=strict)
 
 
+@cli.command()
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--exchange', required=True, help='The exchange of the candles, such as "Binance Perpetual Futures".')
+@click.option('--symbol', required=True, help='The symbol of the candles, such as "BTC-USDT".')
+@click.option(
+    '--on-conflict', type=click.Choice(['ignore', 'replace', 'error']), default='ignore',
+    help='What to do with the candles that already exist in the database.'
+)
+def import_candles_file(path: str, exchange: str, symbol: str, on_conflict: str) -> None:
+    """
+    Imports the 1m candles of a CSV (timestamp, open, close, high, low, volume) or .npy file.
+    """
+    jh.validate_cwd()
+
+    from jesse.services.db import database
+    from jesse.modes.import_candles_mode import import_candles_from_file
+
+    database.open_connection()
+    try:
+        count = import_candles_from_file(path, exchange, symbol, on_conflict)
+    finally:
+        database.close_connection()
+    print(f'Imported {count} candles of {exchange}-{symbol}')
+
+
+@cli.command()
+@click.argument('exchange')
+@click.argument('symbols', nargs=-1, required=True)
+@click.option('--start-date', required=True, help='The date to import the candles since, such as "2020-01-17".')
+def import_candles_batch(exchange: str, symbols: tuple, start_date: str) -> None:
+    """
+    Imports the candles of several symbols of an exchange until today. The symbols share the rate
+    limit of the exchange, and the days that are already imported are skipped.
+    """
+    jh.validate_cwd()
+
+    from jesse.modes.import_candles_mode import run_batch
+
+    print(run_batch('', exchange, list(symbols), start_date, running_via_dashboard=False, show_progressbar=True))
+
+
+@cli.command()
+@click.option('--exchange', default=None, help='Only roll up the candles of this exchange.')
+@click.option('--symbol', default=None, help='Only roll up the candles of this symbol.')
+def rollup_candles(exchange: Optional[str], symbol: Optional[str]) -> None:
+    """
+    Rolls up the 1m candles in the database into the candles of bigger timeframes. New candles are
+    rolled up as they're stored, hence it's only needed for the candles imported before that.
+    """
+    jh.validate_cwd()
+
+    from jesse.services.db import database
+    from jesse.services.candle import rollup_existing_candles
+
+    database.open_connection()
+    try:
+        rollup_existing_candles(exchange, symbol)
+    finally:
+        database.close_connection()
+
+
 @cli.command()
 def run() -> None:
     # Display welcome message
@@ -0,0 +1,91 @@
+"""
+Performance benchmarks of Jesse's hot paths. Each benchmark produces a JSON report which
+includes the environment (and the git commit) it was run in, so that the reports of
+different commits can be compared with compare_reports().
+"""
+import json
+import os
+import platform
+import subprocess
+from typing import List, Tuple, Union
+
+import numpy as np
+
+import jesse.helpers as jh
+
+
+def synthetic_candles(count: int, seed: int = 0) -> np.ndarray:
+    """
+    Generates 1m candles of a random walk. Unlike jesse.factories.range_candles() the
+    result only depends on the seed, so the datasets are the same across runs.
+    """
+    rng = np.random.RandomState(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, count)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.001, count))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.001, count))
+    volume = rng.uniform(1, 100, count)
+    timestamps = 1609459200000 + np.arange(count, dtype=np.float64) * 60_000
+    return np.column_stack((timestamps, open_, close, high, low, volume))
+
+
+def environment() -> dict:
+    import numba
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(__file__), capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        'created_at': jh.timestamp_to_time(jh.now_to_timestamp(force_fresh=True)),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'numba': numba.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def save_report(report: dict, path: str) -> None:
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _flatten(value: Union[dict, float], path: tuple = ()) -> dict:
+    if isinstance(value, dict):
+        flat = {}
+        for k, v in value.items():
+            flat.update(_flatten(v, path + (str(k),)))
+        return flat
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {path: value}
+    return {}
+
+
+def compare_reports(old: dict, new: dict) -> List[Tuple[str, float, float, float]]:
+    """
+    Compares the numbers of the "results" of two reports of the same benchmark and returns
+    (key, old, new, new / old) for each number that is in both, sorted by the ratio (descending).
+    """
+    old_results = _flatten(old['results'])
+    new_results = _flatten(new['results'])
+
+    rows = []
+    for path, old_value in old_results.items():
+        if path not in new_results:
+            continue
+        new_value = new_results[path]
+        ratio = new_value / old_value if old_value else np.nan
+        rows.append(('.'.join(path), old_value, new_value, ratio))
+
+    return sorted(rows, key=lambda row: -np.inf if np.isnan(row[3]) else row[3], reverse=True)
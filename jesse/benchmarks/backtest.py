@@ -0,0 +1,213 @@
+"""
+Benchmarks the throughput of jesse.research.backtest() end to end on a matrix of scenarios:
+the number of symbols, the timeframe of the routes, fast_mode and an order-light or
+order-heavy strategy. The candles are generated by jesse.research.fake_range_candles().
+
+Each scenario runs in a fresh process, so that its peak RSS (and the JIT compilations and
+caches it starts with) don't depend on the scenarios that ran before it. The time of the
+backtests is broken down into the phases of the simulation (see generate_phases_timing).
+Example:
+
+    python -m jesse.benchmarks.backtest --output backtest.json
+    python -m jesse.benchmarks.backtest --symbols 1 --timeframes 1m --compare backtest.json
+"""
+import argparse
+import itertools
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from jesse import utils
+from jesse.benchmarks import environment, save_report, load_report, compare_reports
+from jesse.strategies import Strategy
+
+DEFAULT_SYMBOLS_COUNTS = (1, 5, 20)
+DEFAULT_TIMEFRAMES = ('1m', '4h')
+DEFAULT_FAST_MODES = (False, True)
+EXCHANGE = 'Sandbox'
+COINS = (
+    'BTC', 'ETH', 'BNB', 'SOL', 'XRP', 'ADA', 'DOGE', 'TRX', 'DOT', 'LINK',
+    'AVAX', 'LTC', 'BCH', 'ATOM', 'XLM', 'NEAR', 'UNI', 'ETC', 'FIL', 'APT',
+)
+
+
+class OrderLight(Strategy):
+    """
+    Opens a position with a market order every 100 candles and closes it 50 candles later
+    """
+
+    def should_long(self) -> bool:
+        return self.index % 100 == 0
+
+    def go_long(self) -> None:
+        qty = utils.size_to_qty(self.balance / (2 * len(self.routes)), self.price)
+        self.buy = qty, self.price
+
+    def update_position(self) -> None:
+        if self.index - self.last_trade_index >= 50:
+            self.liquidate()
+
+    def should_cancel_entry(self) -> bool:
+        return True
+
+
+class OrderHeavy(Strategy):
+    """
+    Keeps two limit entry orders, and replaces the take-profit and stop-loss orders of the
+    position on every candle
+    """
+
+    def should_long(self) -> bool:
+        return True
+
+    def go_long(self) -> None:
+        qty = utils.size_to_qty(self.balance / (4 * len(self.routes)), self.price)
+        self.buy = [(qty, self.price - 0.5), (qty, self.price - 1)]
+
+    def update_position(self) -> None:
+        self.take_profit = self.position.qty, self.price + 2
+        self.stop_loss = self.position.qty, self.price - 20
+
+    def should_cancel_entry(self) -> bool:
+        return True
+
+
+STRATEGIES = {'light': OrderLight, 'heavy': OrderHeavy}
+
+
+def scenarios(
+        symbols_counts: List[int] = DEFAULT_SYMBOLS_COUNTS, timeframes: List[str] = DEFAULT_TIMEFRAMES,
+        fast_modes: List[bool] = DEFAULT_FAST_MODES, strategies: List[str] = tuple(STRATEGIES)
+) -> List[dict]:
+    return [
+        {
+            'name': f"{symbols_count}-symbols-{timeframe}-{'fast' if fast_mode else 'step'}-{strategy}",
+            'symbols': symbols_count,
+            'timeframe': timeframe,
+            'fast_mode': fast_mode,
+            'strategy': strategy,
+        }
+        for symbols_count, timeframe, fast_mode, strategy in itertools.product(
+            symbols_counts, timeframes, fast_modes, strategies
+        )
+    ]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def run_scenario(scenario: dict, days: int) -> dict:
+    """
+    Runs a single scenario in the current process
+    """
+    from jesse import research
+    import jesse.helpers as jh
+
+    if scenario['symbols'] > len(COINS):
+        raise ValueError(f'At most {len(COINS)} symbols are supported')
+
+    start = time.perf_counter()
+    count = days * 1440
+    symbols = [f'{coin}-USDT' for coin in COINS[:scenario['symbols']]]
+    candles = {
+        jh.key(EXCHANGE, symbol): {
+            'exchange': EXCHANGE,
+            'symbol': symbol,
+            'candles': research.fake_range_candles(count),
+        }
+        for symbol in symbols
+    }
+    routes = [
+        {'exchange': EXCHANGE, 'strategy': STRATEGIES[scenario['strategy']], 'symbol': symbol,
+         'timeframe': scenario['timeframe']}
+        for symbol in symbols
+    ]
+    config = {
+        'starting_balance': 10_000,
+        'fee': 0.0004,
+        'type': 'futures',
+        'futures_leverage': 2,
+        'futures_leverage_mode': 'cross',
+        'exchange': EXCHANGE,
+        'warm_up_candles': 0
+    }
+    prepare_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = research.backtest(
+        config, routes, [], candles, fast_mode=scenario['fast_mode'], generate_phases_timing=True
+    )
+    backtest_duration = time.perf_counter() - start
+
+    return {
+        **scenario,
+        'candles': count * len(symbols),
+        'seconds': {'prepare': prepare_duration, 'backtest': backtest_duration},
+        # the simulation's own breakdown of the backtest's time
+        'phases': result['phases_timing'],
+        'candles_per_second': count * len(symbols) / backtest_duration,
+        'peak_rss_mb': _peak_rss_mb(),
+        'trades': result['metrics']['total'],
+    }
+
+
+def run(scenarios_list: List[dict], days: int = 7, isolated: bool = True, verbose: bool = False) -> dict:
+    """
+    :param scenarios_list: see scenarios()
+    :param days: the length of the backtests
+    :param isolated: whether to run each scenario in a fresh process
+    """
+    results = {}
+    for scenario in scenarios_list:
+        if isolated:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                result = executor.submit(run_scenario, scenario, days).result()
+        else:
+            result = run_scenario(scenario, days)
+        results[scenario['name']] = result
+        if verbose:
+            print(
+                f"{scenario['name']}: {result['candles_per_second']:,.0f} candles/s, "
+                f"{result['seconds']['backtest']:.2f}s, {result['peak_rss_mb']:.0f} MB, {result['trades']} trades"
+            )
+
+    return {
+        'benchmark': 'backtest',
+        'environment': environment(),
+        'config': {'days': days, 'isolated': isolated},
+        'results': results,
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description='Benchmarks the throughput of backtests')
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--symbols', type=int, nargs='+', default=list(DEFAULT_SYMBOLS_COUNTS))
+    parser.add_argument('--timeframes', nargs='+', default=list(DEFAULT_TIMEFRAMES))
+    parser.add_argument('--modes', nargs='+', choices=['step', 'fast'], default=['step', 'fast'])
+    parser.add_argument('--strategies', nargs='+', choices=list(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument('--in-process', action='store_true', help='run all scenarios in the current process')
+    parser.add_argument('--output', help='path of the JSON report')
+    parser.add_argument('--compare', help='path of an earlier report to compare with')
+    args = parser.parse_args(argv)
+
+    scenarios_list = scenarios(args.symbols, args.timeframes, [mode == 'fast' for mode in args.modes], args.strategies)
+    report = run(scenarios_list, args.days, not args.in_process, verbose=True)
+
+    if args.output:
+        save_report(report, args.output)
+
+    if args.compare:
+        for key, old, new, ratio in compare_reports(load_report(args.compare), report):
+            if key.split('.')[-1] in ('candles_per_second', 'backtest', 'peak_rss_mb'):
+                print(f'{key}: {old:,.2f} -> {new:,.2f} ({ratio:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmarks every indicator of jesse.indicators with its default parameters on synthetic
+datasets of different sizes, both sequential and non-sequential.
+
+The first call of each indicator is timed separately as its "warmup" (which includes the
+JIT compilation, or the loading of numba's cache), and the rest are the median of the
+steady-state calls. Example:
+
+    python -m jesse.benchmarks.indicators --output indicators.json
+    python -m jesse.benchmarks.indicators --sizes 1000 100000 --compare indicators.json
+"""
+import argparse
+import inspect
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from jesse.benchmarks import synthetic_candles, environment, save_report, load_report, compare_reports
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+
+
+def indicator_functions() -> dict:
+    import jesse.indicators as ta
+
+    return {
+        name: func for name, func in vars(ta).items()
+        if not name.startswith('_') and inspect.isfunction(func)
+        and func.__module__.startswith('jesse.indicators.')
+    }
+
+
+def _arguments(func: Callable, candles: np.ndarray, other_candles: np.ndarray) -> list:
+    """
+    The positional arguments of the call. The indicators that compare two sets of candles
+    (such as beta) get a second dataset for their required ones.
+    """
+    args = [candles]
+    for parameter in list(inspect.signature(func).parameters.values())[1:]:
+        if parameter.default is not inspect.Parameter.empty or parameter.kind in (
+                parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD
+        ):
+            break
+        if 'candles' not in parameter.name:
+            raise TypeError(f'Cannot benchmark the required "{parameter.name}" parameter')
+        args.append(other_candles)
+    return args
+
+
+def _time(func: Callable, args: list, kwargs: dict, repeat: int) -> float:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        durations.append(time.perf_counter() - start)
+    return float(np.median(durations))
+
+
+def benchmark_indicator(
+        func: Callable, datasets: dict, repeat: int = 5, max_seconds: float = 10
+) -> dict:
+    """
+    :param func: the indicator
+    :param datasets: {size: (candles, other_candles)} sorted by size
+    :param repeat: the number of the steady-state calls of each measurement
+    :param max_seconds: the bigger datasets are skipped once a call is expected to take longer
+                        than this on them (extrapolating linearly from the size of the last one)
+
+    :return: dict - durations are in seconds
+    """
+    result = {'warmup': None, 'sequential': {}, 'non_sequential': {}, 'skipped': [], 'error': None}
+    modes = ['sequential', 'non_sequential'] if 'sequential' in inspect.signature(func).parameters else ['sequential']
+    slowest = 0
+    previous_size = None
+
+    for size, (candles, other_candles) in datasets.items():
+        if previous_size is not None and slowest * size / previous_size > max_seconds:
+            result['skipped'].append(size)
+            continue
+        previous_size = size
+        slowest = 0
+
+        try:
+            args = _arguments(func, candles, other_candles)
+            for mode in modes:
+                kwargs = {'sequential': mode == 'sequential'} if len(modes) == 2 else {}
+                if result['warmup'] is None:
+                    start = time.perf_counter()
+                    func(*args, **kwargs)
+                    result['warmup'] = time.perf_counter() - start
+                duration = _time(func, args, kwargs, 1)
+                if duration <= max_seconds and repeat > 1:
+                    duration = _time(func, args, kwargs, repeat)
+                result[mode][str(size)] = duration
+                slowest = max(slowest, duration)
+        except Exception as e:
+            result['error'] = f'{type(e).__name__}: {e}'
+            break
+
+    return result
+
+
+def run(
+        sizes: List[int] = DEFAULT_SIZES, repeat: int = 5, max_seconds: float = 10, names: List[str] = None,
+        seed: int = 0, verbose: bool = False
+) -> dict:
+    functions = indicator_functions()
+    if names:
+        unknown = set(names) - set(functions)
+        if unknown:
+            raise ValueError(f'Unknown indicators: {sorted(unknown)}')
+        functions = {name: functions[name] for name in names}
+
+    datasets = {
+        size: (synthetic_candles(size, seed), synthetic_candles(size, seed + 1)) for size in sorted(sizes)
+    }
+
+    results = {}
+    for name in sorted(functions):
+        results[name] = benchmark_indicator(functions[name], datasets, repeat, max_seconds)
+        if verbose:
+            print(name, results[name])
+
+    return {
+        'benchmark': 'indicators',
+        'environment': environment(),
+        'config': {'sizes': sorted(sizes), 'repeat': repeat, 'max_seconds': max_seconds, 'seed': seed},
+        'results': results,
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description='Benchmarks the indicators of jesse.indicators')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=10)
+    parser.add_argument('--indicators', nargs='+', help='only these indicators (all of them by default)')
+    parser.add_argument('--output', help='path of the JSON report')
+    parser.add_argument('--compare', help='path of an earlier report to compare with')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='ratio of the durations above which a comparison is reported as a regression')
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.repeat, args.max_seconds, args.indicators, verbose=True)
+
+    if args.output:
+        save_report(report, args.output)
+
+    errors = {name: r['error'] for name, r in report['results'].items() if r['error']}
+    for name, error in errors.items():
+        print(f'{name} failed: {error}')
+
+    if args.compare:
+        regressions = [row for row in compare_reports(load_report(args.compare), report) if row[3] > args.threshold]
+        for key, old, new, ratio in regressions:
+            print(f'{key}: {old:.6f}s -> {new:.6f}s ({ratio:.2f}x)')
+        print(f'{len(regressions)} regressions (above {args.threshold}x)')
+
+
+if __name__ == '__main__':
+    main()
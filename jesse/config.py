@@ -9,7 +9,9 @@ config = {
     # these values are related to the user's environment
     'env': {
         'caching': {
-            'driver': 'pickle'
+            'driver': 'pickle',
+            # the least recently used values are evicted when the cached files take more than this
+            'max_size_mb': 5120,
         },
 
         'logging': {
@@ -64,6 +66,16 @@ config = {
             'warmup_candles_num': 240,
             'generate_candles_from_1m': False,
             'persistency': True,
+            # Whether to hold the candles of optimization sessions in the compact layout (int64
+            # timestamps and float32 OHLCV) which takes 28 bytes per candle instead of 48.
+            'compact_candles': False,
+            # If set, backtests load their trading candles in windows of (at least) this many days
+            # while simulating, instead of all at once, and keep only what the warmup needs of the
+            # past ones. That bounds the memory of long backtests.
+            'streaming_window_days': None,
+            # The number of pages of candles that are fetched concurrently while importing. The
+            # requests are still spaced by the rate limit of the exchange.
+            'import_concurrency': 4,
         },
     },
 
@@ -119,6 +131,8 @@ def set_config(conf: dict) -> None:
         # objective function
         if 'objective_function' in conf:
             config['env']['optimization']['objective_function'] = conf['objective_function']
+        if 'compact_candles' in conf:
+            config['env']['data']['compact_candles'] = bool(conf['compact_candles'])
         # warm_up_candles
         config['env']['data']['warmup_candles_num'] = int(conf['warm_up_candles'])
         # number of trials per each hyperparameter
@@ -128,6 +142,8 @@ def set_config(conf: dict) -> None:
     if jh.is_backtesting() or jh.is_live():
         # warm_up_candles
         config['env']['data']['warmup_candles_num'] = int(conf['warm_up_candles'])
+        if jh.is_backtesting() and conf.get('streaming_window_days'):
+            config['env']['data']['streaming_window_days'] = float(conf['streaming_window_days'])
         # logs
         config['env']['logging'] = conf['logging']
         # exchanges
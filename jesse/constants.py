@@ -1,3 +1,5 @@
+import numpy as np
+
 from jesse.enums import timeframes
 
 
@@ -13,6 +15,18 @@ CANDLE_SOURCE_MAPPING = {
 }
 
 
+# the opt-in compact layout of candles (see jesse.helpers.compact_candles()): an int64 timestamp
+# and float32 OHLCV, which is 28 bytes per candle instead of the 48 of a float64 (n, 6) array
+COMPACT_CANDLES_DTYPE = np.dtype([
+    ('timestamp', np.int64),
+    ('open', np.float32),
+    ('close', np.float32),
+    ('high', np.float32),
+    ('low', np.float32),
+    ('volume', np.float32),
+])
+
+
 TIMEFRAME_PRIORITY = [
     timeframes.DAY_1,
     timeframes.HOUR_12,
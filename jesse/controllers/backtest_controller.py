@@ -38,7 +38,10 @@ def backtest(request_json: BacktestRequestJson, authorization: Optional[str] = H
         request_json.export_csv,
         request_json.export_json,
         request_json.fast_mode,
-        request_json.benchmark
+        request_json.benchmark,
+        request_json.event_mode,
+        request_json.phases_timing,
+        request_json.hooks_profile
     )
 
     return JSONResponse({'message': 'Started backtesting...'}, status_code=202)
@@ -4,7 +4,7 @@ from starlette.responses import JSONResponse
 
 from jesse.services import auth as authenticator
 from jesse.services.multiprocessing import process_manager
-from jesse.services.web import ImportCandlesRequestJson, CancelRequestJson, GetCandlesRequestJson, DeleteCandlesRequestJson
+from jesse.services.web import ImportCandlesRequestJson, ImportCandlesBatchRequestJson, CancelRequestJson, GetCandlesRequestJson, DeleteCandlesRequestJson
 import jesse.helpers as jh
 
 router = APIRouter(prefix="/candles", tags=["Candles"])
@@ -33,6 +33,29 @@ def import_candles(request_json: ImportCandlesRequestJson, authorization: Option
     return JSONResponse({'message': 'Started importing candles...'}, status_code=202)
 
 
+@router.post("/import-batch")
+def import_candles_batch(request_json: ImportCandlesBatchRequestJson, authorization: Optional[str] = Header(None)) -> JSONResponse:
+    """
+    Import candles for several symbols of an exchange in one process, under the rate limit of the exchange
+    """
+    jh.validate_cwd()
+
+    if not authenticator.is_valid_token(authorization):
+        return authenticator.unauthorized_response()
+
+    from jesse.modes import import_candles_mode
+
+    process_manager.add_task(
+        import_candles_mode.run_batch,
+        request_json.id,
+        request_json.exchange,
+        request_json.symbols,
+        request_json.start_date
+    )
+
+    return JSONResponse({'message': 'Started importing candles...'}, status_code=202)
+
+
 @router.post("/cancel-import")
 def cancel_import_candles(request_json: CancelRequestJson, authorization: Optional[str] = Header(None)):
     """
@@ -56,7 +79,9 @@ def clear_candles_database_cache(authorization: Optional[str] = Header(None)):
         return authenticator.unauthorized_response()
 
     from jesse.services.cache import cache
+    from jesse.services.candles_cache import candles_cache
     cache.flush()
+    candles_cache.flush()
 
     return JSONResponse({
         'status': 'success',
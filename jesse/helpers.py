@@ -15,6 +15,7 @@ import click
 import numpy as np
 import base64
 from jesse.constants import CANDLE_SOURCE_MAPPING
+from jesse.constants import COMPACT_CANDLES_DTYPE
 from jesse.constants import TIMEFRAME_PRIORITY
 from jesse.constants import SUPPORTED_COLORS
 from jesse.enums import timeframes
@@ -83,6 +84,26 @@ def color(msg_text: str, msg_color: str) -> str:
     raise ValueError('unsupported color')
 
 
+def compact_candles(candles: np.ndarray) -> np.ndarray:
+    """
+    Converts candles to the compact layout: a structured array with an int64 timestamp and
+    float32 OHLCV. It takes 28 bytes per candle instead of 48, at the cost of keeping about
+    7 significant digits of the prices and volumes. The indicators, research.backtest() and
+    the optimization accept compact candles as they are.
+    """
+    if is_compact_candles(candles):
+        return candles
+
+    # lets the indicators check their candles for compact ones from now on
+    from jesse.indicators import compact
+    compact.enable()
+
+    compacted = np.empty(len(candles), dtype=COMPACT_CANDLES_DTYPE)
+    for i, name in enumerate(COMPACT_CANDLES_DTYPE.names):
+        compacted[name] = candles[:, i]
+    return compacted
+
+
 def convert_number(old_max: float, old_min: float, new_max: float, new_min: float, old_value: float) -> float:
     """
     convert a number from one range (ex 40-119) to another
@@ -242,6 +263,27 @@ def estimate_PNL_percentage(qty: float, entry_price: float, exit_price: float, t
     return (profit / (qty * entry_price)) * 100
 
 
+def expand_candles(candles: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Converts compact candles (see compact_candles()) back to a float64 (n, 6) array. Other
+    candles are returned as they are, unless out is passed.
+
+    :param candles: np.ndarray
+    :param out: np.ndarray - an (n, 6) array to write the candles into (instead of a new one)
+    """
+    if not is_compact_candles(candles):
+        if out is None:
+            return candles
+        out[:] = candles
+        return out
+
+    if out is None:
+        out = np.empty((len(candles), 6))
+    for i, name in enumerate(COMPACT_CANDLES_DTYPE.names):
+        out[:, i] = candles[name]
+    return out
+
+
 def file_exists(path: str) -> bool:
     return os.path.isfile(path)
 
@@ -391,6 +433,10 @@ def is_backtesting() -> bool:
     return config['app']['trading_mode'] == 'backtest'
 
 
+def is_compact_candles(candles) -> bool:
+    return isinstance(candles, np.ndarray) and candles.dtype == COMPACT_CANDLES_DTYPE
+
+
 def is_debuggable(debug_item) -> bool:
     from jesse.config import config
     try:
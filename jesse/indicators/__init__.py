@@ -172,3 +172,31 @@ from .support_resistance_with_break import support_resistance_with_breaks
 from .squeeze_momentum import squeeze_momentum
 from .hull_suit import hull_suit
 from .volume import volume
+
+# accept compact candles, memoize the results of the indicators within each execution of the
+# strategy, and report their durations to the profiler of the strategy's hooks. Each of them is
+# opt-in, so while none is enabled the indicators are called directly after checking the flags.
+from functools import wraps as _wraps
+
+from . import compact as _compact
+from . import memoization as _memoization
+from jesse.services import hooks_profiler as _hooks_profiler
+
+
+def _wrap(indicator):
+    wrapped = _hooks_profiler.profile_indicator(
+        _memoization.memoize(_compact.accept_compact_candles(indicator))
+    )
+
+    @_wraps(indicator)
+    def decorated(*args, **kwargs):
+        if _hooks_profiler._active_profiler is None and not _memoization._is_enabled and not _compact._is_enabled:
+            return indicator(*args, **kwargs)
+        return wrapped(*args, **kwargs)
+
+    return decorated
+
+
+for _name, _indicator in list(globals().items()):
+    if callable(_indicator) and getattr(_indicator, '__module__', '').startswith(f'{__name__}.') and _name == _indicator.__name__:
+        globals()[_name] = _wrap(_indicator)
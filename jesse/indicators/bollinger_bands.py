@@ -16,7 +16,7 @@ def _moving_std_numba(source, period):
     n = len(source)
     result = np.empty(n, dtype=np.float64)
     # Fill the first period-1 entries with NaN
-    for i in range(period - 1):
+    for i in range(min(period - 1, n)):
         result[i] = np.nan
     # Calculate standard deviation for each window of 'period' elements
     for i in range(period - 1, n):
@@ -0,0 +1,70 @@
+"""
+Lets the indicators accept compact candles (see jesse.helpers.compact_candles()) in place of
+the float64 (n, 6) arrays they are written for. The compact candles are expanded right before
+the call; for the non-sequential calls only the last "warmup_candles_num" of them are, since
+that's all the indicators use. Calls with regular candles are passed through as they are.
+It's enabled by jesse.helpers.compact_candles(), since there can't be compact candles before
+it's called; until then, the indicators are not affected at all.
+"""
+import inspect
+from functools import wraps
+from typing import Callable
+
+import numpy as np
+
+import jesse.helpers as jh
+
+_is_enabled = False
+
+
+def enable() -> None:
+    global _is_enabled
+    _is_enabled = True
+
+
+def accept_compact_candles(indicator: Callable) -> Callable:
+    parameters = list(inspect.signature(indicator).parameters.values())
+    # such as "candles" and "candles_compare"
+    candles_parameters = [(i, p.name) for i, p in enumerate(parameters) if 'candles' in p.name]
+    names = [p.name for p in parameters]
+    # the indicators without a "sequential" parameter use all the candles
+    sequential_index = names.index('sequential') if 'sequential' in names else None
+    sequential_default = parameters[sequential_index].default if sequential_index is not None else True
+
+    @wraps(indicator)
+    def decorated(*args, **kwargs):
+        if not _is_enabled:
+            return indicator(*args, **kwargs)
+
+        for i, name in candles_parameters:
+            candles = args[i] if i < len(args) else kwargs.get(name)
+            # a cheap check first, since it runs on every call of every indicator
+            if isinstance(candles, np.ndarray) and candles.dtype.names is not None:
+                break
+        else:
+            return indicator(*args, **kwargs)
+
+        if sequential_index is None:
+            sequential = True
+        elif 'sequential' in kwargs:
+            sequential = kwargs['sequential']
+        elif len(args) > sequential_index:
+            sequential = args[sequential_index]
+        else:
+            sequential = sequential_default
+
+        args = list(args)
+        for i, name in candles_parameters:
+            if i < len(args):
+                args[i] = _expand(args[i], sequential)
+            elif name in kwargs:
+                kwargs[name] = _expand(kwargs[name], sequential)
+        return indicator(*args, **kwargs)
+
+    return decorated
+
+
+def _expand(candles: np.ndarray, sequential: bool) -> np.ndarray:
+    if not jh.is_compact_candles(candles):
+        return candles
+    return jh.expand_candles(jh.slice_candles(candles, sequential))
@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Union, List
 
 import numpy as np
 from numba import njit
@@ -26,13 +26,40 @@ def _ema(source: np.ndarray, period: int) -> np.ndarray:
         prev = current
     return result
 
-def ema(candles: np.ndarray, period: int = 5, source_type: str = "close", sequential: bool = False) -> Union[
-    float, np.ndarray]:
+
+@njit(cache=True)
+def _ema_batch(source: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """
+    Same as _ema() for several periods at once, computed in a single pass over the source.
+    Returns a 2D array with a row per period.
+    """
+    n = len(source)
+    count = len(periods)
+    result = np.full((count, n), np.nan)
+    prev = np.empty(count)
+    for k in range(count):
+        if n >= periods[k]:
+            prev[k] = np.mean(source[:periods[k]])
+            result[k, periods[k] - 1] = prev[k]
+    for i in range(n):
+        for k in range(count):
+            if i >= periods[k]:
+                alpha = 2 / (periods[k] + 1)
+                prev[k] = alpha * source[i] + (1 - alpha) * prev[k]
+                result[k, i] = prev[k]
+    return result
+
+
+def ema(candles: np.ndarray, period: Union[int, List[int], np.ndarray] = 5, source_type: str = "close",
+        sequential: bool = False) -> Union[float, np.ndarray]:
     """
     EMA - Exponential Moving Average using Numba for optimization
 
+    A list (or array) of periods returns the EMA of each of them, computed in one pass: a 2D array
+    with a row per period if sequential, otherwise an array of the last values.
+
     :param candles: np.ndarray
-    :param period: int - default: 5
+    :param period: int | list[int] - default: 5
     :param source_type: str - default: "close"
     :param sequential: bool - default: False
 
@@ -44,5 +71,9 @@ def ema(candles: np.ndarray, period: int = 5, source_type: str = "close", sequen
         candles = slice_candles(candles, sequential)
         source = get_candle_source(candles, source_type=source_type)
 
+    if np.ndim(period):
+        result = _ema_batch(source, np.asarray(period, dtype=np.int64))
+        return result if sequential else result[:, -1]
+
     result = _ema(source, period)
     return result if sequential else result[-1]
@@ -0,0 +1,92 @@
+"""
+Memoization of the indicators' results within a single strategy execution: strategies often
+call the same indicator with the same arguments from should_long(), go_long(), filters(),
+etc. It's only enabled while a strategy is executing, and the cache is cleared (and disabled)
+by Strategy._clear_cached_methods() at the end of each execution. Hence, outside strategies
+(such as in research scripts) the indicators are not affected at all.
+"""
+from functools import wraps
+from typing import Any, Callable
+
+import numpy as np
+
+_cache = {}
+_is_enabled = False
+stats = {'hits': 0, 'misses': 0}
+
+
+def enable() -> None:
+    global _is_enabled
+    _is_enabled = True
+
+
+def clear() -> None:
+    """
+    Clears the cache and disables it until enable() is called again
+    """
+    global _is_enabled
+    _is_enabled = False
+    _cache.clear()
+
+
+def reset() -> None:
+    """
+    Clears the cache and its hit/miss counters
+    """
+    clear()
+    stats['hits'] = 0
+    stats['misses'] = 0
+
+
+def _array_key(arr: np.ndarray) -> tuple:
+    # the identity of the memory plus the shape; the last row is included because it gets
+    # updated in place while it's forming (and the rows before it are complete)
+    if arr.size == 0:
+        return arr.ctypes.data, arr.shape
+    return arr.ctypes.data, arr.shape, arr.strides, arr[0].tobytes(), arr[-1].tobytes()
+
+
+def _to_key(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return _array_key(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_to_key(v) for v in value)
+    return value
+
+
+def _copy(value: Any) -> Any:
+    # callers are free to mutate the returned arrays, so the cached ones are never handed out
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    if isinstance(value, tuple) and any(isinstance(v, np.ndarray) for v in value):
+        values = [_copy(v) for v in value]
+        return type(value)(*values) if hasattr(value, '_fields') else tuple(values)
+    return value
+
+
+def memoize(indicator: Callable) -> Callable:
+    @wraps(indicator)
+    def decorated(*args, **kwargs):
+        if not _is_enabled:
+            return indicator(*args, **kwargs)
+
+        try:
+            key = (indicator, _to_key(args), _to_key(tuple(sorted(kwargs.items()))))
+            hash(key)
+        except TypeError:
+            # unhashable arguments
+            return indicator(*args, **kwargs)
+
+        try:
+            result = _cache[key]
+        except KeyError:
+            stats['misses'] += 1
+            result = indicator(*args, **kwargs)
+            # the arguments are kept alive with the entry, so their memory can't be reused by other arrays
+            _cache[key] = (_copy(result), args, kwargs)
+            return result
+
+        stats['hits'] += 1
+        return _copy(result[0])
+
+    return decorated
@@ -1,5 +1,5 @@
 import numpy as np
-from typing import Union
+from typing import Union, List
 from numba import njit
 
 from jesse.helpers import get_candle_source, slice_candles
@@ -60,7 +60,62 @@ def _rsi(p: np.ndarray, period: int) -> np.ndarray:
     return rsi_arr
 
 
-def rsi(candles: np.ndarray, period: int = 14, source_type: str = "close", sequential: bool = False) -> Union[float, np.ndarray]:
+@njit(cache=True)
+def _rsi_batch(p: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """
+    Same as _rsi() for several periods at once, computed in a single pass over the prices.
+    Returns a 2D array with a row per period.
+    """
+    n = len(p)
+    count = len(periods)
+    rsi_arr = np.full((count, n), np.nan)
+    if n < 2:
+        return rsi_arr
+
+    diff = np.empty(n - 1)
+    for i in range(n - 1):
+        diff[i] = p[i+1] - p[i]
+
+    avg_gain = np.zeros(count)
+    avg_loss = np.zeros(count)
+    for k in range(count):
+        period = periods[k]
+        if n < period + 1:
+            continue
+        sum_gain = 0.0
+        sum_loss = 0.0
+        for i in range(period):
+            change = diff[i]
+            if change > 0:
+                sum_gain += change
+            else:
+                sum_loss += -change
+        avg_gain[k] = sum_gain / period
+        avg_loss[k] = sum_loss / period
+        if avg_loss[k] == 0:
+            rsi_arr[k, period] = 100.0
+        else:
+            rsi_arr[k, period] = 100 - (100 / (1 + avg_gain[k] / avg_loss[k]))
+
+    for i in range(n - 1):
+        change = diff[i]
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        for k in range(count):
+            period = periods[k]
+            if i < period:
+                continue
+            avg_gain[k] = (avg_gain[k] * (period - 1) + gain) / period
+            avg_loss[k] = (avg_loss[k] * (period - 1) + loss) / period
+            if avg_loss[k] == 0:
+                rsi_arr[k, i+1] = 100.0
+            else:
+                rsi_arr[k, i+1] = 100 - (100 / (1 + avg_gain[k] / avg_loss[k]))
+    return rsi_arr
+
+
+def rsi(candles: np.ndarray, period: Union[int, List[int], np.ndarray] = 14, source_type: str = "close",
+        sequential: bool = False) -> Union[float, np.ndarray]:
     """
     RSI - 相对强弱指数 (使用Numba优化的高性能计算)
     RSI - Relative Strength Index using Numba for optimization
@@ -76,11 +131,11 @@ def rsi(candles: np.ndarray, period: int = 14, source_type: str = "close", seque
     5. RSI = 100 - (100 / (1 + RS))
 
     :param candles: np.ndarray - K线数据数组
-    :param period: int - 计算周期，默认: 14
+    :param period: int | list[int] - 计算周期，默认: 14 (多个周期时在一次遍历中全部计算)
     :param source_type: str - 数据源类型，默认: "close" (收盘价)
     :param sequential: bool - 是否返回完整序列，默认: False
 
-    :return: float | np.ndarray - RSI值或RSI序列
+    :return: float | np.ndarray - RSI值或RSI序列 (多个周期时: 每个周期一行的二维数组, 或各周期的最后值)
 
     交易信号解读:
     - RSI > 70: 超买区域，可能的卖出信号
@@ -95,5 +150,9 @@ def rsi(candles: np.ndarray, period: int = 14, source_type: str = "close", seque
         source = get_candle_source(candles, source_type=source_type)
 
     p = np.asarray(source, dtype=float)
+    if np.ndim(period):
+        result = _rsi_batch(p, np.asarray(period, dtype=np.int64))
+        return result if sequential else result[:, -1]
+
     result = _rsi(p, period)
     return result if sequential else result[-1]
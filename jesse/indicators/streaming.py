@@ -0,0 +1,324 @@
+"""
+Streaming indicators which keep their state between calls, so each call only advances
+over the candles that have been added since the previous one instead of recomputing
+the whole series.
+
+Strategies use them through Strategy.streaming(), which keeps one of them per route,
+indicator and parameters and advances all of them on every execution of the strategy:
+
+    @property
+    def fast(self):
+        return self.streaming(StreamingEMA, 8)
+
+They can also be created and updated directly, with the same (growing) candles on every call:
+
+    self.fast_ema = StreamingEMA(period=8)
+    self.fast_ema.update(self.candles)
+
+The returned value equals the last value of the indicator with sequential=True, which
+is computed over the whole history (not the last "warmup_candles_num" candles that the
+non-sequential call is limited to).
+
+The last candle is never committed to the state because it may still be forming (or be
+updated by a partial fill); it's committed once a newer candle is added. If the committed
+candles are rewritten, the state is recomputed from scratch using the indicator's kernel.
+"""
+from abc import ABC, abstractmethod
+from typing import Tuple
+
+import numpy as np
+from numba import njit
+
+from jesse.helpers import get_candle_source
+from jesse.indicators.atr import _atr
+from jesse.indicators.ema import _ema
+from jesse.indicators.supertrend import SuperTrend, atr_loop
+
+
+@njit(cache=True)
+def _ema_advance(prev: float, source: np.ndarray, period: int) -> float:
+    alpha = 2 / (period + 1)
+    for i in range(len(source)):
+        prev = alpha * source[i] + (1 - alpha) * prev
+    return prev
+
+
+@njit(cache=True)
+def _rsi_state(p: np.ndarray, period: int) -> Tuple[float, float]:
+    """
+    Same as _rsi() except that it returns the smoothed average gain and loss
+    at the last price, which is all that is needed to advance it.
+    """
+    n = len(p)
+    if n < period + 1:
+        return np.nan, np.nan
+
+    sum_gain = 0.0
+    sum_loss = 0.0
+    for i in range(period):
+        change = p[i + 1] - p[i]
+        if change > 0:
+            sum_gain += change
+        else:
+            sum_loss += -change
+    avg_gain = sum_gain / period
+    avg_loss = sum_loss / period
+
+    return _rsi_advance(avg_gain, avg_loss, p[period:], period)
+
+
+@njit(cache=True)
+def _rsi_advance(avg_gain: float, avg_loss: float, p: np.ndarray, period: int) -> Tuple[float, float]:
+    # p[0] is the last price that is already included in the averages
+    for i in range(len(p) - 1):
+        change = p[i + 1] - p[i]
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+    return avg_gain, avg_loss
+
+
+@njit(cache=True)
+def _atr_advance(prev: float, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> float:
+    # close[0] is the close of the last candle that is already included in prev
+    for i in range(1, len(close)):
+        hl = high[i] - low[i]
+        hc = abs(high[i] - close[i - 1])
+        lc = abs(low[i] - close[i - 1])
+        tr = max(max(hl, hc), lc)
+        prev = (prev * (period - 1) + tr) / period
+    return prev
+
+
+@njit(cache=True)
+def _supertrend_advance(
+        trend: float, changed: float, atr: float, upper_band: float, lower_band: float, candles: np.ndarray,
+        period: int, factor: float
+) -> Tuple[float, float, float, float, float]:
+    # the same recurrence as supertrend_fast(); candles[0] is the last candle that is already included
+    for i in range(1, len(candles)):
+        prev_close = candles[i - 1, 2]
+        hl = candles[i, 3] - candles[i, 4]
+        hc = abs(candles[i, 3] - prev_close)
+        lc = abs(candles[i, 4] - prev_close)
+        atr = (atr * (period - 1) + max(max(hl, hc), lc)) / period
+
+        mid = (candles[i, 3] + candles[i, 4]) / 2.0
+        upper_basic = mid + factor * atr
+        lower_basic = mid - factor * atr
+        was_upper = trend == upper_band
+
+        if prev_close > upper_band or upper_basic < upper_band:
+            upper_band = upper_basic
+        if prev_close < lower_band or lower_basic > lower_band:
+            lower_band = lower_basic
+
+        if was_upper:
+            if candles[i, 2] <= upper_band:
+                trend, changed = upper_band, 0.0
+            else:
+                trend, changed = lower_band, 1.0
+        else:
+            if candles[i, 2] >= lower_band:
+                trend, changed = lower_band, 0.0
+            else:
+                trend, changed = upper_band, 1.0
+    return trend, changed, atr, upper_band, lower_band
+
+
+class StreamingIndicator(ABC):
+    """
+    The base class of streaming indicators. Subclasses implement _recompute() which builds
+    the state from the committed candles, and _advance() which advances a state over the
+    passed candles (the first of them being the last committed one) and returns the new one.
+    """
+
+    def __init__(self, source_type: str = "close") -> None:
+        self.source_type = source_type
+        # the count of the committed candles, the timestamp of the first one and the last one of them
+        self._count = 0
+        self._first_timestamp = None
+        self._last_committed_candle = None
+        self._state = None
+
+    def reset(self) -> None:
+        self._count = 0
+        self._first_timestamp = None
+        self._last_committed_candle = None
+        self._state = None
+
+    def commit(self, candles: np.ndarray) -> None:
+        """
+        Advances the state over the candles that were closed since the previous call (all but
+        the last one, which may still be forming)
+
+        :param candles: np.ndarray - the same candles (growing over time) on every call
+        """
+        n = len(candles)
+        if n < 2:
+            self.reset()
+            return
+
+        if not self._is_in_sync(candles):
+            self._state = self._recompute(candles[:n - 1])
+        elif n - 1 > self._count:
+            self._state = self._advance(self._state, candles[self._count - 1:n - 1])
+
+        self._count = n - 1
+        self._first_timestamp = candles[0][0]
+        self._last_committed_candle = candles[n - 2].copy()
+
+    def update(self, candles: np.ndarray) -> float:
+        """
+        :param candles: np.ndarray - the same candles (growing over time) on every call
+
+        :return: float
+        """
+        if len(candles) == 0:
+            return np.nan
+
+        self.commit(candles)
+
+        if not self._is_ready(self._state):
+            # not enough candles for the state yet, so they are few enough to recompute the whole series
+            return self._value(self._recompute(candles))
+
+        return self._value(self._advance(self._state, candles[len(candles) - 2:]))
+
+    def _is_in_sync(self, candles: np.ndarray) -> bool:
+        # the candles must start at the same timestamp (and not be a window that moved on), be at least as
+        # many, and still contain the last committed candle at its place
+        if self._count == 0 or self._count > len(candles) - 1 or not self._is_ready(self._state):
+            return False
+        if candles[0][0] != self._first_timestamp:
+            return False
+
+        committed = candles[self._count - 1]
+        return committed[0] == self._last_committed_candle[0] and np.array_equal(committed, self._last_committed_candle)
+
+    def _is_ready(self, state) -> bool:
+        return state is not None and not np.isnan(state[0])
+
+    @abstractmethod
+    def _recompute(self, candles: np.ndarray):
+        pass
+
+    @abstractmethod
+    def _advance(self, state, candles: np.ndarray):
+        pass
+
+    def _value(self, state) -> float:
+        return state[0]
+
+    def _source(self, candles: np.ndarray) -> np.ndarray:
+        if len(candles.shape) == 1:
+            return candles
+        return get_candle_source(candles, source_type=self.source_type)
+
+
+class StreamingEMA(StreamingIndicator):
+    """
+    EMA - Exponential Moving Average
+
+    :param period: int - default: 5
+    :param source_type: str - default: "close"
+    """
+
+    def __init__(self, period: int = 5, source_type: str = "close") -> None:
+        super().__init__(source_type)
+        self.period = period
+
+    def _recompute(self, candles: np.ndarray):
+        if len(candles) == 0:
+            return None
+        return (_ema(self._source(candles), self.period)[-1],)
+
+    def _advance(self, state, candles: np.ndarray):
+        return (_ema_advance(state[0], self._source(candles)[1:], self.period),)
+
+
+class StreamingRSI(StreamingIndicator):
+    """
+    RSI - Relative Strength Index
+
+    :param period: int - default: 14
+    :param source_type: str - default: "close"
+    """
+
+    def __init__(self, period: int = 14, source_type: str = "close") -> None:
+        super().__init__(source_type)
+        self.period = period
+
+    def _recompute(self, candles: np.ndarray):
+        if len(candles) == 0:
+            return None
+        return _rsi_state(np.asarray(self._source(candles), dtype=float), self.period)
+
+    def _advance(self, state, candles: np.ndarray):
+        return _rsi_advance(state[0], state[1], np.asarray(self._source(candles), dtype=float), self.period)
+
+    def _value(self, state) -> float:
+        avg_gain, avg_loss = state
+        if np.isnan(avg_gain):
+            return np.nan
+        if avg_loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+class StreamingATR(StreamingIndicator):
+    """
+    ATR - Average True Range
+
+    :param period: int - default: 14
+    """
+
+    def __init__(self, period: int = 14) -> None:
+        super().__init__()
+        self.period = period
+
+    def _recompute(self, candles: np.ndarray):
+        if len(candles) == 0:
+            return None
+        return (_atr(candles[:, 3], candles[:, 4], candles[:, 2], self.period)[-1],)
+
+    def _advance(self, state, candles: np.ndarray):
+        return (_atr_advance(state[0], candles[:, 3], candles[:, 4], candles[:, 2], self.period),)
+
+
+class StreamingSupertrend(StreamingIndicator):
+    """
+    SuperTrend
+
+    :param period: int - default: 10
+    :param factor: float - default: 3
+    """
+
+    def __init__(self, period: int = 10, factor: float = 3) -> None:
+        super().__init__()
+        self.period = period
+        self.factor = factor
+
+    def _recompute(self, candles: np.ndarray):
+        # supertrend() needs at least "period" candles
+        if len(candles) < self.period:
+            return None
+        # the state at the first candle of the trend, from which it's advanced like in supertrend_fast()
+        head = candles[:self.period]
+        atr = atr_loop(head[:, 3], head[:, 4], head[:, 2], self.period)[-1]
+        mid = (head[-1, 3] + head[-1, 4]) / 2.0
+        upper_band = mid + self.factor * atr
+        lower_band = mid - self.factor * atr
+        trend = upper_band if head[-1, 2] <= upper_band else lower_band
+        return _supertrend_advance(
+            trend, 0.0, atr, upper_band, lower_band, candles[self.period - 1:], self.period, self.factor
+        )
+
+    def _advance(self, state, candles: np.ndarray):
+        return _supertrend_advance(*state, candles, self.period, self.factor)
+
+    def _value(self, state) -> SuperTrend:
+        if state is None:
+            return SuperTrend(np.nan, 0)
+        return SuperTrend(state[0], int(state[1]))
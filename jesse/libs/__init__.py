@@ -1 +1,2 @@
 from .dynamic_numpy_array import DynamicNumpyArray
+from .cursor_numpy_array import CursorNumpyArray
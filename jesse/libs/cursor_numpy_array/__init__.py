@@ -0,0 +1,41 @@
+import numpy as np
+
+from jesse.libs.dynamic_numpy_array import DynamicNumpyArray
+
+
+class CursorNumpyArray(DynamicNumpyArray):
+    """
+    Cursor Numpy Array
+
+    A DynamicNumpyArray that is backed by an already filled array (such as the
+    preloaded candles of a backtest) instead of an empty one. Appending writes the
+    item in place and moves the cursor forward, hence it never reallocates, and
+    slicing returns views of the backing array.
+    """
+
+    def __init__(self, array: np.ndarray, index: int = -1):
+        self.array = array
+        self.index = index
+        self.shape = array.shape
+        self.drop_at = None
+        self.max_size = None
+        self._start = 0
+
+    def _expand(self, count: int) -> None:
+        # past the end of the backing array: fall back to growing it like a DynamicNumpyArray
+        if self.index + count >= len(self.array):
+            self._grow(self.index + 1 + count)
+
+    def append(self, item: np.ndarray) -> None:
+        self._expand(1)
+        self.index += 1
+        self.array[self.index] = item
+
+    def append_multiple(self, items: np.ndarray) -> None:
+        self._expand(len(items))
+        self.index += len(items)
+        self.array[self.index - len(items) + 1: self.index + 1] = items
+
+    def flush(self) -> None:
+        # the backing array is kept; only the cursor is reset
+        self.index = -1
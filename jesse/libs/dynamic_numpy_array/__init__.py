@@ -1,25 +1,55 @@
 import numpy as np
 
-from jesse.helpers import np_shift
-
 
 class DynamicNumpyArray:
     """
     Dynamic Numpy Array
 
-    A data structure containing a numpy array which expands its memory
-    allocation every N number. Hence, it's both fast and dynamic.
+    A data structure containing a numpy array which doubles its memory
+    allocation whenever it's full. Hence, it's both fast and dynamic.
+
+    With max_size it's a circular buffer instead, which keeps the last max_size
+    items. Every item is stored twice (at i and i + max_size), so that appending is
+    O(1) and the items are always a contiguous view of the array, in order.
     """
 
-    def __init__(self, shape: tuple, drop_at: int = None):
+    def __init__(self, shape: tuple, drop_at: int = None, max_size: int = None):
         self.index = -1
-        self.array = np.zeros(shape)
-        self.bucket_size = shape[0]
         self.shape = shape
         self.drop_at = drop_at
+        self.max_size = max_size
+        # where the items start in the array (only moves in the circular mode)
+        self._start = 0
+        self.array = self._allocate(2 * max_size if max_size is not None else self._rows(shape))
+
+    def _rows(self, shape) -> int:
+        return shape if isinstance(shape, int) else shape[0]
+
+    def _allocate(self, rows: int) -> np.ndarray:
+        if isinstance(self.shape, int):
+            return np.zeros(rows)
+        return np.zeros((rows, *self.shape[1:]))
+
+    def _grow(self, rows: int) -> None:
+        # double the size (at least), so that appending is O(1) amortized
+        array = self._allocate(max(2 * len(self.array), rows, 1))
+        array[:len(self.array)] = self.array
+        self.array = array
+
+    def _drop(self, length: int) -> None:
+        # drop half of drop_at items from the beginning of the first length items, in place
+        shift_num = int(self.drop_at / 2)
+        keep = max(length - shift_num, 0)
+        self.array[:keep] = self.array[length - keep:length]
+        self.index -= shift_num
+
+    def _mirror(self, positions: np.ndarray) -> None:
+        # copy the items at the given positions of the array to their other copy
+        positions = self._start + positions
+        self.array[positions % self.max_size + (positions < self.max_size) * self.max_size] = self.array[positions]
 
     def __str__(self) -> str:
-        return str(self.array[:self.index + 1])
+        return str(self[:])
 
     def __len__(self) -> int:
         return self.index + 1
@@ -29,10 +59,12 @@ class DynamicNumpyArray:
             start = 0 if i.start is None else i.start
             stop = self.index + 1 if i.stop is None else i.stop
 
+            if start < 0:
+                start = max((self.index + 1) - abs(start), 0)
             if stop < 0:
                 stop = (self.index + 1) - abs(stop)
             stop = min(stop, self.index + 1)
-            return self.array[start:stop]
+            return self.array[self._start + start:self._start + max(stop, start):i.step]
         else:
             if i < 0:
                 i = (self.index + 1) - abs(i)
@@ -41,7 +73,7 @@ class DynamicNumpyArray:
             if self.index == -1 or i > self.index or i < 0:
                 raise IndexError(f'list assignment index out of range. self.index={self.index}, i={i}')
 
-            return self.array[i]
+            return self.array[self._start + i]
 
     def __setitem__(self, i, item) -> None:
         if isinstance(i, slice):
@@ -54,7 +86,15 @@ class DynamicNumpyArray:
                 stop = start + len(item)
             if stop < 0:
                 stop = (self.index + 1) - abs(stop)
-            self.array[slice(start, stop, step)] = item
+            if self.max_size is None:
+                self.array[slice(start, stop, step)] = item
+                return
+
+            # validation
+            if stop > self.index + 1:
+                raise IndexError('list assignment index out of range')
+            self[:][slice(start, stop, step)] = item
+            self._mirror(np.arange(self.index + 1)[slice(start, stop, step)])
             return
 
         if i < 0:
@@ -64,15 +104,28 @@ class DynamicNumpyArray:
         if i > self.index or i < 0:
             raise IndexError('list assignment index out of range')
 
-        self.array[i] = item
+        self.array[self._start + i] = item
+        if self.max_size is not None:
+            self._mirror(np.array([i]))
 
     def append(self, item: np.ndarray) -> None:
+        if self.max_size is not None:
+            if self.index + 1 == self.max_size:
+                # overwrite the oldest item
+                position = self._start
+                self._start = (self._start + 1) % self.max_size
+            else:
+                self.index += 1
+                position = (self._start + self.index) % self.max_size
+            self.array[position] = item
+            self.array[position + self.max_size] = item
+            return
+
         self.index += 1
 
-        # expand if the arr is almost full
-        if self.index != 0 and (self.index + 1) % self.bucket_size == 0:
-            new_bucket = np.zeros(self.shape)
-            self.array = np.concatenate((self.array, new_bucket), axis=0)
+        # expand if the arr is full
+        if self.index == len(self.array):
+            self._grow(self.index + 1)
 
         # drop N% of the beginning values to free memory
         if (
@@ -80,9 +133,7 @@ class DynamicNumpyArray:
             and self.index != 0
             and (self.index + 1) % self.drop_at == 0
         ):
-            shift_num = int(self.drop_at / 2)
-            self.index -= shift_num
-            self.array = np_shift(self.array, -shift_num)
+            self._drop(self.index)
 
         self.array[self.index] = item
 
@@ -91,7 +142,7 @@ class DynamicNumpyArray:
         if self.index == -1:
             raise IndexError('list assignment index out of range. array is empty which means no past item exists')
 
-        return self.array[self.index]
+        return self.array[self._start + self.index]
 
     def get_past_item(self, past_index) -> np.ndarray:
         # validation
@@ -101,26 +152,25 @@ class DynamicNumpyArray:
         if (self.index - past_index) < 0:
             raise IndexError(f'list assignment index out of range. Max allowed is self.index={self.index}, past_index={past_index}')
 
-        return self.array[self.index - past_index]
+        return self.array[self._start + self.index - past_index]
 
     def flush(self) -> None:
         self.index = -1
-        self.array = np.zeros(self.shape)
-        self.bucket_size = self.shape[0]
+        self._start = 0
+        self.array = self._allocate(2 * self.max_size if self.max_size is not None else self._rows(self.shape))
 
     def append_multiple(self, items: np.ndarray) -> None:
-        self.index += len(items)
+        if self.max_size is not None:
+            # only the last max_size items can be kept anyway
+            for item in items[-self.max_size:]:
+                self.append(item)
+            return
 
         # expand if the arr will be greater than the maximum
-        if self.index != 0 and (self.index + 1) >= len(self.array):
-            # in case the shape is smaller than  len(items)
-            if isinstance(self.shape, int):
-                shape = max(self.shape, len(items))
-            else:
-                shape = list(self.shape)
-                shape[0] = max(len(items), shape[0])
-            new_bucket = np.zeros(shape)
-            self.array = np.concatenate((self.array, new_bucket), axis=0)
+        if self.index + len(items) >= len(self.array):
+            self._grow(self.index + 1 + len(items))
+
+        self.index += len(items)
 
         # drop N% of the beginning values to free memory
         if (
@@ -128,18 +178,22 @@ class DynamicNumpyArray:
             and self.index != 0
             and (self.index + 1) % self.drop_at == 0
         ):
-            shift_num = int(self.drop_at / 2)
-            self.index -= shift_num
-            self.array = np_shift(self.array, -shift_num)
+            self._drop(self.index + 1 - len(items))
 
         self.array[self.index - len(items) + 1 : self.index + 1] = items
 
     def delete(self, index: int, axis=None) -> None:
-        self.array = np.delete(self.array, index, axis=axis)
+        """
+        Deletes the item at the index by moving the items after it, in place. The axis
+        is kept for backward compatibility; items are always deleted along the first axis.
+        """
+        if index < 0:
+            index = (self.index + 1) - abs(index)
+        items = self[:]
+        items[index:-1] = items[index + 1:]
+        if self.max_size is not None:
+            self._mirror(np.arange(index, self.index + 1))
+        else:
+            # the freed slot is zeroed like the rest of the unused allocation
+            self.array[self.index] = 0
         self.index -= 1
-        if self.array.shape[0] <= self.shape[0]:
-            new_bucket = np.zeros(self.shape)
-            self.array = np.concatenate((self.array, new_bucket), axis=0)
-
-
-
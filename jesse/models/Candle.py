@@ -1,5 +1,12 @@
+import io
+import os
+import struct
+from typing import Union
+
 import peewee
 from jesse.services.db import database
+from jesse.models.CandleCoverage import DAY, update_coverage
+from jesse.models.CandleRollup import ROLLUP_TIMEFRAMES, update_rollups
 import jesse.helpers as jh
 import numpy as np
 
@@ -51,7 +58,17 @@ if database.is_open():
 # # # # # # # # # # # # # # # # # # # # # # # # # # # 
 
 
+# the timestamp of the last candle that store_candle_into_db() stored, per exchange, symbol and timeframe
+_last_stored_timestamps = {}
+
+
 def store_candle_into_db(exchange: str, symbol: str, timeframe: str, candle: np.ndarray, on_conflict='ignore') -> None:
+    """
+    Stores a single candle, such as the forming candles of live sessions, which are stored again
+    on every update. Hence, the coverage, the rollups and the cached month of the candles are only
+    updated once a candle is closed (when the first candle after it is stored) instead of on
+    every update, and then only for the day and the rollups' candles that it completes.
+    """
     d = {
         'id': jh.generate_unique_id(),
         'exchange': exchange,
@@ -77,53 +94,244 @@ def store_candle_into_db(exchange: str, symbol: str, timeframe: str, candle: np.
     else:
         raise Exception(f'Unknown on_conflict value: {on_conflict}')
 
+    key = (exchange, symbol, timeframe)
+    previous = _last_stored_timestamps.get(key)
+    if previous == candle[0]:
+        # the forming candle is updated
+        return
+    if previous is not None and candle[0] < previous:
+        # an older candle is updated, which is rare, so whatever it's part of is updated right away
+        _on_candle_closed(exchange, symbol, timeframe, candle[0], None, on_conflict)
+        return
+
+    _last_stored_timestamps[key] = candle[0]
+    if previous is not None:
+        _on_candle_closed(exchange, symbol, timeframe, previous, candle[0], on_conflict)
+
+
+def _on_candle_closed(
+        exchange: str, symbol: str, timeframe: str, timestamp: int, next_timestamp: Union[int, None], on_conflict: str
+) -> None:
+    """
+    Updates the coverage of the day of the closed candle and the rollups of its bigger candles,
+    if the next candle (or None if it's unknown) is of another day or bucket
+    """
+    def is_last_of(duration: int) -> bool:
+        return next_timestamp is None or timestamp // duration != next_timestamp // duration
+
+    if is_last_of(DAY):
+        update_coverage(exchange, symbol, timeframe, timestamp, timestamp)
+    if timeframe != '1m':
+        return
+
+    # roll up the candles that this one completes
+    update_rollups(exchange, symbol, timestamp, timestamp, tuple(
+        t for t in ROLLUP_TIMEFRAMES if is_last_of(jh.timeframe_to_one_minutes(t) * 60_000)
+    ))
+    # the cached months know which candles are absent from the database (or have the previous ones)
+    from jesse.services.candles_cache import candles_cache
+    candles_cache.forget(exchange, symbol, timestamp, timestamp)
+
+
+_COPY_COLUMNS = ('id', 'timestamp', 'open', 'close', 'high', 'low', 'volume', 'exchange', 'symbol', 'timeframe')
+_COPY_SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
+# the number of candles of each COPY, which keeps the size of the buffer under ~20MB
+_COPY_CHUNK_SIZE = 200_000
+
+
+def _candles_to_copy_binary(exchange: str, symbol: str, timeframe: str, candles: np.ndarray) -> bytes:
+    """
+    Encodes the candles as the rows of the "candle" table in PostgreSQL's binary COPY format.
+    Every row has the same layout, hence they are all written at once as a numpy structured array.
+    """
+    texts = [(name, value.encode('utf-8')) for name, value in
+             (('exchange', exchange), ('symbol', symbol), ('timeframe', timeframe))]
+    dtype = [('fields', '>i2'), ('id_length', '>i4'), ('id', 'V16'), ('timestamp_length', '>i4'), ('timestamp', '>i8')]
+    for name in ('open', 'close', 'high', 'low', 'volume'):
+        dtype += [(f'{name}_length', '>i4'), (name, '>f8')]
+    for name, value in texts:
+        dtype += [(f'{name}_length', '>i4'), (name, f'S{len(value)}' if value else 'V0')]
+
+    rows = np.empty(len(candles), dtype=dtype)
+    rows['fields'] = len(_COPY_COLUMNS)
+    # random (version 4) UUIDs, the same as jh.generate_unique_id() but for all the rows at once
+    ids = np.frombuffer(os.urandom(16 * len(candles)), dtype=np.uint8).reshape(-1, 16).copy()
+    ids[:, 6] = (ids[:, 6] & 0x0f) | 0x40
+    ids[:, 8] = (ids[:, 8] & 0x3f) | 0x80
+    rows['id_length'] = 16
+    rows['id'] = ids.view('V16').ravel()
+    rows['timestamp_length'] = 8
+    rows['timestamp'] = candles[:, 0]
+    for i, name in enumerate(('open', 'close', 'high', 'low', 'volume'), start=1):
+        rows[f'{name}_length'] = 8
+        rows[name] = candles[:, i]
+    for name, value in texts:
+        rows[f'{name}_length'] = len(value)
+        if value:
+            rows[name] = value
+
+    header = _COPY_SIGNATURE + struct.pack('>ii', 0, 0)
+    trailer = struct.pack('>h', -1)
+    return header + rows.tobytes() + trailer
+
 
 def store_candles_into_db(exchange: str, symbol: str, timeframe: str, candles: np.ndarray, on_conflict='ignore') -> None:
+    """
+    Stores the candles using COPY, which is much faster than inserting them: the candles are
+    copied into a temporary table, and then merged into the "candle" table with on_conflict's
+    semantics ("error" copies them into the "candle" table directly). The coverage of the days
+    of the candles and the rollups of the 1m candles are updated in the same transaction, and
+    the cached months of the replaced 1m candles are removed from the candles' cache.
+    """
     # make sure the number of candles is more than 0
     if len(candles) == 0:
         raise Exception(f'No candles to store for {exchange}-{symbol}-{timeframe}')
+    if on_conflict not in ('ignore', 'replace', 'error'):
+        raise Exception(f'Unknown on_conflict value: {on_conflict}')
 
-    # convert candles to list of dicts
-    candles_list = []
-    for candle in candles:
-        d = {
-            'id': jh.generate_unique_id(),
-            'symbol': symbol,
-            'exchange': exchange,
-            'timestamp': candle[0],
-            'open': candle[1],
-            'high': candle[3],
-            'low': candle[4],
-            'close': candle[2],
-            'volume': candle[5],
-            'timeframe': timeframe,
-        }
-        candles_list.append(d)
+    candles = np.asarray(candles, dtype=np.float64)
+    if on_conflict == 'replace':
+        # a row can't be updated twice by the same statement, so keep the last candle of each timestamp
+        _, last_indexes = np.unique(candles[::-1, 0], return_index=True)
+        candles = candles[len(candles) - 1 - last_indexes]
 
-    if on_conflict == 'ignore':
-        Candle.insert_many(candles_list).on_conflict_ignore().execute()
-    elif on_conflict == 'replace':
-        Candle.insert_many(candles_list).on_conflict(
-            conflict_target=['exchange', 'symbol', 'timeframe', 'timestamp'],
-            preserve=(Candle.open, Candle.high, Candle.low, Candle.close, Candle.volume),
-        ).execute()
-    elif on_conflict == 'error':
-        Candle.insert_many(candles_list).execute()
+    columns = ', '.join(f'"{c}"' for c in _COPY_COLUMNS)
+    if on_conflict == 'error':
+        target = 'candle'
     else:
-        raise Exception(f'Unknown on_conflict value: {on_conflict}')
+        target = 'candle_staging'
+        if on_conflict == 'ignore':
+            action = 'DO NOTHING'
+        else:
+            action = 'DO UPDATE SET ' + ', '.join(
+                f'"{c}" = EXCLUDED."{c}"' for c in ('open', 'close', 'high', 'low', 'volume')
+            )
+        merge = (
+            f'INSERT INTO candle ({columns}) SELECT {columns} FROM candle_staging '
+            f'ON CONFLICT ("exchange", "symbol", "timeframe", "timestamp") {action}'
+        )
+
+    with database.db.atomic():
+        cursor = database.db.cursor()
+        if target == 'candle_staging':
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS candle_staging (LIKE candle) ON COMMIT DROP')
+        for i in range(0, len(candles), _COPY_CHUNK_SIZE):
+            data = _candles_to_copy_binary(exchange, symbol, timeframe, candles[i:i + _COPY_CHUNK_SIZE])
+            cursor.copy_expert(f'COPY {target} ({columns}) FROM STDIN WITH (FORMAT binary)', io.BytesIO(data))
+            if target == 'candle_staging':
+                cursor.execute(merge)
+                cursor.execute('TRUNCATE candle_staging')
+
+        update_coverage(exchange, symbol, timeframe, candles[:, 0].min(), candles[:, 0].max())
+        if timeframe == '1m':
+            update_rollups(exchange, symbol, candles[:, 0].min(), candles[:, 0].max())
+
+    # the cached months of the candles would keep their previous values, or keep the new ones absent
+    if timeframe == '1m':
+        from jesse.services.candles_cache import candles_cache
+        candles_cache.forget(exchange, symbol, candles[:, 0].min(), candles[:, 0].max())
+
+
+# the layout of a row of "COPY (SELECT timestamp, open, close, high, low, volume ...) TO STDOUT (FORMAT binary)"
+_COPY_ROW_DTYPE = np.dtype(
+    [('fields', '>i2'), ('timestamp_length', '>i4'), ('timestamp', '>i8')] +
+    [item for name in ('open', 'close', 'high', 'low', 'volume') for item in ((f'{name}_length', '>i4'), (name, '>f8'))]
+)
+# how much of the COPY's output is buffered before it's decoded into the candles
+_COPY_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+class _CopyCandlesWriter:
+    """
+    The file that the output of a binary COPY of candles is written to. Its rows are decoded
+    into a preallocated float64 (n, 6) array every few MBs, so they never become Python objects.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.candles = np.empty((capacity, 6))
+        self.count = 0
+        self._buffer = bytearray()
+        self._header_size = None
+
+    def write(self, data) -> None:
+        self._buffer += data
+        if len(self._buffer) >= _COPY_BUFFER_SIZE:
+            self._decode()
+
+    def _decode(self) -> None:
+        if self._header_size is None:
+            if len(self._buffer) < 19:
+                return
+            if bytes(self._buffer[:11]) != _COPY_SIGNATURE:
+                raise ValueError('Invalid binary COPY signature')
+            # the signature, the flags and the length of the header's extension
+            self._header_size = 19 + struct.unpack_from('>i', self._buffer, 15)[0]
+            del self._buffer[:self._header_size]
+
+        rows_count = len(self._buffer) // _COPY_ROW_DTYPE.itemsize
+        if rows_count == 0:
+            return
+        rows = np.frombuffer(self._buffer, dtype=_COPY_ROW_DTYPE, count=rows_count)
+        if (rows['fields'] != 6).any():
+            raise ValueError('Unexpected row in the binary COPY of candles')
+
+        if self.count + rows_count > len(self.candles):
+            candles = np.empty((max(2 * len(self.candles), self.count + rows_count), 6))
+            candles[:self.count] = self.candles[:self.count]
+            self.candles = candles
+        out = self.candles[self.count:self.count + rows_count]
+        out[:, 0] = rows['timestamp']
+        for i, name in enumerate(('open', 'close', 'high', 'low', 'volume'), start=1):
+            out[:, i] = rows[name]
+        self.count += rows_count
+
+        del rows
+        del self._buffer[:rows_count * _COPY_ROW_DTYPE.itemsize]
+
+    def result(self) -> np.ndarray:
+        self._decode()
+        # only the trailer of the COPY should be left
+        if bytes(self._buffer) != struct.pack('>h', -1):
+            raise ValueError('Incomplete binary COPY of candles')
+        if self.count == len(self.candles):
+            return self.candles
+        # don't keep the rest of the preallocated array alive
+        return self.candles[:self.count].copy()
+
+
+def fetch_candles_from_db(exchange: str, symbol: str, timeframe: str, start_date: int, finish_date: int) -> np.ndarray:
+    """
+    The candles of the range (inclusive) in the database as a float64 (n, 6) array. They are
+    streamed out of PostgreSQL with a binary COPY, instead of being selected as rows.
+    """
+    query = Candle.select(
+        Candle.timestamp, Candle.open, Candle.close, Candle.high, Candle.low,
+        Candle.volume
+    ).where(
+        Candle.exchange == exchange,
+        Candle.symbol == symbol,
+        Candle.timeframe == timeframe,
+        Candle.timestamp.between(start_date, finish_date)
+    ).order_by(Candle.timestamp.asc())
+
+    # there's at most one candle per timeframe of the range
+    capacity = max((int(finish_date) - int(start_date)) // (jh.timeframe_to_one_minutes(timeframe) * 60_000) + 1, 0)
+    return copy_candles_query_into_numpy(query, capacity)
+
+
+def copy_candles_query_into_numpy(query: peewee.Query, capacity: int) -> np.ndarray:
+    """
+    Runs a query that selects the timestamp, open, close, high, low and volume columns (in this
+    order) with a binary COPY, and returns its rows as a float64 (n, 6) array.
+
+    :param capacity: the expected number of rows, for preallocating the array
+    """
+    writer = _CopyCandlesWriter(min(capacity, 1_000_000))
 
+    cursor = database.db.cursor()
+    sql, params = query.sql()
+    # COPY doesn't take parameters, hence they're bound on the client
+    sql = cursor.mogrify(sql, params).decode()
+    cursor.copy_expert(f'COPY ({sql}) TO STDOUT WITH (FORMAT binary)', writer)
 
-def fetch_candles_from_db(exchange: str, symbol: str, timeframe: str, start_date: int, finish_date: int) -> tuple:
-    res = tuple(
-        Candle.select(
-            Candle.timestamp, Candle.open, Candle.close, Candle.high, Candle.low,
-            Candle.volume
-        ).where(
-            Candle.exchange == exchange,
-            Candle.symbol == symbol,
-            Candle.timeframe == timeframe,
-            Candle.timestamp.between(start_date, finish_date)
-        ).order_by(Candle.timestamp.asc()).tuples()
-    )
-
-    return res
+    return writer.result()
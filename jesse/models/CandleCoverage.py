@@ -0,0 +1,117 @@
+import peewee
+from jesse.services.db import database
+
+
+if database.is_closed():
+    database.open_connection()
+
+
+class CandleCoverage(peewee.Model):
+    """
+    The number of candles of each day in the Candle table, per exchange, symbol and timeframe.
+    It's updated whenever candles are stored, so that which days are already imported (and the
+    range of the imported candles) is read in one query instead of being counted in the Candle table.
+    """
+    id = peewee.AutoField()
+    exchange = peewee.CharField()
+    symbol = peewee.CharField()
+    timeframe = peewee.CharField()
+    # the timestamp of the beginning of the day
+    day = peewee.BigIntegerField()
+    count = peewee.IntegerField()
+
+    class Meta:
+        from jesse.services.db import database
+
+        database = database.db
+        table_name = 'candle_coverage'
+        indexes = (
+            (('exchange', 'symbol', 'timeframe', 'day'), True),
+        )
+
+    def __init__(self, attributes: dict = None, **kwargs) -> None:
+        peewee.Model.__init__(self, attributes=attributes, **kwargs)
+
+        if attributes is None:
+            attributes = {}
+
+        for a, value in attributes.items():
+            setattr(self, a, value)
+
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # #
+# # # # # # # # # DB FUNCTIONS # # # # # # # # #
+# # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+
+DAY = 86_400_000
+
+
+def update_coverage(exchange: str, symbol: str, timeframe: str, start_date: int, finish_date: int) -> None:
+    """
+    Recounts the candles of the days that overlap the range
+    """
+    database.db.execute_sql(
+        'INSERT INTO candle_coverage ("exchange", "symbol", "timeframe", "day", "count") '
+        'SELECT %s, %s, %s, "timestamp" - "timestamp" %% %s AS day, count(*) FROM candle '
+        'WHERE "exchange" = %s AND "symbol" = %s AND "timeframe" = %s AND "timestamp" BETWEEN %s AND %s '
+        'GROUP BY day '
+        'ON CONFLICT ("exchange", "symbol", "timeframe", "day") DO UPDATE SET "count" = EXCLUDED."count"',
+        [
+            exchange, symbol, timeframe, DAY, exchange, symbol, timeframe,
+            int(start_date) - int(start_date) % DAY, int(finish_date) - int(finish_date) % DAY + DAY - 1,
+        ]
+    )
+
+
+def rebuild_coverage() -> None:
+    """
+    Counts all the candles in the database, such as the ones that were stored before the coverage existed
+    """
+    database.db.execute_sql(
+        'INSERT INTO candle_coverage ("exchange", "symbol", "timeframe", "day", "count") '
+        'SELECT "exchange", "symbol", "timeframe", "timestamp" - "timestamp" %% %s AS day, count(*) FROM candle '
+        'WHERE "timeframe" IS NOT NULL '
+        'GROUP BY "exchange", "symbol", "timeframe", day '
+        'ON CONFLICT ("exchange", "symbol", "timeframe", "day") DO UPDATE SET "count" = EXCLUDED."count"',
+        [DAY]
+    )
+
+
+def fetch_coverage(exchange: str, symbol: str, timeframe: str, start_date: int, finish_date: int) -> dict:
+    """
+    The number of candles of each day that overlaps the range, keyed by the timestamp of the
+    day. The days without any candles are missing.
+    """
+    query = CandleCoverage.select(CandleCoverage.day, CandleCoverage.count).where(
+        CandleCoverage.exchange == exchange,
+        CandleCoverage.symbol == symbol,
+        CandleCoverage.timeframe == timeframe,
+        CandleCoverage.day.between(int(start_date) - int(start_date) % DAY, finish_date),
+        CandleCoverage.count > 0
+    ).tuples()
+    return dict(query)
+
+
+def fetch_coverage_ranges() -> list:
+    """
+    The first and the last days of the candles of each exchange and symbol (of any timeframe),
+    as a list of (exchange, symbol, first_day, last_day) tuples
+    """
+    return list(
+        CandleCoverage.select(
+            CandleCoverage.exchange, CandleCoverage.symbol,
+            peewee.fn.MIN(CandleCoverage.day), peewee.fn.MAX(CandleCoverage.day)
+        ).where(
+            CandleCoverage.count > 0
+        ).group_by(
+            CandleCoverage.exchange, CandleCoverage.symbol
+        ).order_by(
+            CandleCoverage.exchange, CandleCoverage.symbol
+        ).tuples()
+    )
+
+
+# if database is open, create the table (the candles that are already there are counted by the migrations)
+if database.is_open():
+    CandleCoverage.create_table()
@@ -0,0 +1,126 @@
+import peewee
+from jesse.services.db import database
+import jesse.helpers as jh
+import numpy as np
+
+
+if database.is_closed():
+    database.open_connection()
+
+
+# the timeframes that the 1m candles are rolled up into
+ROLLUP_TIMEFRAMES = ('5m', '15m', '1h', '4h', '1D')
+
+
+class CandleRollup(peewee.Model):
+    """
+    The candles of bigger timeframes, rolled up from the (complete) 1m candles of the Candle
+    table, so that reading them doesn't need reading all of their 1m candles.
+    """
+    id = peewee.UUIDField(primary_key=True)
+    timestamp = peewee.BigIntegerField()
+    open = peewee.FloatField()
+    close = peewee.FloatField()
+    high = peewee.FloatField()
+    low = peewee.FloatField()
+    volume = peewee.FloatField()
+    exchange = peewee.CharField()
+    symbol = peewee.CharField()
+    timeframe = peewee.CharField()
+
+    class Meta:
+        from jesse.services.db import database
+
+        database = database.db
+        table_name = 'candle_rollup'
+        indexes = (
+            (('exchange', 'symbol', 'timeframe', 'timestamp'), True),
+        )
+
+    def __init__(self, attributes: dict = None, **kwargs) -> None:
+        peewee.Model.__init__(self, attributes=attributes, **kwargs)
+
+        if attributes is None:
+            attributes = {}
+
+        for a, value in attributes.items():
+            setattr(self, a, value)
+
+
+# if database is open, create the table
+if database.is_open():
+    CandleRollup.create_table()
+
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # #
+# # # # # # # # # DB FUNCTIONS # # # # # # # # #
+# # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+
+def rollup_timeframe_for(timeframe: str):
+    """
+    The biggest rollup timeframe that the candles of the timeframe can be generated from,
+    or None if there's none (such as for 1m or 3m)
+    """
+    minutes = jh.timeframe_to_one_minutes(timeframe)
+    suitable = [t for t in ROLLUP_TIMEFRAMES if minutes % jh.timeframe_to_one_minutes(t) == 0]
+    return max(suitable, key=jh.timeframe_to_one_minutes) if suitable else None
+
+
+def update_rollups(exchange: str, symbol: str, start_date: int, finish_date: int, timeframes: tuple = ROLLUP_TIMEFRAMES) -> None:
+    """
+    Rolls up the 1m candles into the candles of the timeframes that overlap the range, in the
+    database itself. Only the candles whose 1m candles are all in the database are rolled up.
+    """
+    if not timeframes:
+        return
+
+    selects = []
+    params = []
+    for timeframe in timeframes:
+        duration = jh.timeframe_to_one_minutes(timeframe) * 60_000
+        selects.append(
+            # the id is derived from the candle, so that it stays the same when it's updated
+            'SELECT md5(%s || \'|\' || %s || \'|\' || %s || \'|\' || bucket)::uuid, bucket, '
+            '(array_agg("open" ORDER BY "timestamp"))[1], (array_agg("close" ORDER BY "timestamp" DESC))[1], '
+            'max("high"), min("low"), sum("volume"), %s, %s, %s '
+            'FROM (SELECT *, "timestamp" - "timestamp" %% %s AS bucket FROM candle '
+            'WHERE "exchange" = %s AND "symbol" = %s AND "timeframe" = \'1m\' AND "timestamp" BETWEEN %s AND %s) AS c '
+            'GROUP BY bucket HAVING count(*) = %s'
+        )
+        params += [
+            exchange, symbol, timeframe, exchange, symbol, timeframe, duration, exchange, symbol,
+            # the whole candles that the range overlaps
+            int(start_date) - int(start_date) % duration,
+            int(finish_date) - int(finish_date) % duration + duration - 60_000,
+            duration // 60_000,
+        ]
+
+    database.db.execute_sql(
+        'INSERT INTO candle_rollup ("id", "timestamp", "open", "close", "high", "low", "volume", "exchange", '
+        '"symbol", "timeframe") ' + ' UNION ALL '.join(selects) + ' '
+        'ON CONFLICT ("exchange", "symbol", "timeframe", "timestamp") DO UPDATE SET '
+        '"open" = EXCLUDED."open", "close" = EXCLUDED."close", "high" = EXCLUDED."high", '
+        '"low" = EXCLUDED."low", "volume" = EXCLUDED."volume"',
+        params
+    )
+
+
+def fetch_rollups_from_db(exchange: str, symbol: str, timeframe: str, start_date: int, finish_date: int) -> np.ndarray:
+    """
+    The rolled up candles of the timeframe that start within the range (inclusive), as a float64 (n, 6) array
+    """
+    from jesse.models.Candle import copy_candles_query_into_numpy
+
+    query = CandleRollup.select(
+        CandleRollup.timestamp, CandleRollup.open, CandleRollup.close, CandleRollup.high, CandleRollup.low,
+        CandleRollup.volume
+    ).where(
+        CandleRollup.exchange == exchange,
+        CandleRollup.symbol == symbol,
+        CandleRollup.timeframe == timeframe,
+        CandleRollup.timestamp.between(start_date, finish_date)
+    ).order_by(CandleRollup.timestamp.asc())
+
+    capacity = max((int(finish_date) - int(start_date)) // (jh.timeframe_to_one_minutes(timeframe) * 60_000) + 1, 0)
+    return copy_candles_query_into_numpy(query, capacity)
@@ -1,4 +1,6 @@
 from .Candle import Candle
+from .CandleCoverage import CandleCoverage
+from .CandleRollup import CandleRollup
 from .ClosedTrade import ClosedTrade
 from .Exchange import Exchange
 from .FuturesExchange import FuturesExchange
@@ -1,6 +1,6 @@
 import time
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple, Union
 import numpy as np
 import jesse.helpers as jh
 import jesse.services.metrics as stats
@@ -8,13 +8,18 @@ import jesse.services.selectors as selectors
 from jesse import exceptions
 from jesse.config import config
 from jesse.enums import timeframes, order_types
+from jesse.indicators import memoization as indicators_memoization
 from jesse.models import Order, Position
 from jesse.modes.utils import save_daily_portfolio_balance
 from jesse.routes import router
 from jesse.services import charts
 from jesse.services import report
-from jesse.services.candle import generate_candle_from_one_minutes, print_candle, candle_includes_price, split_candle, \
-    get_candles, inject_warmup_candles_to_store
+from jesse.services.candle import generate_candle_from_one_minutes, print_candle, candle_includes_price, \
+    get_candles, inject_warmup_candles_to_store, generate_bigger_timeframe_candles
+from jesse.services.candles_stream import CandlesStream
+from jesse.services.fill_engine import find_next_fill, sort_execution_orders
+from jesse.services.phase_timer import phase_timer
+from jesse.services.hooks_profiler import HooksProfiler
 from jesse.services.file import store_logs
 from jesse.services.validators import validate_routes
 from jesse.store import store
@@ -42,7 +47,10 @@ def run(
         csv: bool = False,
         json: bool = False,
         fast_mode: bool = False,
-        benchmark: bool = False
+        benchmark: bool = False,
+        event_mode: bool = False,
+        phases_timing: bool = False,
+        hooks_profile: bool = False
 ) -> None:
     if not jh.is_unit_testing():
         # at every second, we check to see if it's time to execute stuff
@@ -65,7 +73,7 @@ def run(
 
     _execute_backtest(
         client_id, debug_mode, user_config, exchange, routes, data_routes, start_date, finish_date, candles, chart,
-        tradingview, csv, json, fast_mode, benchmark
+        tradingview, csv, json, fast_mode, benchmark, event_mode, phases_timing, hooks_profile
     )
 
 
@@ -84,7 +92,10 @@ def _execute_backtest(
         csv: bool = False,
         json: bool = False,
         fast_mode: bool = False,
-        benchmark: bool = False
+        benchmark: bool = False,
+        event_mode: bool = False,
+        phases_timing: bool = False,
+        hooks_profile: bool = False
 ):
     """
     Executes the backtest that has been initiated from within the dashboard. The purpose of extracting these
@@ -115,10 +126,18 @@ def _execute_backtest(
     # load historical candles
     if candles is None:
         try:
-            warmup_candles, candles = load_candles(
-                jh.date_to_timestamp(start_date),
-                jh.date_to_timestamp(finish_date)
-            )
+            streaming_window_days = jh.get_config('env.data.streaming_window_days', None)
+            if streaming_window_days:
+                # the trading candles are loaded window by window during the simulation
+                candles = CandlesStream(
+                    jh.date_to_timestamp(start_date), jh.date_to_timestamp(finish_date), streaming_window_days
+                )
+                warmup_candles = candles.load_warmup_candles()
+            else:
+                warmup_candles, candles = load_candles(
+                    jh.date_to_timestamp(start_date),
+                    jh.date_to_timestamp(finish_date)
+                )
             _handle_warmup_candles(warmup_candles, start_date)
         except exceptions.CandlesNotFound as e:
             # Extract symbol and exchange from error message
@@ -140,8 +159,14 @@ def _execute_backtest(
             'debug_mode': str(config['app']['debug_mode']),
         })
         # candles info
-        key = f"{config['app']['considering_candles'][0][0]}-{config['app']['considering_candles'][0][1]}"
-        sync_publish('candles_info', stats.candles_info(candles[key]['candles']))
+        if isinstance(candles, CandlesStream):
+            # candles_info() only needs the timestamps of the first and the last candles
+            sync_publish('candles_info', stats.candles_info(
+                np.array([[candles.first_timestamp], [candles.last_timestamp]])
+            ))
+        else:
+            key = f"{config['app']['considering_candles'][0][0]}-{config['app']['considering_candles'][0][1]}"
+            sync_publish('candles_info', stats.candles_info(candles[key]['candles']))
         # routes info
         sync_publish('routes_info', stats.routes(router.routes))
 
@@ -158,6 +183,9 @@ def _execute_backtest(
             benchmark=benchmark,
             generate_hyperparameters=True,
             fast_mode=fast_mode,
+            event_mode=event_mode,
+            generate_phases_timing=phases_timing,
+            generate_hooks_profile=hooks_profile,
         )
     except exceptions.RouteNotFound as e:
         # Extract exchange, symbol, and timeframe using regular expressions
@@ -181,7 +209,7 @@ def _execute_backtest(
             # retry the backtest simulation
             _execute_backtest(
                 client_id, debug_mode, user_config, exchange, routes, data_routes, start_date, finish_date, candles,
-                chart, tradingview, csv, json, fast_mode, benchmark
+                chart, tradingview, csv, json, fast_mode, benchmark, event_mode, phases_timing, hooks_profile
             )
         else:
             raise e
@@ -195,6 +223,10 @@ def _execute_backtest(
         sync_publish('metrics', result['metrics'])
         sync_publish('equity_curve', result['equity_curve'], compression=True)
         sync_publish('trades', result['trades'], compression=True)
+        if phases_timing:
+            sync_publish('phases_timing', result['phases_timing'])
+        if hooks_profile:
+            sync_publish('hooks_profile', result['hooks_profile'])
         if chart:
             sync_publish('candles_chart', _get_formatted_candles_for_frontend(), compression=True)
             sync_publish('orders_chart', _get_formatted_orders_for_frontend(), compression=True)
@@ -412,7 +444,10 @@ def _handle_warmup_candles(warmup_candles: dict, start_date: str) -> None:
         raise e
 
 
-def simulator(*args, fast_mode: bool = False, **kwargs) -> dict:
+def simulator(*args, fast_mode: bool = False, event_mode: bool = False, **kwargs) -> dict:
+    if event_mode:
+        return _event_simulator(*args, **kwargs)
+
     if fast_mode:
         return _skip_simulator(*args, **kwargs)
 
@@ -430,88 +465,50 @@ def _step_simulator(
         benchmark: bool = False,
         generate_hyperparameters: bool = False,
         generate_logs: bool = False,
+        generate_phases_timing: bool = False,
+        generate_hooks_profile: bool = False,
 ) -> dict:
     # In case generating logs is specifically demanded, the debug mode must be enabled.
     if generate_logs:
         config['app']['debug_mode'] = True
 
-    begin_time_track = time.time()
+    phase_timer.reset(is_enabled=generate_phases_timing)
 
-    key = f"{config['app']['considering_candles'][0][0]}-{config['app']['considering_candles'][0][1]}"
-    first_candles_set = candles[key]['candles']
+    begin_time_track = time.time()
 
     length = _simulation_minutes_length(candles)
     _prepare_times_before_simulation(candles)
-    _prepare_routes(hyperparameters)
+    _prepare_routes(hyperparameters, generate_hooks_profile)
+
+    key = f"{config['app']['considering_candles'][0][0]}-{config['app']['considering_candles'][0][1]}"
 
     # add initial balance
     save_daily_portfolio_balance(is_initial=True)
 
     progressbar = Progressbar(length, step=420)
     last_update_time = None
-    for i in range(length):
-        # update time
-        store.app.time = first_candles_set[i][0] + 60_000
-
-        # add candles
-        for j in candles:
-            short_candle = candles[j]['candles'][i]
-            if i != 0:
-                previous_short_candle = candles[j]['candles'][i - 1]
-                short_candle = _get_fixed_jumped_candle(previous_short_candle, short_candle)
-            exchange = candles[j]['exchange']
-            symbol = candles[j]['symbol']
-
-            store.candles.add_candle(short_candle, exchange, symbol, '1m', with_execution=False,
-                                     with_generation=False)
-
-            # print short candle
-            if jh.is_debuggable('shorter_period_candles'):
-                print_candle(short_candle, True, symbol)
-
-            _simulate_price_change_effect(short_candle, exchange, symbol)
-
-            # generate and add candles for bigger timeframes
-            for timeframe in config['app']['considering_timeframes']:
-                # for 1m, no work is needed
-                if timeframe == '1m':
-                    continue
-
-                count = TIMEFRAME_TO_ONE_MINUTES[timeframe]
-                # until = count - ((i + 1) % count)
-
-                if (i + 1) % count == 0:
-                    generated_candle = generate_candle_from_one_minutes(
-                        timeframe,
-                        candles[j]['candles'][(i - (count - 1)):(i + 1)]
-                    )
-
-                    store.candles.add_candle(generated_candle, exchange, symbol, timeframe, with_execution=False,
-                                             with_generation=False)
-
-        last_update_time = _update_progress_bar(progressbar, run_silently, i, candle_step=420,
-                                                last_update_time=last_update_time)
-
-        # now that all new generated candles are ready, execute
-        for r in router.routes:
-            count = TIMEFRAME_TO_ONE_MINUTES[r.timeframe]
-            # 1m timeframe
-            if r.timeframe == timeframes.MINUTE_1:
-                r.strategy._execute()
-            elif (i + 1) % count == 0:
-                # print candle
-                if jh.is_debuggable('trading_candles'):
-                    print_candle(store.candles.get_current_candle(r.exchange, r.symbol, r.timeframe), False,
-                                 r.symbol)
-                r.strategy._execute()
-
-            store.orders.update_active_orders(r.exchange, r.symbol)
-
-        # now check to see if there's any MARKET orders waiting to be executed
-        _execute_market_orders()
+    # the time of the loop that isn't spent in any of the measured phases
+    phase_timer.start('other')
+    for offset, window_candles, generated_candles in _simulation_windows(candles, 1):
+        first_candles_set = window_candles[key]['candles']
+        for i in range(len(first_candles_set)):
+            # update time
+            store.app.time = first_candles_set[i][0] + 60_000
 
-        if i != 0 and i % 1440 == 0:
-            save_daily_portfolio_balance()
+            _simulate_new_candle(window_candles, generated_candles, i)
+
+            last_update_time = _update_progress_bar(progressbar, run_silently, offset + i, candle_step=420,
+                                                    last_update_time=last_update_time)
+
+            # now that all new generated candles are ready, execute
+            _execute_routes(i, 1)
+
+            # now check to see if there's any MARKET orders waiting to be executed
+            _execute_market_orders()
+
+            if offset + i != 0 and (offset + i) % 1440 == 0:
+                _save_daily_portfolio_balance()
+    phase_timer.stop()
 
     _finish_progress_bar(progressbar, run_silently)
 
@@ -540,18 +537,65 @@ def _step_simulator(
         benchmark=benchmark,
         generate_hyperparameters=generate_hyperparameters,
         generate_logs=generate_logs,
+        generate_phases_timing=generate_phases_timing,
+        generate_hooks_profile=generate_hooks_profile,
     )
     result['execution_duration'] = execution_duration
     return result
 
 
-def _simulation_minutes_length(candles: dict) -> int:
+def _simulate_new_candle(candles: dict, generated_candles: dict, candle_index: int) -> None:
+    i = candle_index
+    # add candles
+    for j in candles:
+        # a copy, because the store's row gets overwritten by partial candles if an order gets filled
+        short_candle = candles[j]['candles'][i].copy()
+        exchange = candles[j]['exchange']
+        symbol = candles[j]['symbol']
+
+        phase_timer.start('candles_ingestion')
+        store.candles.add_candle(short_candle, exchange, symbol, '1m', with_execution=False,
+                                 with_generation=False)
+        phase_timer.stop()
+
+        # print short candle
+        if jh.is_debuggable('shorter_period_candles'):
+            print_candle(short_candle, True, symbol)
+
+        _simulate_price_change_effect(short_candle, exchange, symbol)
+
+        # generate and add candles for bigger timeframes
+        phase_timer.start('bigger_timeframes_generation')
+        for timeframe in config['app']['considering_timeframes']:
+            # for 1m, no work is needed
+            if timeframe == '1m':
+                continue
+
+            count = TIMEFRAME_TO_ONE_MINUTES[timeframe]
+
+            if (i + 1) % count == 0:
+                generated_candle = generated_candles[j][timeframe][(i + 1) // count - 1]
+
+                store.candles.add_candle(generated_candle, exchange, symbol, timeframe, with_execution=False,
+                                         with_generation=False)
+        phase_timer.stop()
+
+
+def _simulation_minutes_length(candles: Union[dict, CandlesStream]) -> int:
+    if isinstance(candles, CandlesStream):
+        return len(candles)
+
     key = f"{config['app']['considering_candles'][0][0]}-{config['app']['considering_candles'][0][1]}"
     first_candles_set = candles[key]["candles"]
     return len(first_candles_set)
 
 
-def _prepare_times_before_simulation(candles: dict) -> None:
+def _prepare_times_before_simulation(candles: Union[dict, CandlesStream]) -> None:
+    if isinstance(candles, CandlesStream):
+        store.app.starting_time = candles.first_timestamp
+        store.app.time = candles.first_timestamp
+        return
+
     # result = {}
     # begin_time_track = time.time()
     key = f"{config['app']['considering_candles'][0][0]}-{config['app']['considering_candles'][0][1]}"
@@ -565,7 +609,79 @@ def _prepare_times_before_simulation(candles: dict) -> None:
     store.app.time = first_candles_set[0][0]
 
 
-def _prepare_routes(hyperparameters: dict = None) -> None:
+def _simulation_windows(
+        candles: Union[dict, CandlesStream], candles_step: int
+) -> Iterator[Tuple[int, dict, dict]]:
+    """
+    Yields the index of the first candle, the trading candles and the generated candles (see
+    _prepare_candles_before_simulation()) of each window of the simulation. There's a single
+    window of the whole date range, unless the candles are streamed.
+    """
+    if not isinstance(candles, CandlesStream):
+        yield 0, candles, _prepare_candles_before_simulation(candles, candles_step)
+        return
+
+    windows = candles.windows()
+    while True:
+        # the time spent waiting for the window to be loaded
+        phase_timer.start('candles_streaming')
+        window = next(windows, None)
+        phase_timer.stop()
+        if window is None:
+            return
+
+        offset, window_candles = window
+        generated_candles = _prepare_candles_before_simulation(
+            window_candles, candles_step, keep=candles.keep if offset else None
+        )
+        if offset:
+            # they're computed from the session candles of the previous window; the ones of this window
+            # only start with the kept candles, the same as the candles of the strategies (see precomputed())
+            for r in router.routes:
+                r.strategy._precomputed_indicators = {}
+        yield offset, window_candles, generated_candles
+
+
+def _prepare_candles_before_simulation(candles: dict, candles_step: int, keep: int = None) -> dict:
+    """
+    Prepares the trading candles for the simulation loop in one vectorized pass: fixes the jumped
+    1m candles at every step of the loop, and pre-generates the candles of all the bigger
+    timeframes for the whole date range so that the loop only needs to pick them by index.
+
+    The 1m storage of each pair is then backed by the trading candles themselves, hence
+    candles[j]['candles'] is replaced by a view of it. Since partial candles are written to
+    the store while orders get filled, the loop must copy the candles it keeps using.
+
+    If keep is set, the candles continue the ones in the store (the previous window of a
+    streamed backtest), of which only the last "keep" 1m candles are kept.
+    """
+    generated_candles = {}
+    for j in candles:
+        previous_close = None
+        if keep is not None:
+            previous_close = store.candles.get_current_candle(candles[j]['exchange'], candles[j]['symbol'], '1m')[2]
+        _fix_jumped_candles(candles[j]['candles'], candles_step, previous_close)
+        candles[j]['candles'] = store.candles.init_backtest_storage(
+            candles[j]['exchange'], candles[j]['symbol'], candles[j]['candles'], keep
+        )
+
+        phase_timer.start('bigger_timeframes_generation')
+        generated_candles[j] = {}
+        for timeframe in config['app']['considering_timeframes']:
+            # for 1m, no work is needed
+            if timeframe == '1m':
+                continue
+
+            generated_candles[j][timeframe] = generate_bigger_timeframe_candles(timeframe, candles[j]['candles'])
+        phase_timer.stop()
+
+    return generated_candles
+
+
+def _prepare_routes(hyperparameters: dict = None, profile_hooks: bool = False) -> None:
+    # start the session with an empty indicators' cache (and zero hit/miss counters)
+    indicators_memoization.reset()
+
     # initiate strategies
     for r in router.routes:
         # if the r.strategy is str read it from file
@@ -590,6 +706,10 @@ def _prepare_routes(hyperparameters: dict = None) -> None:
         r.strategy.symbol = r.symbol
         r.strategy.timeframe = r.timeframe
 
+        if profile_hooks:
+            r.strategy._hooks_profiler = HooksProfiler()
+            r.strategy._hooks_profiler.attach(r.strategy)
+
         # read the dna from strategy's dna() and use it for injecting inject hyperparameters
         # first convert DNS string into hyperparameters
         if len(r.strategy.dna()) > 0 and hyperparameters is None:
@@ -645,80 +765,78 @@ def _finish_progress_bar(progressbar: Progressbar, run_silently: bool):
     )
 
 
-def _get_fixed_jumped_candle(
-        previous_candle: np.ndarray, candle: np.ndarray
-) -> np.ndarray:
+def _fix_jumped_candles(candles: np.ndarray, candles_step: int = 1, previous_close: float = None) -> None:
     """
     A little workaround for the times that the price has jumped and the opening
     price of the current candle is not equal to the previous candle's close!
 
-    :param previous_candle: np.ndarray
-    :param candle: np.ndarray
+    Fixes (in place) the first candle of every step of the simulation loop
+    based on the close of the candle before it.
+
+    :param candles: np.ndarray
+    :param candles_step: int
+    :param previous_close: float - the close of the candle before the first one, if any
     """
-    if previous_candle[2] < candle[1]:
-        candle[1] = previous_candle[2]
-        candle[4] = min(previous_candle[2], candle[4])
-    elif previous_candle[2] > candle[1]:
-        candle[1] = previous_candle[2]
-        candle[3] = max(previous_candle[2], candle[3])
+    indexes = np.arange(candles_step if previous_close is None else 0, len(candles), candles_step)
+    if len(indexes) == 0:
+        return
 
-    return candle
+    previous_closes = candles[indexes - 1, 2]
+    if previous_close is not None:
+        previous_closes[0] = previous_close
+    opens = candles[indexes, 1]
+
+    jumped_up = previous_closes < opens
+    jumped_down = previous_closes > opens
+    candles[indexes[jumped_up], 4] = np.minimum(previous_closes[jumped_up], candles[indexes[jumped_up], 4])
+    candles[indexes[jumped_down], 3] = np.maximum(previous_closes[jumped_down], candles[indexes[jumped_down], 3])
+    candles[indexes, 1] = previous_closes
 
 
 def _simulate_price_change_effect(real_candle: np.ndarray, exchange: str, symbol: str) -> None:
+    phase_timer.start('orders_simulation')
+    # the candle as a range of one candle for the compiled engine
+    candles = real_candle[None, :]
     current_temp_candle = real_candle.copy()
-    executed_order = False
 
     executing_orders = _get_executing_orders(exchange, symbol, real_candle)
-    if len(executing_orders) > 1:
-        # extend the candle shape from (6,) to (1,6)
-        executing_orders = _sort_execution_orders(executing_orders, current_temp_candle[None, :])
+    while len(executing_orders):
+        if len(executing_orders) > 1:
+            executing_orders = _sort_execution_orders(executing_orders, current_temp_candle[None, :])
 
-    while True:
-        if len(executing_orders) == 0:
-            executed_order = False
-        else:
-            for index, order in enumerate(executing_orders):
-                if index == len(executing_orders) - 1 and not order.is_active:
-                    executed_order = False
-
-                if not order.is_active:
-                    continue
-
-                if candle_includes_price(current_temp_candle, order.price):
-                    storable_temp_candle, current_temp_candle = split_candle(current_temp_candle, order.price)
-                    _update_all_routes_a_partial_candle(exchange, symbol, storable_temp_candle)
-
-                    p = selectors.get_position(exchange, symbol)
-                    p.current_price = storable_temp_candle[2]
-
-                    executed_order = True
-
-                    order.execute()
-                    executing_orders = _get_executing_orders(exchange, symbol, current_temp_candle)
-                    if len(executing_orders) > 1:
-                        # extend the candle shape from (6,) to (1,6)
-                        executing_orders = _sort_execution_orders(executing_orders, current_temp_candle[None, :])
-
-                    # break from the for loop, we'll try again inside the while
-                    # loop with the new current_temp_candle
-                    break
-                else:
-                    executed_order = False
-
-        if not executed_order:
-            # add/update the real_candle to the store so we can move on
-            store.candles.add_candle(
-                real_candle, exchange, symbol, '1m',
-                with_execution=False,
-                with_generation=False
-            )
-            p = selectors.get_position(exchange, symbol)
-            if p:
-                p.current_price = real_candle[2]
+        # the compiled engine finds the next fill within what is left of the candle; inactive orders are passed as nan
+        prices = np.array([o.price if o.is_active else np.nan for o in executing_orders], dtype=np.float64)
+        candle_index, order_index, storable_temp_candle, remaining_candle = find_next_fill(
+            candles, 0, current_temp_candle, prices
+        )
+        if candle_index == -1:
             break
 
+        current_temp_candle = remaining_candle
+        _update_all_routes_a_partial_candle(exchange, symbol, storable_temp_candle)
+
+        p = selectors.get_position(exchange, symbol)
+        p.current_price = storable_temp_candle[2]
+
+        executing_orders[order_index].execute()
+        executing_orders = _get_executing_orders(exchange, symbol, current_temp_candle)
+
+    # add/update the real_candle to the store so we can move on
+    phase_timer.start('candles_ingestion')
+    store.candles.add_candle(
+        real_candle, exchange, symbol, '1m',
+        with_execution=False,
+        with_generation=False
+    )
+    phase_timer.stop()
+    p = selectors.get_position(exchange, symbol)
+    if p:
+        p.current_price = real_candle[2]
+    phase_timer.stop()
+
+    phase_timer.start('liquidation_checks')
     _check_for_liquidations(real_candle, exchange, symbol)
+    phase_timer.stop()
 
 
 def _check_for_liquidations(candle: np.ndarray, exchange: str, symbol: str) -> None:
@@ -764,12 +882,15 @@ def _generate_outputs(
         benchmark: bool = False,
         generate_hyperparameters: bool = False,
         generate_logs: bool = False,
+        generate_phases_timing: bool = False,
+        generate_hooks_profile: bool = False,
 ):
     result = {}
     if generate_hyperparameters:
         result["hyperparameters"] = stats.hyperparameters(router.routes)
     result["metrics"] = report.portfolio_metrics()
     result["trades"] = report.trades()
+    result["indicators_cache"] = dict(indicators_memoization.stats)
     # generate logs in json, csv and tradingview's pine-editor format
     logs_path = store_logs(generate_json, generate_tradingview, generate_csv)
     if generate_json:
@@ -782,6 +903,12 @@ def _generate_outputs(
         result["equity_curve"] = charts.equity_curve(benchmark)
     if generate_logs:
         result["logs"] = f"storage/logs/backtest-mode/{jh.get_session_id()}.txt"
+    if generate_phases_timing:
+        result["phases_timing"] = phase_timer.report()
+    if generate_hooks_profile:
+        result["hooks_profile"] = {
+            jh.key(r.exchange, r.symbol, r.timeframe): r.strategy._hooks_profiler.report() for r in router.routes
+        }
     return result
 
 
@@ -796,16 +923,20 @@ def _skip_simulator(
         benchmark: bool = False,
         generate_hyperparameters: bool = False,
         generate_logs: bool = False,
+        generate_phases_timing: bool = False,
+        generate_hooks_profile: bool = False,
 ) -> dict:
     # In case generating logs is specifically demanded, the debug mode must be enabled.
     if generate_logs:
         config["app"]["debug_mode"] = True
 
+    phase_timer.reset(is_enabled=generate_phases_timing)
+
     begin_time_track = time.time()
 
     length = _simulation_minutes_length(candles)
     _prepare_times_before_simulation(candles)
-    _prepare_routes(hyperparameters)
+    _prepare_routes(hyperparameters, generate_hooks_profile)
 
     # add initial balance
     save_daily_portfolio_balance(is_initial=True)
@@ -813,21 +944,134 @@ def _skip_simulator(
     candles_step = _calculate_minimum_candle_step()
     progressbar = Progressbar(length, step=candles_step)
     last_update_time = None
-    for i in range(0, length, candles_step):
-        # update time moved to _simulate_price_change_effect__multiple_candles
-        # store.app.time = first_candles_set[i][0] + (60_000 * candles_step)
-        _simulate_new_candles(candles, i, candles_step)
+    # the time of the loop that isn't spent in any of the measured phases
+    phase_timer.start('other')
+    for offset, window_candles, generated_candles in _simulation_windows(candles, candles_step):
+        window_length = _simulation_minutes_length(window_candles)
+        for i in range(0, window_length, candles_step):
+            # update time moved to _simulate_price_change_effect__multiple_candles
+            # store.app.time = first_candles_set[i][0] + (60_000 * candles_step)
+            _simulate_new_candles(window_candles, generated_candles, i, candles_step)
 
-        last_update_time = _update_progress_bar(progressbar, run_silently, i, candles_step,
-                                                last_update_time=last_update_time)
+            last_update_time = _update_progress_bar(progressbar, run_silently, offset + i, candles_step,
+                                                    last_update_time=last_update_time)
 
-        _execute_routes(i, candles_step)
+            _execute_routes(i, candles_step)
 
-        # now check to see if there's any MARKET orders waiting to be executed
+            # now check to see if there's any MARKET orders waiting to be executed
+            _execute_market_orders()
+
+            if offset + i != 0 and (offset + i) % 1440 == 0:
+                _save_daily_portfolio_balance()
+    phase_timer.stop()
+
+    _finish_progress_bar(progressbar, run_silently)
+
+    execution_duration = 0
+    if not run_silently:
+        # print executed time for the backtest session
+        finish_time_track = time.time()
+        execution_duration = round(finish_time_track - begin_time_track, 2)
+
+    for r in router.routes:
+        r.strategy._terminate()
         _execute_market_orders()
 
-        if i != 0 and i % 1440 == 0:
-            save_daily_portfolio_balance()
+    # now that backtest simulation is finished, add finishing balance
+    save_daily_portfolio_balance()
+
+    # set the ending time for the backtest session
+    store.app.ending_time = store.app.time + 60_000
+
+    result = _generate_outputs(
+        candles,
+        generate_tradingview=generate_tradingview,
+        generate_csv=generate_csv,
+        generate_json=generate_json,
+        generate_equity_curve=generate_equity_curve,
+        benchmark=benchmark,
+        generate_hyperparameters=generate_hyperparameters,
+        generate_logs=generate_logs,
+        generate_phases_timing=generate_phases_timing,
+        generate_hooks_profile=generate_hooks_profile,
+    )
+    result['execution_duration'] = execution_duration
+    return result
+
+
+def _event_simulator(
+        candles: dict,
+        run_silently: bool,
+        hyperparameters: dict = None,
+        generate_tradingview: bool = False,
+        generate_csv: bool = False,
+        generate_json: bool = False,
+        generate_equity_curve: bool = False,
+        benchmark: bool = False,
+        generate_hyperparameters: bool = False,
+        generate_logs: bool = False,
+        generate_phases_timing: bool = False,
+        generate_hooks_profile: bool = False,
+) -> dict:
+    """
+    Same as _step_simulator() except that it only simulates the 1m candles at which something
+    can actually happen (a route's execution, an order getting filled, a liquidation, or the
+    daily balance being saved). The idle candles in between are added to the store in bulk.
+    """
+    # In case generating logs is specifically demanded, the debug mode must be enabled.
+    if generate_logs:
+        config['app']['debug_mode'] = True
+
+    phase_timer.reset(is_enabled=generate_phases_timing)
+
+    begin_time_track = time.time()
+
+    length = _simulation_minutes_length(candles)
+    _prepare_times_before_simulation(candles)
+    _prepare_routes(hyperparameters, generate_hooks_profile)
+
+    key = f"{config['app']['considering_candles'][0][0]}-{config['app']['considering_candles'][0][1]}"
+
+    # add initial balance
+    save_daily_portfolio_balance(is_initial=True)
+
+    progressbar = Progressbar(length, step=1440)
+    last_update_time = None
+    # the time of the loop that isn't spent in any of the measured phases
+    phase_timer.start('other')
+    for offset, window_candles, generated_candles in _simulation_windows(candles, 1):
+        first_candles_set = window_candles[key]['candles']
+        window_length = len(first_candles_set)
+        i = 0
+        while i < window_length:
+            event_index = _get_next_event_index(window_candles, i, window_length)
+
+            if event_index > i:
+                _simulate_idle_candles(window_candles, generated_candles, i, event_index)
+
+            if event_index == window_length:
+                break
+
+            i = event_index
+
+            # update time
+            store.app.time = first_candles_set[i][0] + 60_000
+
+            _simulate_new_candle(window_candles, generated_candles, i)
+
+            last_update_time = _update_progress_bar(progressbar, run_silently, offset + i, candle_step=1440,
+                                                    last_update_time=last_update_time)
+
+            _execute_routes(i, 1)
+
+            # now check to see if there's any MARKET orders waiting to be executed
+            _execute_market_orders()
+
+            if offset + i != 0 and (offset + i) % 1440 == 0:
+                _save_daily_portfolio_balance()
+
+            i += 1
+    phase_timer.stop()
 
     _finish_progress_bar(progressbar, run_silently)
 
@@ -856,11 +1100,92 @@ def _skip_simulator(
         benchmark=benchmark,
         generate_hyperparameters=generate_hyperparameters,
         generate_logs=generate_logs,
+        generate_phases_timing=generate_phases_timing,
+        generate_hooks_profile=generate_hooks_profile,
     )
     result['execution_duration'] = execution_duration
     return result
 
 
+def _get_next_event_index(candles: dict, candle_index: int, length: int) -> int:
+    """
+    Returns the index of the first 1m candle (starting from candle_index) that must be simulated
+    one by one, or length if all the remaining candles are idle. That is the earliest of:
+    the start of a new day, the execution of a route, an active order's price falling within
+    the candle, and an isolated position's liquidation price being hit.
+    """
+    # the daily balance is saved (and the progressbar is updated) at the beginning of every day
+    next_index = min(length, -(-candle_index // 1440) * 1440)
+
+    for r in router.routes:
+        count = TIMEFRAME_TO_ONE_MINUTES[r.timeframe]
+        next_index = min(next_index, (candle_index // count + 1) * count - 1)
+
+    if next_index == candle_index:
+        return next_index
+
+    for j in candles:
+        exchange = candles[j]['exchange']
+        symbol = candles[j]['symbol']
+
+        prices = [o.price for o in store.orders.get_active_orders(exchange, symbol) if o.is_active]
+        p = selectors.get_position(exchange, symbol)
+        if p and p.mode == 'isolated' and p.is_open:
+            prices.append(p.liquidation_price)
+
+        if len(prices) == 0:
+            continue
+
+        prices = np.array(prices)
+        short_candles = candles[j]['candles'][candle_index:next_index]
+        is_included = (short_candles[:, 4, None] <= prices) & (prices <= short_candles[:, 3, None])
+        included_indexes = np.flatnonzero(is_included.any(axis=1))
+        if len(included_indexes):
+            next_index = candle_index + included_indexes[0]
+
+    return next_index
+
+
+def _simulate_idle_candles(candles: dict, generated_candles: dict, start_index: int, finish_index: int) -> None:
+    """
+    Adds the 1m candles in the [start_index, finish_index) range, and the bigger timeframe
+    candles that get completed within it, to the store without simulating them one by one.
+    """
+    for j in candles:
+        short_candles = candles[j]['candles'][start_index:finish_index]
+        exchange = candles[j]['exchange']
+        symbol = candles[j]['symbol']
+
+        phase_timer.start('candles_ingestion')
+        store.candles.add_multiple_1m_candles(short_candles, exchange, symbol)
+        phase_timer.stop()
+
+        # generate and add candles for bigger timeframes
+        phase_timer.start('bigger_timeframes_generation')
+        for timeframe in config['app']['considering_timeframes']:
+            # for 1m, no work is needed
+            if timeframe == '1m':
+                continue
+
+            count = TIMEFRAME_TO_ONE_MINUTES[timeframe]
+            for k in range(start_index // count, finish_index // count):
+                store.candles.add_candle(
+                    generated_candles[j][timeframe][k],
+                    exchange,
+                    symbol,
+                    timeframe,
+                    with_execution=False,
+                    with_generation=False,
+                )
+        phase_timer.stop()
+
+        p = selectors.get_position(exchange, symbol)
+        if p:
+            p.current_price = short_candles[-1, 2]
+
+    store.app.time = candles[j]['candles'][finish_index - 1][0] + 60_000
+
+
 def _calculate_minimum_candle_step():
     """
     Calculates the minimum step for update candles that will allow simple updates on the simulator.
@@ -874,17 +1199,13 @@ def _calculate_minimum_candle_step():
     return np.gcd.reduce(consider_time_frames)
 
 
-def _simulate_new_candles(candles: dict, candle_index: int, candles_step: int) -> None:
+def _simulate_new_candles(candles: dict, generated_candles: dict, candle_index: int, candles_step: int) -> None:
     i = candle_index
     # add candles
     for j in candles:
-        short_candles = candles[j]["candles"][i: i + candles_step]
-        if i != 0:
-            previous_short_candles = candles[j]["candles"][i - 1]
-            # work the same, the fix needs to be done only on the gap of 1m edge candles.
-            short_candles[0] = _get_fixed_jumped_candle(
-                previous_short_candles, short_candles[0]
-            )
+        # the jumped candles on the edges of each step are already fixed by _prepare_candles_before_simulation(). A
+        # copy, because the store's rows get overwritten by partial candles if an order gets filled
+        short_candles = candles[j]["candles"][i: i + candles_step].copy()
         exchange = candles[j]["exchange"]
         symbol = candles[j]["symbol"]
 
@@ -893,6 +1214,7 @@ def _simulate_new_candles(candles: dict, candle_index: int, candles_step: int) -
         )
 
         # generate and add candles for bigger timeframes
+        phase_timer.start('bigger_timeframes_generation')
         for timeframe in config["app"]["considering_timeframes"]:
             # for 1m, no work is needed
             if timeframe == "1m":
@@ -901,11 +1223,7 @@ def _simulate_new_candles(candles: dict, candle_index: int, candles_step: int) -
             count = TIMEFRAME_TO_ONE_MINUTES[timeframe]
 
             if (i + candles_step) % count == 0:
-                generated_candle = generate_candle_from_one_minutes(
-                    timeframe,
-                    candles[j]["candles"][
-                    i - count + candles_step: i + candles_step],
-                )
+                generated_candle = generated_candles[j][timeframe][(i + candles_step) // count - 1]
 
                 store.candles.add_candle(
                     generated_candle,
@@ -915,6 +1233,7 @@ def _simulate_new_candles(candles: dict, candle_index: int, candles_step: int) -
                     with_execution=False,
                     with_generation=False,
                 )
+        phase_timer.stop()
 
 
 def _simulate_price_change_effect_multiple_candles(
@@ -930,82 +1249,83 @@ def _simulate_price_change_effect_multiple_candles(
             short_timeframes_candles[:, 5].sum(),
         ]
     )
+    phase_timer.start('orders_simulation')
     executing_orders = _get_executing_orders(exchange, symbol, real_candle)
     if len(executing_orders) > 0:
         if len(executing_orders) > 1:
             executing_orders = _sort_execution_orders(executing_orders, short_timeframes_candles)
 
-        for i in range(len(short_timeframes_candles)):
-            current_temp_candle = short_timeframes_candles[i].copy()
-            if i > 0:
-                current_temp_candle[3] = max(current_temp_candle[3], short_timeframes_candles[i-1, 2])
-                current_temp_candle[4] = min(current_temp_candle[4], short_timeframes_candles[i-1, 2])
-            is_executed_order = False
-
-            while True:
-                if len(executing_orders) == 0:
-                    is_executed_order = False
-                else:
-                    for index, order in enumerate(executing_orders):
-                        if index == len(executing_orders) - 1 and not order.is_active:
-                            is_executed_order = False
-                        if not order.is_active:
-                            continue
-
-                        if candle_includes_price(current_temp_candle, order.price):
-                            storable_temp_candle, current_temp_candle = split_candle(
-                                current_temp_candle, order.price
-                            )
-                            _update_all_routes_a_partial_candle(
-                                exchange,
-                                symbol,
-                                storable_temp_candle,
-                            )
-                            p = selectors.get_position(exchange, symbol)
-                            p.current_price = storable_temp_candle[2]
-
-                            is_executed_order = True
-
-                            store.app.time = storable_temp_candle[0] + 60_000
-                            order.execute()
-                            executing_orders = _get_executing_orders(
-                                exchange, symbol, real_candle
-                            )
-
-                            # break from the for loop, we'll try again inside the while
-                            # loop with the new current_temp_candle
-                            break
-                        else:
-                            is_executed_order = False
-
-                if not is_executed_order:
-                    # add/update the real_candle to the store so we can move on
-                    store.candles.add_candle(
-                        short_timeframes_candles[i].copy(),
-                        exchange,
-                        symbol,
-                        "1m",
-                        with_execution=False,
-                        with_generation=False,
-                    )
-                    p = selectors.get_position(exchange, symbol)
-                    if p:
-                        p.current_price = current_temp_candle[2]
-                    break
+        # index of the first candle that is not in the store yet
+        stored_index = 0
+        candle_index = 0
+        current_temp_candle = short_timeframes_candles[0].copy()
+        while len(executing_orders):
+            # the compiled engine finds the next fill; inactive orders are passed as nan
+            prices = np.array([o.price if o.is_active else np.nan for o in executing_orders], dtype=np.float64)
+            candle_index, order_index, storable_temp_candle, current_temp_candle = find_next_fill(
+                short_timeframes_candles, candle_index, current_temp_candle, prices
+            )
+            if candle_index == -1:
+                break
+
+            # add the candles before the filled one to the store so the partial candle ends up at the right place
+            if candle_index > stored_index:
+                _add_short_candles_to_store(short_timeframes_candles, stored_index, candle_index, exchange, symbol)
+                stored_index = candle_index
 
+            _update_all_routes_a_partial_candle(exchange, symbol, storable_temp_candle)
+            p = selectors.get_position(exchange, symbol)
+            p.current_price = storable_temp_candle[2]
+
+            store.app.time = storable_temp_candle[0] + 60_000
+            executing_orders[order_index].execute()
+            executing_orders = _get_executing_orders(exchange, symbol, real_candle)
+
+        # store the rest of the candles so the whole range can be overridden below
+        _add_short_candles_to_store(
+            short_timeframes_candles, stored_index, len(short_timeframes_candles), exchange, symbol
+        )
+    phase_timer.stop()
+
+    phase_timer.start('candles_ingestion')
     store.candles.add_multiple_1m_candles(
         short_timeframes_candles,
         exchange,
         symbol,
     )
+    phase_timer.stop()
     store.app.time = real_candle[0] + (60_000 * len(short_timeframes_candles))
+    phase_timer.start('liquidation_checks')
     _check_for_liquidations(real_candle, exchange, symbol)
+    phase_timer.stop()
 
     p = selectors.get_position(exchange, symbol)
     if p:
         p.current_price = short_timeframes_candles[-1, 2]
 
 
+def _add_short_candles_to_store(
+        short_timeframes_candles: np.ndarray, start_index: int, finish_index: int, exchange: str, symbol: str
+) -> None:
+    phase_timer.start('candles_ingestion')
+    # the first one may already be in the store as a partial candle, so it's updated rather than appended
+    store.candles.add_candle(
+        short_timeframes_candles[start_index].copy(),
+        exchange,
+        symbol,
+        "1m",
+        with_execution=False,
+        with_generation=False,
+    )
+    if finish_index > start_index + 1:
+        store.candles.add_multiple_1m_candles(
+            short_timeframes_candles[start_index + 1:finish_index],
+            exchange,
+            symbol,
+        )
+    phase_timer.stop()
+
+
 def _update_all_routes_a_partial_candle(
         exchange: str,
         symbol: str,
@@ -1054,7 +1374,7 @@ def _execute_routes(candle_index: int, candles_step: int) -> None:
         count = TIMEFRAME_TO_ONE_MINUTES[r.timeframe]
         # 1m timeframe
         if r.timeframe == timeframes.MINUTE_1:
-            r.strategy._execute()
+            _execute_strategy(r.strategy)
         elif (candle_index + candles_step) % count == 0:
             # print candle
             if jh.is_debuggable("trading_candles"):
@@ -1065,13 +1385,29 @@ def _execute_routes(candle_index: int, candles_step: int) -> None:
                     False,
                     r.symbol,
                 )
-            r.strategy._execute()
+            _execute_strategy(r.strategy)
 
+        phase_timer.start('active_orders_update')
         store.orders.update_active_orders(r.exchange, r.symbol)
+        phase_timer.stop()
+
+
+def _execute_strategy(strategy) -> None:
+    phase_timer.start('strategies_execution')
+    strategy._execute()
+    phase_timer.stop()
 
 
 def _execute_market_orders():
+    phase_timer.start('market_orders_execution')
     store.orders.execute_pending_market_orders()
+    phase_timer.stop()
+
+
+def _save_daily_portfolio_balance() -> None:
+    phase_timer.start('daily_balance')
+    save_daily_portfolio_balance()
+    phase_timer.stop()
 
 
 def _get_executing_orders(exchange, symbol, real_candle):
@@ -1084,45 +1420,5 @@ def _get_executing_orders(exchange, symbol, real_candle):
 
 
 def _sort_execution_orders(orders: List[Order], short_candles: np.ndarray):
-    remaining_orders = set(orders)
-    sorted_orders = []
-    
-    for candle in short_candles:
-        open_price, close_price, low, high = candle[1], candle[2], candle[4], candle[3]
-
-        # Did not use candle_includes_price() for performance, keeping it vectorization-friendly
-        included_orders = [order for order in remaining_orders if low <= order.price <= high]
-
-        if len(included_orders) == 1:
-            sorted_orders.append(included_orders[0])
-            remaining_orders.remove(included_orders[0])
-        elif len(included_orders) > 1:
-            # in case that the orders are above
-            on_open, above_open, below_open = [], [], []
-            for order in included_orders:
-                if order.price == open_price:
-                    on_open.append(order)
-                if order.price > open_price:
-                    above_open.append(order)
-                else:
-                    below_open.append(order)
-            sorted_orders += on_open
-            remaining_orders.difference_update(on_open)
-
-            is_red = open_price > close_price
-            if is_red:
-                # heuristic that first the price goes up and then down, so this is the order execution sort
-                above_open.sort(key=lambda o: o.price)
-                below_open.sort(key=lambda o: o.price, reverse=True)
-                sorted_orders += above_open + below_open
-                remaining_orders.difference_update(above_open + below_open)
-            else:
-                below_open.sort(key=lambda o: o.price, reverse=True)
-                above_open.sort(key=lambda o: o.price)
-                sorted_orders += below_open + above_open
-                remaining_orders.difference_update(below_open + above_open)
-
-        if len(sorted_orders) == len(orders):
-            break
-
-    return sorted_orders
+    prices = np.array([o.price for o in orders], dtype=np.float64)
+    return [orders[i] for i in sort_execution_orders(prices, short_candles)]
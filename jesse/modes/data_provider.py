@@ -11,7 +11,7 @@ def get_candles(exchange: str, symbol: str, timeframe: str):
     from jesse.services.db import database
     database.open_connection()
 
-    from jesse.services.candle import generate_candle_from_one_minutes
+    from jesse.services.candle import generate_candles_from_db
     from jesse.models.Candle import fetch_candles_from_db
 
     if 'hyperliquid' not in exchange.lower():
@@ -37,35 +37,21 @@ def get_candles(exchange: str, symbol: str, timeframe: str):
     else:
         timeframe_to_fetch = timeframe
 
-    candles = np.array(
-        fetch_candles_from_db(exchange, symbol, timeframe_to_fetch, start_date, finish_date)
-    )
+    if generate_candles_from_1m and timeframe != '1m':
+        # generate bigger candles from the rollups of the 1m candles (and the 1m candles that aren't rolled
+        # up yet), starting at the beginning of the first candle of the timeframe
+        timeframe_duration = one_min_count * 60_000
+        candles = generate_candles_from_db(
+            exchange, symbol, timeframe, -(-start_date // timeframe_duration) * timeframe_duration, finish_date
+        )
+    else:
+        candles = fetch_candles_from_db(exchange, symbol, timeframe_to_fetch, start_date, finish_date)
 
     # if there are no candles in the database, return []
     if candles.size == 0:
         database.close_connection()
         return []
 
-    if generate_candles_from_1m:
-        # leave out first candles until the timestamp of the first candle is the beginning of the timeframe
-        timeframe_duration = one_min_count * 60_000
-        while candles[0][0] % timeframe_duration != 0:
-            candles = candles[1:]
-
-        # generate bigger candles from 1m candles
-        if timeframe != '1m':
-            generated_candles = []
-            for i in range(len(candles)):
-                if (i + 1) % one_min_count == 0:
-                    bigger_candle = generate_candle_from_one_minutes(
-                        timeframe,
-                        candles[(i - (one_min_count - 1)):(i + 1)],
-                        True
-                    )
-                    generated_candles.append(bigger_candle)
-
-            candles = generated_candles
-
     database.close_connection()
 
     return [
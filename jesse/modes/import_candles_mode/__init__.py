@@ -1,17 +1,20 @@
 import math
-import time
+from collections import deque
+from contextlib import closing
 from datetime import timedelta
-from typing import Dict, List, Any, Union
+from typing import Dict, List, Any, Tuple, Union
 
 import arrow
-import pydash
+import numpy as np
 from timeloop import Timeloop
 
 import jesse.helpers as jh
 from jesse.exceptions import CandleNotFoundInExchange
 from jesse.models import Candle
+from jesse.models.CandleCoverage import fetch_coverage
 from jesse.modes.import_candles_mode.drivers import drivers, driver_names
 from jesse.modes.import_candles_mode.drivers.interface import CandleExchange
+from jesse.modes.import_candles_mode.pipeline import RateLimiter, fetch_concurrently
 from jesse.config import config
 from jesse.services.failure import register_custom_exception_handler
 from jesse.services.redis import sync_publish, is_process_active
@@ -29,6 +32,27 @@ def run(
         running_via_dashboard: bool = True,
         show_progressbar: bool = False,
 ):
+    """
+    Imports the candles of the symbol of the exchange, the same as run_batch() with a single symbol
+    """
+    return run_batch(client_id, exchange, [symbol], start_date_str, mode, running_via_dashboard, show_progressbar)
+
+
+def run_batch(
+        client_id: str,
+        exchange: str,
+        symbols: List[str],
+        start_date_str: str,
+        mode: str = 'candles',
+        running_via_dashboard: bool = True,
+        show_progressbar: bool = False,
+):
+    """
+    Imports the candles of several symbols of the exchange in one job. The pages of all the
+    symbols are fetched in turns, by the same fetchers and under the same rate limit of the
+    exchange (instead of importing them one by one, each with a rate limit of its own), and the
+    progress of each symbol is published along with its symbol.
+    """
     if running_via_dashboard:
         config['app']['trading_mode'] = mode
         register_custom_exception_handler()
@@ -49,153 +73,146 @@ def run(
 
         status_checker.start()
 
-    try:
-        start_timestamp = jh.arrow_to_timestamp(arrow.get(start_date_str, 'YYYY-MM-DD'))
-    except:
-        raise ValueError(
-            f'start_date must be a string representing a date before today. ex: 2020-01-17. You entered: {start_date_str}')
-
-    # more start_date validations
-    today = arrow.utcnow().floor('day').int_timestamp * 1000
-    if start_timestamp == today:
-        raise ValueError("Today's date is not accepted. start_date must be a string a representing date BEFORE today.")
-    elif start_timestamp > today:
-        raise ValueError("Future's date is not accepted. start_date must be a string a representing date BEFORE today.")
+    start_timestamp = _parse_start_date(start_date_str)
 
     # We just call this to throw a exception in case of a symbol without dash
-    jh.quote_asset(symbol)
-
-    symbol = symbol.upper()
-
-    until_date = arrow.utcnow().floor('day')
-    start_date = arrow.get(start_timestamp / 1000)
-    days_count = jh.date_diff_in_days(start_date, until_date)
-    candles_count = days_count * 1440
+    for symbol in symbols:
+        jh.quote_asset(symbol)
+    # the order is kept, but each symbol is imported once
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
 
     try:
         driver: CandleExchange = drivers[exchange]()
     except KeyError:
         raise ValueError(f'{exchange} is not a supported exchange. Supported exchanges are: {driver_names}')
 
-    loop_length = int(candles_count / driver.count) + 1
-
-    progressbar = Progressbar(loop_length, step=2)
-    frontend_update_counter = 0
-    frontend_update_threshold = 100  # Only notify frontend after this many updates when skipping existing candles
-    skipped_minutes = 0
-    imported_minutes = 0
-    
-    for i in range(candles_count):
-        temp_start_timestamp = start_date.int_timestamp * 1000
-        temp_end_timestamp = temp_start_timestamp + (driver.count - 1) * 60000
-
-        # to make sure it won't try to import candles from the future! LOL
-        if temp_start_timestamp > jh.now_to_timestamp():
-            break
-
-        # prevent duplicates calls to boost performance
-        count = Candle.select().where(
-            Candle.exchange == exchange,
-            Candle.symbol == symbol,
-            Candle.timeframe == '1m' or Candle.timeframe.is_null(),
-            Candle.timestamp.between(temp_start_timestamp, temp_end_timestamp)
-        ).count()
-        already_exists = count == driver.count
-
-        if already_exists:
-            skipped_minutes += driver.count
-        else:
-            imported_minutes += driver.count
-            # it's today's candles if temp_end_timestamp < now
-            if temp_end_timestamp > jh.now_to_timestamp():
-                temp_end_timestamp = arrow.utcnow().floor('minute').int_timestamp * 1000 - 60000
-
-            # fetch from market
-            candles = driver.fetch(symbol, temp_start_timestamp, timeframe='1m')
-
-            # check if candles have been returned and check those returned start with the right timestamp.
-            # Sometimes exchanges just return the earliest possible candles if the start date doesn't exist.
-            time_diff = int((candles[0]['timestamp'] - temp_start_timestamp) / 1000) if len(candles) else 0
-            if not len(candles) or time_diff < 0 or time_diff > 60*100:
-                first_existing_timestamp = driver.get_starting_time(symbol)
-
-                # if driver can't provide accurate get_starting_time()
-                if first_existing_timestamp is None:
-                    raise CandleNotFoundInExchange(
-                        f'No candles exists in the market for this day: {jh.timestamp_to_time(temp_start_timestamp)[:10]} \n'
-                        'Try another start_date'
-                    )
-
-                # handle when there's missing candles during the period
-                if temp_start_timestamp > first_existing_timestamp:
-                    # see if there are candles for the same date for the backup exchange,
-                    # if so, get those, if not, download from that exchange.
+    # the budget of requests of the exchange, which is shared by all of the symbols
+    limiter = RateLimiter(driver.rate_limit_per_second)
+    # the start of each symbol (which moves to its first existing date if it's listed later)
+    starts = {}
+    # the pages of each symbol that are yet to be fetched
+    queues = {}
+    progressbars = {}
+    imported_minutes = dict.fromkeys(symbols, 0)
+    skipped_minutes = dict.fromkeys(symbols, 0)
+
+    def schedule(symbol: str, timestamp: int) -> None:
+        pages, missing_pages = _pages(driver, exchange, symbol, timestamp)
+        starts[symbol] = timestamp
+        queues[symbol] = deque(missing_pages)
+        progressbars[symbol] = Progressbar(max(len(missing_pages), 1))
+        skipped_minutes[symbol] = (len(pages) - len(missing_pages)) * driver.count
+        imported_minutes[symbol] = 0
+        if not missing_pages:
+            progressbars[symbol].finish()
+            publish_progress(symbol)
+
+    def remaining_seconds(symbol: str) -> float:
+        # unknown until the first page of the symbol is imported
+        return progressbars[symbol].estimated_remaining_seconds if progressbars[symbol].index else 0
+
+    def publish_progress(symbol: str) -> None:
+        if running_via_dashboard:
+            sync_publish('progressbar', {
+                'symbol': symbol,
+                'current': progressbars[symbol].current,
+                'estimated_remaining_seconds': remaining_seconds(symbol)
+            })
+        if show_progressbar:
+            jh.clear_output()
+            for s in progressbars:
+                print(f"{s}: {progressbars[s].current}% - {round(remaining_seconds(s))} seconds remaining")
+
+    def scheduled_pages():
+        # one page of each symbol at a time, so that they're imported side by side
+        while any(queues.values()):
+            for symbol in symbols:
+                if queues[symbol]:
+                    yield symbol, queues[symbol].popleft()
+
+    def fetch_page(item: tuple) -> Tuple[List[Dict], bool]:
+        # runs on the fetcher threads, hence it mustn't touch the database
+        symbol, page = item
+        return _fetch_page(driver, symbol, *page)
+
+    for symbol in symbols:
+        schedule(symbol, start_timestamp)
+
+    # the fetched candles (of any of the symbols) that are yet to be stored
+    batch = []
+    concurrency = jh.get_config('env.data.import_concurrency', 4)
+    # the pages that are scheduled while the last ones are being fetched start another round
+    while any(queues.values()):
+        with closing(fetch_concurrently(fetch_page, scheduled_pages(), concurrency, limiter)) as fetched_pages:
+            for (symbol, (temp_start_timestamp, temp_end_timestamp)), (candles, starts_late) in fetched_pages:
+                # the pages from before the symbol was listed, which were fetched before it was known
+                if temp_start_timestamp < starts[symbol]:
+                    continue
+
+                # Sometimes exchanges just return the earliest possible candles if the start date doesn't exist.
+                if starts_late:
+                    limiter.acquire()
+                    first_existing_timestamp = driver.get_starting_time(symbol)
+
+                    # if driver can't provide accurate get_starting_time(), or it's the date that was tried already
+                    listing_timestamp = None if first_existing_timestamp is None else \
+                        jh.timestamp_to_arrow(first_existing_timestamp).floor('day').int_timestamp * 1000
+                    if listing_timestamp is None or (
+                            temp_start_timestamp <= first_existing_timestamp and listing_timestamp <= starts[symbol]
+                    ):
+                        raise CandleNotFoundInExchange(
+                            f'No candles exists in the market for this day: {jh.timestamp_to_time(temp_start_timestamp)[:10]} \n'
+                            f'Try another start_date for {symbol}'
+                        )
+
+                    if temp_start_timestamp <= first_existing_timestamp:
+                        temp_start_time = jh.timestamp_to_time(temp_start_timestamp)[:10]
+                        temp_existing_time = jh.timestamp_to_time(first_existing_timestamp)[:10]
+                        msg = f'No candle exists in the market for {symbol} on {temp_start_time}. So Jesse started importing it since the first existing date which is {temp_existing_time}'
+                        if running_via_dashboard:
+                            sync_publish('alert', {
+                                'message': msg,
+                                'type': 'info'
+                            })
+                        else:
+                            print(msg)
+                        schedule(symbol, listing_timestamp)
+                        continue
+
+                    # handle when there's missing candles during the period: see if there are candles for the
+                    # same date for the backup exchange, if so, get those, if not, download from that exchange.
                     if driver.backup_exchange is not None:
                         candles = _get_candles_from_backup_exchange(
-                            exchange, driver.backup_exchange, symbol, temp_start_timestamp, temp_end_timestamp
+                            exchange, driver.backup_exchange, symbol, temp_start_timestamp, _page_end(temp_end_timestamp)
                         )
-
-                else:
-                    temp_start_time = jh.timestamp_to_time(temp_start_timestamp)[:10]
-                    temp_existing_time = jh.timestamp_to_time(first_existing_timestamp)[:10]
-                    msg = f'No candle exists in the market for {temp_start_time}. So Jesse started importing since the first existing date which is {temp_existing_time}'
-                    if running_via_dashboard:
-                        sync_publish('alert', {
-                            'message': msg,
-                            'type': 'info'
-                        })
-                    else:
-                        print(msg)
-                    run(client_id, exchange, symbol, jh.timestamp_to_time(first_existing_timestamp)[:10], mode,
-                        running_via_dashboard, show_progressbar)
-                    return
-
-            # fill absent candles (if there's any)
-            candles = _fill_absent_candles(candles, temp_start_timestamp, temp_end_timestamp)
-
-            # store in the database
-            store_candles_list(candles)
-
-        # add as much as driver's count to the temp_start_time
-        start_date = start_date.shift(minutes=driver.count)
-
-        if i % 2 == 0:
-            progressbar.update()
-            
-            # For existing candles, throttle frontend updates
-            if already_exists:
-                frontend_update_counter += 1
-                if frontend_update_counter >= frontend_update_threshold:
-                    frontend_update_counter = 0
-                    if running_via_dashboard:
-                        sync_publish('progressbar', {
-                            'current': progressbar.current,
-                            'estimated_remaining_seconds': progressbar.estimated_remaining_seconds
-                        })
-            # For new candles being fetched, update frontend normally
-            else:
-                if running_via_dashboard:
-                    sync_publish('progressbar', {
-                        'current': progressbar.current,
-                        'estimated_remaining_seconds': progressbar.estimated_remaining_seconds
-                    })
-            
-            if show_progressbar:
-                jh.clear_output()
-                print(
-                    f"Progress: {progressbar.current}% - {round(progressbar.estimated_remaining_seconds)} seconds remaining")
-
-        # sleep so that the exchange won't get angry at us
-        if not already_exists:
-            time.sleep(driver.sleep_time)
-
-    skipped_days = round(skipped_minutes / 1440, 1)
-    imported_days = round(imported_minutes / 1440, 1)
-    
-    success_text = (
-        f'Successfully imported candles since "{jh.timestamp_to_date(start_timestamp)}" until today '
-        f'({imported_days} days imported, {skipped_days} days already existed in the database). '
-    )
+                    # fill absent candles (if there's any)
+                    candles = _fill_absent_candles(candles, temp_start_timestamp, _page_end(temp_end_timestamp))
+
+                imported_minutes[symbol] += driver.count
+                # store in the database, a few pages at a time while the next ones are being fetched
+                batch += candles
+                if len(batch) >= _STORE_BATCH_SIZE:
+                    store_candles_list(batch)
+                    batch = []
+
+                progressbars[symbol].update()
+                publish_progress(symbol)
+
+    if batch:
+        store_candles_list(batch)
+
+    if len(symbols) == 1:
+        success_text = (
+            f'Successfully imported candles since "{jh.timestamp_to_date(starts[symbols[0]])}" until today '
+            f'({round(imported_minutes[symbols[0]] / 1440, 1)} days imported, '
+            f'{round(skipped_minutes[symbols[0]] / 1440, 1)} days already existed in the database). '
+        )
+    else:
+        success_text = f'Successfully imported candles of {len(symbols)} symbols until today. ' + ', '.join(
+            f'{symbol} since "{jh.timestamp_to_date(starts[symbol])}" ({round(imported_minutes[symbol] / 1440, 1)} days '
+            f'imported, {round(skipped_minutes[symbol] / 1440, 1)} days already existed)'
+            for symbol in symbols
+        )
 
     # stop the status_checker time loop
     if running_via_dashboard:
@@ -206,12 +223,8 @@ def run(
             'type': 'success'
         })
 
-    # # TODO: shen should it close the database?
-    # # if it is to skip, then it's being called from another process hence we should leave the database be
-    # if not skip_confirmation:
     if not running_via_dashboard:
         # close database connection
-        from jesse.services.db import database
         database.close_connection()
         return success_text
 
@@ -257,31 +270,30 @@ def _get_candles_from_backup_exchange(exchange: str, backup_driver: CandleExchan
         days_count = math.ceil(days_count)
     candles_count = days_count * 1440
     start_date = jh.timestamp_to_arrow(start_timestamp).floor('day')
-    for _ in range(candles_count):
-        temp_start_timestamp = start_date.int_timestamp * 1000
-        temp_end_timestamp = temp_start_timestamp + (backup_driver.count - 1) * 60000
-
-        # to make sure it won't try to import candles from the future! LOL
-        if temp_start_timestamp > jh.now_to_timestamp():
-            break
-
-        # prevent duplicates
-        count = Candle.select().where(
-            Candle.exchange == backup_driver.name,
-            Candle.symbol == symbol,
-            Candle.timeframe == timeframe,
-            Candle.timestamp.between(temp_start_timestamp, temp_end_timestamp)
-        ).count()
-        already_exists = count == backup_driver.count
-
-        if not already_exists:
-            # it's today's candles if temp_end_timestamp < now
-            if temp_end_timestamp > jh.now_to_timestamp():
-                temp_end_timestamp = arrow.utcnow().floor('minute').int_timestamp * 1000 - 60000
-
-            # fetch from market
-            candles = backup_driver.fetch(symbol, temp_start_timestamp)
-
+    coverage = fetch_coverage(
+        backup_driver.name, symbol, timeframe, start_date.int_timestamp * 1000, jh.now_to_timestamp()
+    )
+    pages = []
+    temp_start_timestamp = start_date.int_timestamp * 1000
+    # to make sure it won't try to import candles from the future! LOL
+    while temp_start_timestamp < start_date.int_timestamp * 1000 + candles_count * 60_000 and \
+            temp_start_timestamp <= jh.now_to_timestamp():
+        pages.append((temp_start_timestamp, temp_start_timestamp + (backup_driver.count - 1) * 60000))
+        # add as much as driver's count to the temp_start_time
+        temp_start_timestamp += backup_driver.count * 60000
+    # prevent duplicates
+    missing_pages = [page for page in pages if not _is_imported(coverage, backup_driver.name, symbol, *page)]
+
+    def fetch_page(page: tuple) -> List[Dict]:
+        # runs on the fetcher threads, hence it mustn't touch the database
+        return backup_driver.fetch(symbol, page[0])
+
+    # the same as the pages of the exchange, under the rate limit of the backup exchange
+    with closing(fetch_concurrently(
+            fetch_page, missing_pages, jh.get_config('env.data.import_concurrency', 4),
+            RateLimiter(backup_driver.rate_limit_per_second)
+    )) as fetched_pages:
+        for (temp_start_timestamp, temp_end_timestamp), candles in fetched_pages:
             if not len(candles):
                 raise CandleNotFoundInExchange(
                     f'No candles exists in the market for this day: {jh.timestamp_to_time(temp_start_timestamp)[:10]} \n'
@@ -289,18 +301,11 @@ def _get_candles_from_backup_exchange(exchange: str, backup_driver: CandleExchan
                 )
 
             # fill absent candles (if there's any)
-            candles = _fill_absent_candles(candles, temp_start_timestamp, temp_end_timestamp)
+            candles = _fill_absent_candles(candles, temp_start_timestamp, _page_end(temp_end_timestamp))
 
             # store in the database
             store_candles_list(candles)
 
-        # add as much as driver's count to the temp_start_time
-        start_date = start_date.shift(minutes=backup_driver.count)
-
-        # sleep so that the exchange won't get angry at us
-        if not already_exists:
-            time.sleep(backup_driver.sleep_time)
-
     # now try fetching from database again. Why? because we might have fetched more
     # than what's needed, but we only want as much was requested. Don't worry, the next
     # request will probably fetch from database and there won't be any waste!
@@ -333,6 +338,96 @@ def _get_candles_from_backup_exchange(exchange: str, backup_driver: CandleExchan
         return total_candles
 
 
+def _parse_start_date(start_date_str: str) -> int:
+    try:
+        start_timestamp = jh.arrow_to_timestamp(arrow.get(start_date_str, 'YYYY-MM-DD'))
+    except:
+        raise ValueError(
+            f'start_date must be a string representing a date before today. ex: 2020-01-17. You entered: {start_date_str}')
+
+    # more start_date validations
+    today = arrow.utcnow().floor('day').int_timestamp * 1000
+    if start_timestamp == today:
+        raise ValueError("Today's date is not accepted. start_date must be a string a representing date BEFORE today.")
+    elif start_timestamp > today:
+        raise ValueError("Future's date is not accepted. start_date must be a string a representing date BEFORE today.")
+
+    return start_timestamp
+
+
+def _pages(driver: CandleExchange, exchange: str, symbol: str, start_timestamp: int) -> Tuple[list, list]:
+    """
+    The (start, end) timestamps of the pages of driver.count candles since start_timestamp, and
+    the ones of them that aren't imported yet
+    """
+    # which days are already imported, so that they aren't counted one by one
+    coverage = fetch_coverage(exchange, symbol, '1m', start_timestamp, jh.now_to_timestamp())
+
+    # to make sure it won't try to import candles from the future! LOL
+    pages = []
+    temp_start_timestamp = start_timestamp
+    while temp_start_timestamp <= jh.now_to_timestamp():
+        pages.append((temp_start_timestamp, temp_start_timestamp + (driver.count - 1) * 60000))
+        temp_start_timestamp += driver.count * 60000
+    # prevent duplicates calls to boost performance
+    missing_pages = [page for page in pages if not _is_imported(coverage, exchange, symbol, *page)]
+
+    return pages, missing_pages
+
+
+# the number of the fetched candles that are stored at once
+_STORE_BATCH_SIZE = 14_400
+
+
+def _page_end(end_timestamp: int) -> int:
+    # it's today's candles if end_timestamp < now
+    if end_timestamp > jh.now_to_timestamp():
+        return arrow.utcnow().floor('minute').int_timestamp * 1000 - 60000
+    return end_timestamp
+
+
+def _fetch_page(driver: CandleExchange, symbol: str, start_timestamp: int, end_timestamp: int) -> Tuple[List[Dict], bool]:
+    """
+    Fetches the 1m candles of the page and whether they start late (or there are none). Those that
+    start in time are filled already, the others are left to the importer, which decides whether
+    they're before the listing of the symbol or a gap in its history (which is filled as well).
+    """
+    candles = driver.fetch(symbol, start_timestamp, timeframe='1m')
+    if not _starts_at(candles, start_timestamp):
+        return candles, True
+    # fill absent candles (if there's any)
+    return _fill_absent_candles(candles, start_timestamp, _page_end(end_timestamp)), False
+
+
+def _starts_at(candles: List[Dict], start_timestamp: int) -> bool:
+    """
+    Whether candles have been returned and those returned start with the right timestamp
+    """
+    time_diff = int((candles[0]['timestamp'] - start_timestamp) / 1000) if len(candles) else 0
+    return len(candles) > 0 and 0 <= time_diff <= 60 * 100
+
+
+def _is_imported(coverage: dict, exchange: str, symbol: str, start_timestamp: int, end_timestamp: int) -> bool:
+    """
+    Whether all the 1m candles between the two timestamps are in the database. The coverage
+    (see fetch_coverage()) answers it for the windows of the complete days and of the days without
+    any candles; only the ones that overlap a partially imported day are counted in the database.
+    """
+    days = range(start_timestamp - start_timestamp % 86_400_000, end_timestamp + 1, 86_400_000)
+    if all(coverage.get(day) == 1440 for day in days):
+        return True
+    if not any(day in coverage for day in days):
+        return False
+
+    count = Candle.select().where(
+        Candle.exchange == exchange,
+        Candle.symbol == symbol,
+        Candle.timeframe == '1m',
+        Candle.timestamp.between(start_timestamp, end_timestamp)
+    ).count()
+    return count == (end_timestamp - start_timestamp) // 60_000 + 1
+
+
 def _fill_absent_candles(temp_candles: List[Dict[str, Union[str, Any]]], start_timestamp: int, end_timestamp: int) -> \
         List[Dict[str, Union[str, Any]]]:
     if not temp_candles:
@@ -347,10 +442,13 @@ def _fill_absent_candles(temp_candles: List[Dict[str, Union[str, Any]]], start_t
     first_candle = temp_candles[0]
     started = False
     loop_length = ((end_timestamp - start_timestamp) / 60000) + 1
+    # the first candle of each timestamp
+    candles_by_timestamp = {}
+    for c in temp_candles:
+        candles_by_timestamp.setdefault(c['timestamp'], c)
 
     for _ in range(int(loop_length)):
-        candle_for_timestamp = pydash.find(
-            temp_candles, lambda c: c['timestamp'] == start_timestamp)
+        candle_for_timestamp = candles_by_timestamp.get(start_timestamp)
 
         if candle_for_timestamp is None:
             if started:
@@ -390,8 +488,49 @@ def _fill_absent_candles(temp_candles: List[Dict[str, Union[str, Any]]], start_t
 
 
 def store_candles_list(candles: List[Dict]) -> None:
-    from jesse.models import Candle
+    from jesse.models.Candle import store_candles_into_db
+
+    # group them by their market, since each COPY is of a single market
+    markets = {}
     for c in candles:
         if 'timeframe' not in c:
             raise Exception('Candle has no timeframe')
-    Candle.insert_many(candles).on_conflict_ignore().execute()
+        markets.setdefault((c['exchange'], c['symbol'], c['timeframe']), []).append(
+            (c['timestamp'], c['open'], c['close'], c['high'], c['low'], c['volume'])
+        )
+
+    for (exchange, symbol, timeframe), rows in markets.items():
+        store_candles_into_db(exchange, symbol, timeframe, np.array(rows, dtype=np.float64), on_conflict='ignore')
+
+
+def import_candles_from_file(
+        path: str, exchange: str, symbol: str, on_conflict: str = 'ignore', chunk_size: int = 1_000_000
+) -> int:
+    """
+    Stores the 1m candles of a file in the database and returns their count. The file is either
+    a .npy file of (n, 6) candles or a CSV file with the columns timestamp, open, close, high,
+    low and volume (in this order) and a header row. CSV files are read in chunks of chunk_size rows.
+    """
+    from jesse.models.Candle import store_candles_into_db
+
+    if not jh.file_exists(path):
+        raise FileNotFoundError(f'File not found: {path}')
+
+    if path.endswith('.npy'):
+        candles = np.load(path, mmap_mode='r')
+        if candles.ndim != 2 or candles.shape[1] != 6:
+            raise ValueError(f'Expected the candles in {path} to be of shape (n, 6), got {candles.shape}')
+        chunks = (candles[i:i + chunk_size] for i in range(0, len(candles), chunk_size))
+    else:
+        import pandas as pd
+        chunks = (
+            chunk.to_numpy(dtype=np.float64)
+            for chunk in pd.read_csv(path, usecols=range(6), chunksize=chunk_size)
+        )
+
+    count = 0
+    for chunk in chunks:
+        if len(chunk):
+            store_candles_into_db(exchange, symbol, '1m', chunk, on_conflict=on_conflict)
+            count += len(chunk)
+    return count
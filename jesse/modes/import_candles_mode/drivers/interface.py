@@ -7,6 +7,7 @@ class CandleExchange(ABC):
     def __init__(self, name: str, count: int, rate_limit_per_second: float, backup_exchange_class):
         self.name = name
         self.count = count
+        self.rate_limit_per_second = rate_limit_per_second
         self.sleep_time = 1 / rate_limit_per_second
         self._backup_exchange_class = backup_exchange_class
         self._backup_exchange = None
@@ -0,0 +1,76 @@
+"""
+The stages of importing candles that run concurrently: the pages of candles are fetched (and
+filled) by a pool of threads, whose requests are spaced by a token bucket so that the rate
+limit of the exchange is respected, while the importer stores the pages that are already
+fetched. The pages are handed over in order, and only a few of them are fetched ahead, so the
+memory stays bounded no matter how long the range is.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Tuple
+
+
+class RateLimiter:
+    """
+    A token bucket: lets rate_per_second calls through per second on average, and at most
+    burst of them at once.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int = 1) -> None:
+        self.rate = rate_per_second
+        self.capacity = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Blocks until the call is allowed
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def fetch_concurrently(
+        fetch: Callable[[Any], Any], items: Iterable, concurrency: int, limiter: RateLimiter
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    Yields each item with fetch(item), in the order of the items. The fetches run on
+    "concurrency" threads, each of them after acquiring the limiter, and at most twice as many
+    as the threads are fetched ahead of the one that's being consumed. The exceptions of
+    fetch() are raised when their item is reached.
+    """
+    def limited_fetch(item):
+        limiter.acquire()
+        return fetch(item)
+
+    items = iter(items)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    pending = deque()
+    try:
+        for item in items:
+            pending.append((item, executor.submit(limited_fetch, item)))
+            if len(pending) >= 2 * concurrency:
+                break
+
+        while pending:
+            item, future = pending.popleft()
+            result = future.result()
+            # keep the queue full
+            for next_item in items:
+                pending.append((next_item, executor.submit(limited_fetch, next_item)))
+                break
+            yield item, result
+    finally:
+        # such as when the consumer stops early, don't wait for the pages that aren't needed anymore
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -115,4 +115,15 @@ def _get_training_and_testing_candles(
     # fetch testing candles
     testing_warmup_candles, testing_candles = load_candles(testing_start_date_timestamp, testing_finish_date_timestamp)
 
+    # the candles are held for the whole session and passed to every trial, hence the option
+    # to hold them compact (each trial expands the ones it backtests on)
+    if jh.get_config('env.data.compact_candles', False):
+        training_warmup_candles, training_candles, testing_warmup_candles, testing_candles = (
+            _compact_candles(c) for c in (training_warmup_candles, training_candles, testing_warmup_candles, testing_candles)
+        )
+
     return training_warmup_candles, training_candles, testing_warmup_candles, testing_candles
+
+
+def _compact_candles(candles: dict) -> dict:
+    return {key: {**value, 'candles': jh.compact_candles(value['candles'])} for key, value in candles.items()}
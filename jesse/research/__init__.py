@@ -1,3 +1,3 @@
 from .candles import get_candles, store_candles, fake_candle, fake_range_candles, candles_from_close_prices
 from .backtest import backtest
-from .import_candles import import_candles
+from .import_candles import import_candles, import_candles_batch
@@ -16,7 +16,10 @@ def backtest(
         generate_json: bool = False,
         generate_logs: bool = False,
         hyperparameters: dict = None,
-        fast_mode: bool = False
+        fast_mode: bool = False,
+        event_mode: bool = False,
+        generate_phases_timing: bool = False,
+        generate_hooks_profile: bool = False
 ) -> dict:
     """
     An isolated backtest() function which is perfect for using in research, and AI training
@@ -48,6 +51,9 @@ def backtest(
             'candles': np.array([]),
         },
     }
+
+    The candles (and the warmup candles) can also be compact ones to save memory while
+    holding them; see jesse.helpers.compact_candles().
     """
     return _isolated_backtest(
         config,
@@ -65,6 +71,9 @@ def backtest(
         generate_hyperparameters=generate_hyperparameters,
         generate_logs=generate_logs,
         fast_mode=fast_mode,
+        event_mode=event_mode,
+        generate_phases_timing=generate_phases_timing,
+        generate_hooks_profile=generate_hooks_profile,
     )
 
 
@@ -84,6 +93,9 @@ def _isolated_backtest(
         generate_hyperparameters: bool = False,
         generate_logs: bool = False,
         fast_mode: bool = False,
+        event_mode: bool = False,
+        generate_phases_timing: bool = False,
+        generate_hooks_profile: bool = False,
 ) -> dict:
     from jesse.services.validators import validate_routes
     from jesse.modes.backtest_mode import simulator
@@ -104,6 +116,12 @@ def _isolated_backtest(
 
     validate_routes(router)
 
+    # the API's drivers are initiated only once (when it's first imported), hence the exchanges
+    # that no earlier backtest of the process used have none, and their orders would be dropped
+    from jesse.services.api import api
+    if any(e not in api.drivers for e in jesse_config['app']['considering_exchanges']):
+        api.initiate_drivers()
+
     # initiate candle store
     store.candles.init_storage(5000)
 
@@ -119,8 +137,13 @@ def _isolated_backtest(
                 f'the accepted 60000 milliseconds.'
             )
 
-    # make a copy to make sure we don't mutate the past data causing some issues for multiprocessing tasks
-    trading_candles_dict = copy.deepcopy(candles)
+    # make a copy to make sure we don't mutate the past data causing some issues for multiprocessing tasks.
+    # compact candles are expanded for the simulation instead, which copies them anyway
+    trading_candles_dict = {
+        key: {**value, 'candles': jh.expand_candles(value['candles'])}
+        if jh.is_compact_candles(value['candles']) else copy.deepcopy(value)
+        for key, value in candles.items()
+    }
     warmup_candles_dict = copy.deepcopy(warmup_candles)
 
     # if warmup_candles is passed, use it
@@ -147,11 +170,15 @@ def _isolated_backtest(
         generate_hyperparameters=generate_hyperparameters,
         generate_logs=generate_logs,
         fast_mode=fast_mode,
+        event_mode=event_mode,
+        generate_phases_timing=generate_phases_timing,
+        generate_hooks_profile=generate_hooks_profile,
     )
 
     result = {
         'metrics': {'total': 0, 'win_rate': 0, 'net_profit_percentage': 0},
         'logs': None,
+        'indicators_cache': backtest_result['indicators_cache'],
     }
 
     if backtest_result['metrics'] is None:
@@ -171,6 +198,10 @@ def _isolated_backtest(
         result['hyperparameters'] = backtest_result['hyperparameters']
     if generate_logs:
         result['logs'] = backtest_result['logs']
+    if generate_phases_timing:
+        result['phases_timing'] = backtest_result['phases_timing']
+    if generate_hooks_profile:
+        result['hooks_profile'] = backtest_result['hooks_profile']
 
     # reset store and config so rerunning would be flawlessly possible
     reset_config()
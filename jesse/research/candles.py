@@ -28,7 +28,7 @@ def store_candles(candles: np.ndarray, exchange: str, symbol: str) -> None:
     Stores candles in the database. The stored data can later be used for being fetched again via get_candles or even for running backtests on them.
     A common use case for this function is for importing candles from a CSV file so you can later use them for backtesting.
     """
-    from jesse.modes.import_candles_mode import store_candles_list as store_candles_from_list
+    from jesse.models.Candle import store_candles_into_db
     import jesse.helpers as jh
 
     # check if .env file exists
@@ -49,21 +49,8 @@ def store_candles(candles: np.ndarray, exchange: str, symbol: str) -> None:
             f'more than the accepted 60000 milliseconds.'
         )
 
-    arr = [{
-        'id': jh.generate_unique_id(),
-        'exchange': exchange,
-        'symbol': symbol,
-        'timeframe': '1m',
-        'timestamp': c[0],
-        'open': c[1],
-        'close': c[2],
-        'high': c[3],
-        'low': c[4],
-        'volume': c[5]
-    } for c in candles]
-
     if not jh.is_unit_testing():
-        store_candles_from_list(arr)
+        store_candles_into_db(exchange, symbol, '1m', candles)
 
 
 def fake_candle(attributes: dict = None, reset: bool = False) -> np.ndarray:
@@ -14,3 +14,21 @@ def import_candles(
         running_via_dashboard=False,
         show_progressbar=show_progressbar
     )
+
+
+def import_candles_batch(
+    exchange: str,
+    symbols: list,
+    start_date: str,
+    show_progressbar: bool = True,
+) -> str:
+    from jesse.modes.import_candles_mode import run_batch
+
+    return run_batch(
+        client_id='',
+        exchange=exchange,
+        symbols=symbols,
+        start_date_str=start_date,
+        running_via_dashboard=False,
+        show_progressbar=show_progressbar
+    )
@@ -1,5 +1,7 @@
 import os
 import pickle
+import sqlite3
+import threading
 from time import time
 from typing import Any
 from functools import lru_cache
@@ -8,111 +10,174 @@ import jesse.helpers as jh
 
 
 class Cache:
+    """
+    Caches pickled values in files, indexed by an SQLite database. Hence, setting or getting a
+    value only writes its own row of the index (instead of the whole index), and the processes
+    of backtests and optimizations can share the cache safely.
+
+    When the total size of the files exceeds env.caching.max_size_mb, the least recently used
+    values are evicted.
+    """
+
     def __init__(self, path: str) -> None:
         self.path = path
         self.driver = jh.get_config('env.caching.driver', 'pickle')
+        self._connection = None
+        self._connection_pid = None
+        self._lock = threading.Lock()
 
         if self.driver == 'pickle':
             # make sure path exists
             os.makedirs(path, exist_ok=True)
 
-            # if cache_database exists, load the dictionary
-            if os.path.isfile(f"{self.path}cache_database.pickle"):
-                with open(f"{self.path}cache_database.pickle", 'rb') as f:
-                    try:
-                        self.db = pickle.load(f)
-                    except (EOFError, pickle.UnpicklingError, UnicodeDecodeError):
-                        # File got broken
-                        self.db = {}
-            # if not, create a dict object. We'll create the file when using set_value()
-            else:
-                self.db = {}
+    @property
+    def db(self) -> sqlite3.Connection:
+        # a connection must not be shared with forked processes
+        if self._connection is None or self._connection_pid != os.getpid():
+            os.makedirs(self.path, exist_ok=True)
+            self._connection = sqlite3.connect(
+                f"{self.path}cache_database.sqlite", timeout=30, check_same_thread=False
+            )
+            self._connection_pid = os.getpid()
+            # lets the readers and the writer of different processes work concurrently
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS items ('
+                'key TEXT PRIMARY KEY, path TEXT NOT NULL, size INTEGER NOT NULL, '
+                'expire_seconds REAL, expire_at REAL, accessed_at REAL NOT NULL)'
+            )
+            self._connection.commit()
+            self._import_pickle_database()
+        return self._connection
+
+    def _import_pickle_database(self) -> None:
+        # the index of the older versions, which rewrote all of it on every change
+        legacy_path = f"{self.path}cache_database.pickle"
+        if not os.path.isfile(legacy_path):
+            return
+
+        try:
+            with open(legacy_path, 'rb') as f:
+                items = pickle.load(f)
+        except (EOFError, pickle.UnpicklingError, UnicodeDecodeError):
+            # File got broken
+            items = {}
+        with self._connection:
+            for key, item in items.items():
+                if os.path.exists(item['path']):
+                    self._connection.execute(
+                        'INSERT OR IGNORE INTO items VALUES (?, ?, ?, ?, ?, ?)',
+                        (key, item['path'], os.path.getsize(item['path']), item['expire_seconds'],
+                         item['expire_at'], time())
+                    )
+        try:
+            os.remove(legacy_path)
+        except FileNotFoundError:
+            pass
 
     def set_value(self, key: str, data: Any, expire_seconds: int = 60 * 60) -> None:
         if self.driver is None:
             return
 
-        # add record into the database
-        expire_at = None if expire_seconds is None else time() + expire_seconds
+        # store file. It's written under a temporary name first, so that other processes never read a partial one
         data_path = f"{self.path}{key}.pickle"
-        self.db[key] = {
-            'expire_seconds': expire_seconds,
-            'expire_at': expire_at,
-            'path': data_path,
-        }
-        self._update_db()
-
-        # store file
-        with open(data_path, 'wb') as f:
+        temp_path = f"{data_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
             pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        size = os.path.getsize(temp_path)
+        os.replace(temp_path, data_path)
+
+        # add record into the database
+        now = time()
+        expire_at = None if expire_seconds is None else now + expire_seconds
+        with self._lock, self.db:
+            self.db.execute(
+                'INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?)',
+                (key, data_path, size, expire_seconds, expire_at, now)
+            )
+        self._evict()
+
+    def _evict(self) -> None:
+        max_size_mb = jh.get_config('env.caching.max_size_mb', None)
+        if max_size_mb is None:
+            return
+
+        # it's a string when it's set by an environment variable
+        budget = float(max_size_mb) * 1024 * 1024
+        with self._lock, self.db:
+            total = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM items').fetchone()[0]
+            if total <= budget:
+                return
+
+            # the least recently used ones first
+            evicted = []
+            for key, path, size in self.db.execute('SELECT key, path, size FROM items ORDER BY accessed_at'):
+                if total <= budget:
+                    break
+                evicted.append((key, path))
+                total -= size
+            self.db.executemany('DELETE FROM items WHERE key = ?', [(key,) for key, _ in evicted])
+
+        for _, path in evicted:
+            self._remove_file(path)
 
     def get_value(self, key: str) -> Any:
         if self.driver is None:
             raise ValueError('Caching driver is not set.')
 
-        try:
-            item = self.db[key]
-        except KeyError:
+        with self._lock:
+            row = self.db.execute(
+                'SELECT path, expire_seconds, expire_at FROM items WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
             return False
+        path, expire_seconds, expire_at = row
 
         # if expired, remove file, and database record
-        if item['expire_at'] is not None and time() > item['expire_at']:
-            try:
-                os.remove(item['path'])
-            except FileNotFoundError:
-                pass
-            del self.db[key]
-            self._update_db()
+        now = time()
+        if expire_at is not None and now > expire_at:
+            self._remove(key, path)
             return False
 
-        # If the cache file doesn't exist, remove the database record
-        if not os.path.exists(item['path']):
-            del self.db[key]
-            self._update_db()
-            return False
-
-        # renew cache expiration time
-        if item['expire_at'] is not None:
-            item['expire_at'] = time() + item['expire_seconds']
-            self._update_db()
-
         try:
-            with open(item['path'], 'rb') as f:
+            with open(path, 'rb') as f:
                 cache_value = pickle.load(f)
         except (EOFError, pickle.UnpicklingError, FileNotFoundError):
-            # If there's any error reading the file, remove the record and return False
-            try:
-                os.remove(item['path'])
-            except FileNotFoundError:
-                pass
-            del self.db[key]
-            self._update_db()
+            # If the file doesn't exist or there's any error reading it, remove the record and return False
+            self._remove(key, path)
             return False
 
+        # renew cache expiration time, and mark it as the most recently used
+        with self._lock, self.db:
+            self.db.execute(
+                'UPDATE items SET accessed_at = ?, expire_at = ? WHERE key = ?',
+                (now, None if expire_seconds is None else now + expire_seconds, key)
+            )
+
         return cache_value
 
-    def _update_db(self) -> None:
-        # store/update database
-        with open(f"{self.path}cache_database.pickle", 'wb') as f:
-            pickle.dump(self.db, f, protocol=pickle.HIGHEST_PROTOCOL)
+    def _remove(self, key: str, path: str) -> None:
+        with self._lock, self.db:
+            self.db.execute('DELETE FROM items WHERE key = ?', (key,))
+        self._remove_file(path)
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
 
     def flush(self) -> None:
         if self.driver is None:
             return
 
-        # Create a list of keys to remove to avoid modifying dict during iteration
-        keys_to_remove = list(self.db.keys())
-        
-        for key in keys_to_remove:
-            item = self.db[key]
-            try:
-                os.remove(item['path'])
-            except FileNotFoundError:
-                pass
-            del self.db[key]
-        
-        # Update the database file after clearing
-        self._update_db()
+        with self._lock, self.db:
+            paths = [path for path, in self.db.execute('SELECT path FROM items')]
+            self.db.execute('DELETE FROM items')
+
+        for path in paths:
+            self._remove_file(path)
 
 
 cache = Cache("storage/temp/")
@@ -3,8 +3,9 @@ import numpy as np
 import arrow
 from jesse.exceptions import CandleNotFoundInDatabase, InvalidDateRange
 import jesse.helpers as jh
-from jesse.services import logger
+from jesse.services import fill_engine, logger
 from jesse.models import Candle
+from jesse.models.CandleRollup import rollup_timeframe_for, fetch_rollups_from_db
 from typing import List, Dict
 
 
@@ -31,6 +32,36 @@ def generate_candle_from_one_minutes(
     ])
 
 
+def generate_bigger_timeframe_candles(timeframe: str, candles: np.ndarray, source_timeframe: str = '1m') -> np.ndarray:
+    """
+    Vectorized version of generate_candle_from_one_minutes() which generates every complete
+    candle of the requested timeframe from a whole array of 1m candles in one pass. The
+    trailing 1m candles that don't fill up a complete candle are ignored.
+
+    :param timeframe: str
+    :param candles: np.ndarray
+    :param source_timeframe: str - the timeframe of the candles, if they're not 1m candles
+
+    :return: np.ndarray
+    """
+    num = jh.timeframe_to_one_minutes(timeframe) // jh.timeframe_to_one_minutes(source_timeframe)
+    count = len(candles) // num
+
+    if count == 0:
+        return np.zeros((0, 6))
+
+    blocks = candles[:count * num].reshape(count, num, 6)
+    generated_candles = np.empty((count, 6))
+    generated_candles[:, 0] = blocks[:, 0, 0]
+    generated_candles[:, 1] = blocks[:, 0, 1]
+    generated_candles[:, 2] = blocks[:, -1, 2]
+    generated_candles[:, 3] = blocks[:, :, 3].max(axis=1)
+    generated_candles[:, 4] = blocks[:, :, 4].min(axis=1)
+    generated_candles[:, 5] = blocks[:, :, 5].sum(axis=1)
+
+    return generated_candles
+
+
 def candle_dict_to_np_array(candle: dict) -> np.ndarray:
     return np.array([
         candle['timestamp'],
@@ -82,93 +113,15 @@ def split_candle(candle: np.ndarray, price: float) -> tuple:
 
     :return: tuple
     """
-    timestamp = candle[0]
-    o = candle[1]
-    c = candle[2]
-    h = candle[3]
-    l = candle[4]
-    v = candle[5]
-
-    if is_bullish(candle) and l < price < o:
-        return np.array([
-            timestamp, o, price, o, price, v
-        ]), np.array([
-            timestamp, price, c, h, l, v
-        ])
-    elif price == o:
-        return candle, candle
-    elif is_bearish(candle) and o < price < h:
-        return np.array([
-            timestamp, o, price, price, o, v
-        ]), np.array([
-            timestamp, price, c, h, l, v
-        ])
-    elif is_bearish(candle) and l < price < c:
-        return np.array([
-            timestamp, o, price, h, price, v
-        ]), np.array([
-            timestamp, price, c, c, l, v
-        ])
-    elif is_bullish(candle) and c < price < h:
-        return np.array([
-            timestamp, o, price, price, l, v
-        ]), np.array([
-            timestamp, price, c, h, c, v
-        ]),
-    elif is_bearish(candle) and price == c:
-        return np.array([
-            timestamp, o, c, h, c, v
-        ]), np.array([
-            timestamp, price, price, price, l, v
-        ])
-    elif is_bullish(candle) and price == c:
-        return np.array([
-            timestamp, o, c, c, l, v
-        ]), np.array([
-            timestamp, price, price, h, price, v
-        ])
-    elif is_bearish(candle) and price == h:
-        return np.array([
-            timestamp, o, h, h, o, v
-        ]), np.array([
-            timestamp, h, c, h, l, v
-        ])
-    elif is_bullish(candle) and price == l:
-        return np.array([
-            timestamp, o, l, o, l, v
-        ]), np.array([
-            timestamp, l, c, h, l, v
-        ])
-    elif is_bearish(candle) and price == l:
-        return np.array([
-            timestamp, o, l, h, l, v
-        ]), np.array([
-            timestamp, l, c, c, l, v
-        ])
-    elif is_bullish(candle) and price == h:
-        return np.array([
-            timestamp, o, h, h, l, v
-        ]), np.array([
-            timestamp, h, c, h, c, v
-        ])
-    elif is_bearish(candle) and c < price < o:
-        return np.array([
-            timestamp, o, price, h, price, v
-        ]), np.array([
-            timestamp, price, c, price, l, v
-        ])
-    elif is_bullish(candle) and o < price < c:
-        return np.array([
-            timestamp, o, price, price, l, v
-        ]), np.array([
-            timestamp, price, c, h, price, v
-        ])
+    return fill_engine.split_candle(np.asarray(candle, dtype=np.float64), float(price))
 
 
 def inject_warmup_candles_to_store(candles: np.ndarray, exchange: str, symbol: str) -> None:
     if candles is None or candles.size == 0:
         raise ValueError(f'Could not inject warmup candles because the passed candles are empty. Have you imported enough warmup candles for {exchange}/{symbol}?')
 
+    candles = jh.expand_candles(candles)
+
     from jesse.config import config
     from jesse.store import store
 
@@ -220,15 +173,26 @@ def get_candles(
         'day').int_timestamp * 1000) - 60_000
 
     # if warmup_candles is set, calculate the warmup start and finish timestamps
+    warmup_candles = None
     if warmup_candles_num > 0:
         warmup_finish_timestamp = trading_start_date_timestamp
         warmup_start_timestamp = warmup_finish_timestamp - (
                 warmup_candles_num * jh.timeframe_to_one_minutes(timeframe) * 60_000)
         warmup_finish_timestamp -= 60_000
-        warmup_candles = _get_candles_from_db(exchange, symbol, warmup_start_timestamp, warmup_finish_timestamp,
-                                              caching=caching)
-    else:
-        warmup_candles = None
+        if timeframe == '1m' or is_for_jesse or rollup_timeframe_for(timeframe) is None:
+            warmup_candles = _get_candles_from_db(exchange, symbol, warmup_start_timestamp, warmup_finish_timestamp,
+                                                  caching=caching)
+
+    # the candles of bigger timeframes are generated from their rollups instead, when there are any
+    if timeframe != '1m' and not is_for_jesse and rollup_timeframe_for(timeframe) is not None:
+        if warmup_candles_num > 0:
+            warmup_candles = _get_generated_candles_from_db(
+                exchange, symbol, timeframe, warmup_start_timestamp, warmup_finish_timestamp
+            )
+        trading_candles = _get_generated_candles_from_db(
+            exchange, symbol, timeframe, trading_start_date_timestamp, trading_finish_date_timestamp
+        )
+        return warmup_candles, trading_candles
 
     # fetch trading candles from database
     trading_candles = _get_candles_from_db(exchange, symbol, trading_start_date_timestamp,
@@ -249,20 +213,7 @@ def get_candles(
     return warmup_candles, trading_candles
 
 
-def _get_candles_from_db(
-        exchange, symbol, start_date_timestamp, finish_date_timestamp, caching: bool = False
-) -> np.ndarray:
-    from jesse.models import Candle
-    from jesse.services.cache import cache
-
-    if caching:
-        key = jh.key(exchange, symbol)
-        cache_key = f"{start_date_timestamp}-{finish_date_timestamp}-{key}"
-        cached_value = cache.get_value(cache_key)
-        if cached_value:
-            return np.array(cached_value)
-
-    # validate the dates
+def _validate_date_range(start_date_timestamp: int, finish_date_timestamp: int) -> None:
     if start_date_timestamp == finish_date_timestamp:
         raise InvalidDateRange('start_date and finish_date cannot be the same.')
     if start_date_timestamp > finish_date_timestamp:
@@ -279,24 +230,23 @@ def _get_candles_from_db(
     if start_date_timestamp > current_timestamp:
         raise InvalidDateRange(f'Can\'t backtest the future! start_date ({jh.timestamp_to_date(start_date_timestamp)}) is greater than the current time ({jh.timestamp_to_date(current_timestamp)}).')
 
-    # Always materialize the database results immediately
-    candles_tuple = list(Candle.select(
-        Candle.timestamp, Candle.open, Candle.close, Candle.high, Candle.low,
-        Candle.volume
-    ).where(
-        Candle.exchange == exchange,
-        Candle.symbol == symbol,
-        Candle.timeframe == '1m' or Candle.timeframe.is_null(),
-        Candle.timestamp.between(start_date_timestamp, finish_date_timestamp)
-    ).order_by(Candle.timestamp.asc()).tuples())
+
+def _get_candles_from_db(
+        exchange, symbol, start_date_timestamp, finish_date_timestamp, caching: bool = False
+) -> np.ndarray:
+    from jesse.services.candles_cache import candles_cache
+
+    _validate_date_range(start_date_timestamp, finish_date_timestamp)
+
+    if caching:
+        candles_array = candles_cache.get_candles(exchange, symbol, start_date_timestamp, finish_date_timestamp)
+    else:
+        candles_array = _fetch_candles_from_db(exchange, symbol, start_date_timestamp, finish_date_timestamp)
 
     # Check if we got any candles
-    if not candles_tuple:
+    if not len(candles_array):
         raise CandleNotFoundInDatabase(f"No candles found for {symbol} on {exchange} between {jh.timestamp_to_date(start_date_timestamp)} and {jh.timestamp_to_date(finish_date_timestamp)}.")
-    
-    # Convert to numpy array for easier timestamp extraction
-    candles_array = np.array(candles_tuple)
-    
+
     # Verify the retrieved data covers the requested range
     if len(candles_array) > 0:
         earliest_available = candles_array[0][0]  # First timestamp
@@ -321,78 +271,142 @@ def _get_candles_from_db(
                 f"but latest available candle is up to \"{jh.timestamp_to_time(latest_available)[:19]}\"."
             )
 
-    if caching:
-        # cache for 1 week it for near future calls
-        cache.set_value(cache_key, candles_tuple, expire_seconds=60 * 60 * 24 * 7)
-
     return candles_array
 
 
-def _get_generated_candles(timeframe, trading_candles) -> np.ndarray:
-    # generate candles for the requested timeframe
-    generated_candles = []
-    for i in range(len(trading_candles)):
-        num = jh.timeframe_to_one_minutes(timeframe)
+def _fetch_candles_from_db(exchange: str, symbol: str, start_date_timestamp: int, finish_date_timestamp: int) -> np.ndarray:
+    """
+    The 1m candles of the range (inclusive) in the database, as an (n, 6) array
+    """
+    from jesse.models.Candle import fetch_candles_from_db
+
+    return fetch_candles_from_db(exchange, symbol, '1m', start_date_timestamp, finish_date_timestamp)
+
+
+def _get_generated_candles_from_db(
+        exchange: str, symbol: str, timeframe: str, start_date_timestamp: int, finish_date_timestamp: int
+) -> np.ndarray:
+    """
+    The same as generating the candles of the timeframe from the result of _get_candles_from_db(),
+    but from the rollups of the 1m candles (as far as they go)
+    """
+    _validate_date_range(start_date_timestamp, finish_date_timestamp)
+
+    candles = generate_candles_from_db(exchange, symbol, timeframe, start_date_timestamp, finish_date_timestamp)
+
+    duration = jh.timeframe_to_one_minutes(timeframe) * 60_000
+    if not len(candles):
+        raise CandleNotFoundInDatabase(f"No candles found for {symbol} on {exchange} between {jh.timestamp_to_date(start_date_timestamp)} and {jh.timestamp_to_date(finish_date_timestamp)}.")
+    if candles[0][0] > start_date_timestamp + 60_000:
+        raise CandleNotFoundInDatabase(
+            f"Missing candles for {symbol} on {exchange}. "
+            f"Requested data from {jh.timestamp_to_date(start_date_timestamp)}, "
+            f"but earliest available candle is from {jh.timestamp_to_date(candles[0][0])}."
+        )
+    if candles[-1][0] + duration - 60_000 < finish_date_timestamp:
+        raise CandleNotFoundInDatabase(
+            f"Missing recent candles for \"{symbol}\" on \"{exchange}\". "
+            f"Requested data until \"{jh.timestamp_to_time(finish_date_timestamp)[:19]}\", "
+            f"but latest available candle is up to \"{jh.timestamp_to_time(candles[-1][0] + duration - 60_000)[:19]}\"."
+        )
+
+    return candles
+
+
+def generate_candles_from_db(
+        exchange: str, symbol: str, timeframe: str, start_date_timestamp: int, finish_date_timestamp: int
+) -> np.ndarray:
+    """
+    The complete candles of the timeframe generated from the 1m candles of the range (inclusive),
+    the first of which starts at start_date_timestamp. They're generated from the biggest suitable
+    rollup (see CandleRollup) for as long as its candles are all there, and from the 1m candles
+    for the rest of the range.
+    """
+    start_date_timestamp = int(start_date_timestamp)
+    duration = jh.timeframe_to_one_minutes(timeframe) * 60_000
+    rollup_timeframe = rollup_timeframe_for(timeframe) or '1m'
+    rollup_duration = jh.timeframe_to_one_minutes(rollup_timeframe) * 60_000
+    candles = np.empty((0, 6))
+    if rollup_timeframe != '1m':
+        rollups = fetch_rollups_from_db(
+            exchange, symbol, rollup_timeframe, start_date_timestamp, finish_date_timestamp + 60_000 - rollup_duration
+        )
+        # only the rollups up to the first missing one are used
+        missing = np.flatnonzero(rollups[:, 0] != start_date_timestamp + np.arange(len(rollups)) * rollup_duration)
+        candles = rollups[:missing[0]] if len(missing) else rollups
+
+    rest_start_timestamp = start_date_timestamp + len(candles) * rollup_duration
+    if rest_start_timestamp < finish_date_timestamp:
+        one_minute_candles = _fetch_candles_from_db(exchange, symbol, rest_start_timestamp, finish_date_timestamp)
+        # leave out the 1m candles before the beginning of the first candle (if some are missing)
+        alignment = rollup_duration if len(candles) else duration
+        aligned = np.flatnonzero((one_minute_candles[:, 0] - start_date_timestamp) % alignment == 0)
+        one_minute_candles = one_minute_candles[aligned[0]:] if len(aligned) else one_minute_candles[:0]
+        candles = np.concatenate((candles, generate_bigger_timeframe_candles(rollup_timeframe, one_minute_candles)))
+
+    return generate_bigger_timeframe_candles(timeframe, candles, rollup_timeframe)
 
-        if (i + 1) % num == 0:
-            generated_candles.append(
-                generate_candle_from_one_minutes(
-                    timeframe,
-                    trading_candles[(i - (num - 1)):(i + 1)],
-                    True
-                )
-            )
 
-    return np.array(generated_candles)
+def _get_generated_candles(timeframe, trading_candles) -> np.ndarray:
+    # generate candles for the requested timeframe
+    return generate_bigger_timeframe_candles(timeframe, trading_candles)
 
 
 def get_existing_candles() -> List[Dict]:
     """
     Returns a list of all existing candles grouped by exchange and symbol
     """
-    results = []
-    
-    # Get unique exchange-symbol combinations
-    pairs = Candle.select(
-        Candle.exchange, 
-        Candle.symbol
-    ).distinct().tuples()
-
-    for exchange, symbol in pairs:
-        # Get first and last candle for this pair
-        first = Candle.select(
-            Candle.timestamp
-        ).where(
-            Candle.exchange == exchange,
-            Candle.symbol == symbol
-        ).order_by(
-            Candle.timestamp.asc()
-        ).first()
-
-        last = Candle.select(
-            Candle.timestamp
-        ).where(
-            Candle.exchange == exchange,
-            Candle.symbol == symbol
-        ).order_by(
-            Candle.timestamp.desc()
-        ).first()
-
-        if first and last:
-            results.append({
-                'exchange': exchange,
-                'symbol': symbol,
-                'start_date': arrow.get(first.timestamp / 1000).format('YYYY-MM-DD'),
-                'end_date': arrow.get(last.timestamp / 1000).format('YYYY-MM-DD')
-            })
-
-    return results
+    from jesse.models.CandleCoverage import fetch_coverage_ranges
+
+    # the days of the first and the last candles of every pair, read from the coverage in one query
+    return [
+        {
+            'exchange': exchange,
+            'symbol': symbol,
+            'start_date': arrow.get(first_day / 1000).format('YYYY-MM-DD'),
+            'end_date': arrow.get(last_day / 1000).format('YYYY-MM-DD')
+        }
+        for exchange, symbol, first_day, last_day in fetch_coverage_ranges()
+    ]
+
+
+def rollup_existing_candles(exchange: str = None, symbol: str = None) -> None:
+    """
+    Rolls up all the 1m candles in the database (or those of the exchange and the symbol), such
+    as the ones that were imported before the rollups existed. It's done 30 days at a time.
+    """
+    from jesse.models.CandleRollup import update_rollups
+
+    for pair in get_existing_candles():
+        if exchange is not None and pair['exchange'] != exchange:
+            continue
+        if symbol is not None and pair['symbol'] != symbol:
+            continue
+
+        start = jh.date_to_timestamp(pair['start_date'])
+        finish = jh.date_to_timestamp(pair['end_date']) + 86_400_000 - 60_000
+        for chunk_start in range(start, finish + 1, 30 * 86_400_000):
+            update_rollups(pair['exchange'], pair['symbol'], chunk_start, min(chunk_start + 30 * 86_400_000 - 60_000, finish))
+
 
 def delete_candles(exchange: str, symbol: str) -> None:
     """
     Deletes all candles for the given exchange and symbol
     """
+    from jesse.models.CandleCoverage import CandleCoverage
+    from jesse.models.CandleRollup import CandleRollup
+    from jesse.services.candles_cache import candles_cache
+
     Candle.delete().where(
         Candle.exchange == exchange,
         Candle.symbol == symbol
     ).execute()
+    CandleRollup.delete().where(
+        CandleRollup.exchange == exchange,
+        CandleRollup.symbol == symbol
+    ).execute()
+    CandleCoverage.delete().where(
+        CandleCoverage.exchange == exchange,
+        CandleCoverage.symbol == symbol
+    ).execute()
+    candles_cache.forget(exchange, symbol)
@@ -0,0 +1,156 @@
+"""
+A cache of the 1m candles of the database in binary blocks: one .npy file of float64 (n, 6)
+candles per exchange, symbol and month. The blocks are memory-mapped on load and only the
+requested range of them is copied, hence a hit costs about as much as copying the candles
+(instead of unpickling them), and the processes that read the same blocks share the page cache.
+
+The months that are complete (whose candles have all been fetched) are cached whole. The rest
+are cached in partial blocks: arrays of all the candles of the month, in which the ones that
+haven't been fetched yet are NaN. Hence, a request is served by slicing the blocks, and only
+the gaps of its range that are missing from them are fetched. The candles that were fetched
+but aren't in the database have a timestamp of -1 in the blocks, so that they aren't fetched
+again; storing 1m candles into the database forgets the blocks of their months.
+"""
+import os
+import shutil
+from typing import Callable, Iterator, List, Tuple
+
+import arrow
+import numpy as np
+
+import jesse.helpers as jh
+
+# the timestamp of the candles that aren't in the database
+_ABSENT = -1
+
+
+def _months(start_timestamp: int, finish_timestamp: int) -> Iterator[Tuple[int, int]]:
+    """
+    The timestamps of the first and the last 1m candles of each month of the range
+    """
+    month = jh.timestamp_to_arrow(start_timestamp).floor('month')
+    while jh.arrow_to_timestamp(month) <= finish_timestamp:
+        next_month = month.shift(months=1)
+        yield jh.arrow_to_timestamp(month), jh.arrow_to_timestamp(next_month) - 60_000
+        month = next_month
+
+
+def _gaps(timestamps: np.ndarray, offset: int) -> List[Tuple[int, int]]:
+    """
+    The first and the last indexes (plus the offset) of each run of NaN timestamps
+    """
+    missing = np.concatenate(([False], np.isnan(timestamps), [False]))
+    edges = np.flatnonzero(np.diff(missing.astype(np.int8)))
+    return [(offset + first, offset + last - 1) for first, last in zip(edges[::2], edges[1::2])]
+
+
+class CandlesCache:
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    @property
+    def is_enabled(self) -> bool:
+        return jh.get_config('env.caching.driver', 'pickle') is not None
+
+    def _block_path(self, exchange: str, symbol: str, month_start: int, partial: bool = False) -> str:
+        suffix = '.partial' if partial else ''
+        return f"{self.path}{jh.key(exchange, symbol)}/{jh.timestamp_to_date(month_start)[:7]}{suffix}.npy"
+
+    def get_candles(
+            self, exchange: str, symbol: str, start_timestamp: int, finish_timestamp: int,
+            fetch: Callable[[int, int], np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Returns the 1m candles between the two timestamps (inclusive) the same as
+        fetch(start_timestamp, finish_timestamp) does, using the cached months.
+
+        :param fetch: fetches the 1m candles of a range - default: from the database
+        """
+        if fetch is None:
+            from jesse.models.Candle import fetch_candles_from_db
+            fetch = lambda start, finish: fetch_candles_from_db(exchange, symbol, '1m', start, finish)
+
+        if not self.is_enabled:
+            return fetch(start_timestamp, finish_timestamp)
+
+        now = arrow.utcnow().int_timestamp * 1000
+        parts = []
+        for month_start, month_finish in _months(start_timestamp, finish_timestamp):
+            start = max(start_timestamp, month_start)
+            finish = min(finish_timestamp, month_finish)
+            # the index of each candle in the blocks is known
+            first, last = (start - month_start) // 60_000, (finish - month_start) // 60_000
+
+            path = self._block_path(exchange, symbol, month_start)
+            if os.path.exists(path):
+                requested = np.load(path, mmap_mode='r')[first:last + 1]
+                parts.append(requested[requested[:, 0] != _ABSENT])
+                continue
+
+            partial_path = self._block_path(exchange, symbol, month_start, partial=True)
+            if os.path.exists(partial_path):
+                block = np.load(partial_path, mmap_mode='r')
+                gaps = _gaps(block[first:last + 1, 0], first)
+            else:
+                block = np.full(((month_finish - month_start) // 60_000 + 1, 6), np.nan)
+                # the months that are over are fetched whole, so that they're complete from then on
+                gaps = [(0, len(block) - 1)] if month_finish < now else [(first, last)]
+
+            if gaps:
+                block = np.array(block)
+                for gap_first, gap_last in gaps:
+                    candles = fetch(month_start + gap_first * 60_000, month_start + gap_last * 60_000)
+                    block[gap_first:gap_last + 1, 0] = _ABSENT
+                    block[((candles[:, 0] - month_start) // 60_000).astype(np.int64)] = candles
+
+                if not np.isnan(block[:, 0]).any():
+                    self._store_block(path, block)
+                    self._remove_block(partial_path)
+                else:
+                    self._store_block(partial_path, block)
+
+            requested = block[first:last + 1]
+            # neither the missing candles (NaN) nor the absent ones
+            parts.append(requested[requested[:, 0] >= 0])
+
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return np.empty((0, 6))
+        # copies the requested range out of the memory-mapped blocks
+        return np.concatenate(parts)
+
+    @staticmethod
+    def _store_block(path: str, block: np.ndarray) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write it under a temporary name first, so that other processes never load a partial block
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(block, dtype=np.float64))
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _remove_block(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def forget(self, exchange: str, symbol: str, start_timestamp: int = None, finish_timestamp: int = None) -> None:
+        """
+        Removes the blocks of the exchange and symbol, such as when their candles are deleted. If
+        the timestamps are passed, only the blocks of the months between them are removed, such as
+        when some of their candles are replaced.
+        """
+        if start_timestamp is None:
+            shutil.rmtree(f"{self.path}{jh.key(exchange, symbol)}/", ignore_errors=True)
+            return
+
+        for month_start, _ in _months(start_timestamp, finish_timestamp):
+            self._remove_block(self._block_path(exchange, symbol, month_start))
+            self._remove_block(self._block_path(exchange, symbol, month_start, partial=True))
+
+    def flush(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+candles_cache = CandlesCache("storage/temp/candles/")
@@ -0,0 +1,119 @@
+"""
+Streams the trading candles of a backtest in windows of a fixed number of days, instead of
+loading all of them before the simulation starts. The next window is loaded on a background
+thread while the current one is being simulated, and the simulation keeps only as many of the
+past 1m candles as the warmup needs (see backtest_mode._simulation_windows()). Hence, the
+memory of a backtest depends on the length of the windows rather than on the whole range.
+"""
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Tuple
+
+import jesse.helpers as jh
+from jesse.config import config
+from jesse.constants import TIMEFRAME_TO_ONE_MINUTES
+
+
+def window_minutes(days: float, timeframes: list) -> int:
+    """
+    The length of the windows: the number of days rounded up, so that every window starts at the
+    beginning of a day and of a candle of every timeframe. That way, simulating the windows one
+    after another is the same as simulating the whole range at once.
+    """
+    unit = math.lcm(1440, *[TIMEFRAME_TO_ONE_MINUTES[t] for t in timeframes])
+    return max(math.ceil(days * 1440 / unit), 1) * unit
+
+
+def _load_from_db(start_timestamp: int, finish_timestamp: int) -> dict:
+    from jesse.services.candle import _get_candles_from_db
+    from jesse.services.db import database
+
+    try:
+        return {
+            jh.key(c[0], c[1]): {
+                'exchange': c[0],
+                'symbol': c[1],
+                'candles': _get_candles_from_db(c[0], c[1], start_timestamp, finish_timestamp, caching=True)
+            }
+            for c in config['app']['considering_candles']
+        }
+    finally:
+        # the connections of peewee are per thread, and this runs on a thread of its own
+        if database.is_open():
+            database.db.close()
+
+
+class CandlesStream:
+    def __init__(
+            self, start_date: int, finish_date: int, window_days: float,
+            load: Callable[[int, int], dict] = None
+    ) -> None:
+        """
+        :param start_date: the same as load_candles()'s
+        :param finish_date: the same as load_candles()'s
+        :param window_days: the (minimum) number of days of each window
+        :param load: returns the trading candles of the range between two timestamps (inclusive) in
+            the format of load_candles(). Loads them from the database by default.
+        """
+        self.start = jh.timestamp_to_arrow(start_date).floor('day').int_timestamp * 1000
+        self.finish = jh.timestamp_to_arrow(finish_date).floor('day').int_timestamp * 1000
+        self.window = window_minutes(window_days, config['app']['considering_timeframes'])
+        self.load = _load_from_db if load is None else load
+
+        warmup_num = jh.get_config('env.data.warmup_candles_num', 210)
+        max_timeframe = jh.max_timeframe(config['app']['considering_timeframes'])
+        # the number of the past 1m candles that are kept in the store
+        self.keep = max(warmup_num, 1) * TIMEFRAME_TO_ONE_MINUTES[max_timeframe]
+
+    def __len__(self) -> int:
+        return (self.finish - self.start) // 60_000
+
+    @property
+    def first_timestamp(self) -> int:
+        return self.start
+
+    @property
+    def last_timestamp(self) -> int:
+        return self.finish - 60_000
+
+    def load_warmup_candles(self) -> dict:
+        """
+        The warmup candles, the same as load_candles()'s
+        """
+        from jesse.services.candle import _get_candles_from_db
+
+        warmup_num = jh.get_config('env.data.warmup_candles_num', 210)
+        max_timeframe = jh.max_timeframe(config['app']['considering_timeframes'])
+        warmup_start = self.start - warmup_num * TIMEFRAME_TO_ONE_MINUTES[max_timeframe] * 60_000
+        return {
+            jh.key(c[0], c[1]): {
+                'exchange': c[0],
+                'symbol': c[1],
+                'candles': _get_candles_from_db(
+                    c[0], c[1], warmup_start, self.start - 60_000, caching=True
+                ) if warmup_num > 0 else None
+            }
+            for c in config['app']['considering_candles']
+        }
+
+    def windows(self) -> Iterator[Tuple[int, dict]]:
+        """
+        Yields the index of the first candle of each window (in the whole range) and its candles
+        """
+        starts = range(self.start, self.finish, self.window * 60_000)
+        if not len(starts):
+            return
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self._load_window, starts[0])
+            for i, start in enumerate(starts):
+                candles = future.result()
+                # prefetch the next window while this one is being simulated
+                if i + 1 < len(starts):
+                    future = executor.submit(self._load_window, starts[i + 1])
+                yield (start - self.start) // 60_000, candles
+                # don't hold on to the window while the next one is being loaded
+                del candles
+
+    def _load_window(self, start: int) -> dict:
+        return self.load(start, min(start + self.window * 60_000, self.finish) - 60_000)
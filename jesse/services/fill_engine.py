@@ -0,0 +1,137 @@
+from typing import Tuple
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def split_candle(candle: np.ndarray, price: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Splits a single candle into two candles at the price: earlier + later. It's compiled so
+    that find_next_fill() can call it; jesse.services.candle.split_candle() wraps it.
+
+    :param candle: np.ndarray
+    :param price: float
+
+    :return: tuple
+    """
+    timestamp = candle[0]
+    o = candle[1]
+    c = candle[2]
+    h = candle[3]
+    l = candle[4]
+    v = candle[5]
+    is_bullish = c >= o
+    is_bearish = c < o
+
+    if is_bullish and l < price < o:
+        return np.array([timestamp, o, price, o, price, v]), np.array([timestamp, price, c, h, l, v])
+    elif price == o:
+        return candle.copy(), candle.copy()
+    elif is_bearish and o < price < h:
+        return np.array([timestamp, o, price, price, o, v]), np.array([timestamp, price, c, h, l, v])
+    elif is_bearish and l < price < c:
+        return np.array([timestamp, o, price, h, price, v]), np.array([timestamp, price, c, c, l, v])
+    elif is_bullish and c < price < h:
+        return np.array([timestamp, o, price, price, l, v]), np.array([timestamp, price, c, h, c, v])
+    elif is_bearish and price == c:
+        return np.array([timestamp, o, c, h, c, v]), np.array([timestamp, price, price, price, l, v])
+    elif is_bullish and price == c:
+        return np.array([timestamp, o, c, c, l, v]), np.array([timestamp, price, price, h, price, v])
+    elif is_bearish and price == h:
+        return np.array([timestamp, o, h, h, o, v]), np.array([timestamp, h, c, h, l, v])
+    elif is_bullish and price == l:
+        return np.array([timestamp, o, l, o, l, v]), np.array([timestamp, l, c, h, l, v])
+    elif is_bearish and price == l:
+        return np.array([timestamp, o, l, h, l, v]), np.array([timestamp, l, c, c, l, v])
+    elif is_bullish and price == h:
+        return np.array([timestamp, o, h, h, l, v]), np.array([timestamp, h, c, h, c, v])
+    elif is_bearish and c < price < o:
+        return np.array([timestamp, o, price, h, price, v]), np.array([timestamp, price, c, price, l, v])
+    elif is_bullish and o < price < c:
+        return np.array([timestamp, o, price, price, l, v]), np.array([timestamp, price, c, h, price, v])
+
+    # the price is not within the candle
+    return candle.copy(), candle.copy()
+
+
+@njit(cache=True)
+def find_next_fill(
+        candles: np.ndarray, start_index: int, current_candle: np.ndarray, prices: np.ndarray
+) -> Tuple[int, int, np.ndarray, np.ndarray]:
+    """
+    Walks through the 1m candles (starting from start_index) and returns the first fill: the
+    index of the candle, the index of the order (the first one in the passed order whose
+    price falls within the candle), and the two halves of the candle split at that price.
+
+    current_candle is what is left of the candle at start_index (it's smaller than the actual
+    candle if other orders have already been filled in it). The rest of the candles are
+    extended to include the previous candle's close. Inactive orders are passed as np.nan.
+    A candle index of -1 is returned if no order gets filled.
+    """
+    candle = current_candle.copy()
+    for i in range(start_index, len(candles)):
+        if i > start_index:
+            candle = candles[i].copy()
+            candle[3] = max(candle[3], candles[i - 1, 2])
+            candle[4] = min(candle[4], candles[i - 1, 2])
+
+        for j in range(len(prices)):
+            if candle[4] <= prices[j] <= candle[3]:
+                storable_candle, remaining_candle = split_candle(candle, prices[j])
+                return i, j, storable_candle, remaining_candle
+
+    return -1, -1, candle, candle
+
+
+@njit(cache=True)
+def sort_execution_orders(prices: np.ndarray, candles: np.ndarray) -> np.ndarray:
+    """
+    Returns the indexes of the orders in the order they would get executed while walking through
+    the passed candles. When more than one order falls within the same candle, the heuristic is
+    that the price first goes up and then down for red candles (and the opposite for green ones).
+    """
+    count = len(prices)
+    is_remaining = np.ones(count, dtype=np.bool_)
+    sorted_indexes = np.empty(count, dtype=np.int64)
+    sorted_count = 0
+
+    for candle in candles:
+        open_price, close_price, high, low = candle[1], candle[2], candle[3], candle[4]
+
+        included = np.empty(count, dtype=np.int64)
+        included_count = 0
+        for k in range(count):
+            if is_remaining[k] and low <= prices[k] <= high:
+                included[included_count] = k
+                included_count += 1
+        included = included[:included_count]
+
+        if included_count == 1:
+            sorted_indexes[sorted_count] = included[0]
+            sorted_count += 1
+            is_remaining[included[0]] = False
+        elif included_count > 1:
+            included_prices = prices[included]
+            # stable sorts so orders with the same price keep their original order
+            ascending = included[np.argsort(included_prices, kind='mergesort')]
+            descending = included[np.argsort(-included_prices, kind='mergesort')]
+
+            on_open = included[included_prices == open_price]
+            above_open = ascending[prices[ascending] > open_price]
+            below_open = descending[prices[descending] < open_price]
+
+            if open_price > close_price:
+                ordered = np.concatenate((on_open, above_open, below_open))
+            else:
+                ordered = np.concatenate((on_open, below_open, above_open))
+
+            for k in ordered:
+                sorted_indexes[sorted_count] = k
+                sorted_count += 1
+                is_remaining[k] = False
+
+        if sorted_count == count:
+            break
+
+    return sorted_indexes[:sorted_count]
@@ -0,0 +1,110 @@
+"""
+Opt-in profiling of the hooks of a strategy (should_long(), go_long(), update_position(),
+on_open_position(), etc.) and of the indicators that are called from within them.
+
+The profiler replaces the hooks of the strategy's instance with profiled ones, hence
+strategies that aren't profiled are not affected at all. The indicators report to the
+profiler of the hook that is running at the time (if any).
+"""
+import time
+from functools import wraps
+from typing import Callable
+
+# the name of each hook, and the method that is profiled for it
+HOOKS = {
+    'before': 'before',
+    'should_long': 'should_long',
+    'should_short': 'should_short',
+    'should_cancel_entry': 'should_cancel_entry',
+    'go_long': 'go_long',
+    'go_short': 'go_short',
+    'update_position': 'update_position',
+    # the execution of all the filters (including the call to filters() that returns them)
+    'filters': '_execute_filters',
+    'after': 'after',
+    'on_open_position': 'on_open_position',
+    'on_close_position': 'on_close_position',
+    'on_increased_position': 'on_increased_position',
+    'on_reduced_position': 'on_reduced_position',
+    'on_cancel': 'on_cancel',
+    'on_route_open_position': 'on_route_open_position',
+    'on_route_close_position': 'on_route_close_position',
+    'on_route_increased_position': 'on_route_increased_position',
+    'on_route_reduced_position': 'on_route_reduced_position',
+    'on_route_canceled': 'on_route_canceled',
+}
+
+_active_profiler = None
+
+
+def _add(stats: dict, name: str, duration: float) -> None:
+    if name in stats:
+        stats[name][0] += duration
+        stats[name][1] += 1
+    else:
+        stats[name] = [duration, 1]
+
+
+def _format(stats: dict, total: float) -> dict:
+    return {
+        name: {
+            'duration': round(duration, 6),
+            'count': count,
+            'percentage': round(duration / total * 100, 2) if total else 0,
+        }
+        for name, (duration, count) in sorted(stats.items(), key=lambda item: -item[1][0])
+    }
+
+
+class HooksProfiler:
+    def __init__(self) -> None:
+        self.hooks = {}
+        self.indicators = {}
+
+    def attach(self, strategy) -> None:
+        for name, method in HOOKS.items():
+            setattr(strategy, method, self._profiled(name, getattr(strategy, method)))
+
+    def _profiled(self, name: str, hook: Callable) -> Callable:
+        @wraps(hook)
+        def profiled(*args, **kwargs):
+            global _active_profiler
+            previous_profiler = _active_profiler
+            _active_profiler = self
+            start = time.perf_counter()
+            try:
+                return hook(*args, **kwargs)
+            finally:
+                _add(self.hooks, name, time.perf_counter() - start)
+                _active_profiler = previous_profiler
+
+        return profiled
+
+    def report(self) -> dict:
+        """
+        The total duration (in seconds), the call count and the share of the total duration of
+        the hooks for each hook and each indicator. The duration of the indicators is also
+        included in the hooks that called them.
+        """
+        total = sum(duration for duration, _ in self.hooks.values())
+        return {
+            'duration': round(total, 6),
+            'hooks': _format(self.hooks, total),
+            'indicators': _format(self.indicators, total),
+        }
+
+
+def profile_indicator(indicator: Callable) -> Callable:
+    @wraps(indicator)
+    def decorated(*args, **kwargs):
+        profiler = _active_profiler
+        if profiler is None:
+            return indicator(*args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return indicator(*args, **kwargs)
+        finally:
+            _add(profiler.indicators, indicator.__name__, time.perf_counter() - start)
+
+    return decorated
@@ -30,8 +30,13 @@ def run():
     _exchange_api_keys(migrator)
 
     # create initial tables
-    from jesse.models import Candle, ClosedTrade, Log, Order, Option
-    database.db.create_tables([Candle, ClosedTrade, Log, Order])
+    from jesse.models import Candle, CandleCoverage, CandleRollup, ClosedTrade, Log, Order, Option
+    from jesse.models.CandleCoverage import rebuild_coverage
+    database.db.create_tables([Candle, CandleCoverage, CandleRollup, ClosedTrade, Log, Order])
+    # count the candles that were imported before the coverage existed (the table may have been
+    # created already, when the model was imported)
+    if not CandleCoverage.select().exists() and Candle.select().exists():
+        rebuild_coverage()
 
     database.close_connection()
 
@@ -0,0 +1,58 @@
+"""
+Optional timing of the phases of the backtest simulation loop, such as the ingestion of the
+candles, the simulation of the order fills and the execution of the strategies.
+
+Phases can be nested; the time of a nested phase is excluded from the phase that contains it,
+so the durations of all the phases add up to the duration of the whole loop. Start and stop
+are no-ops unless the timer is enabled, so that measuring has no cost by default.
+"""
+import time
+
+
+class PhaseTimer:
+    def __init__(self) -> None:
+        self.is_enabled = False
+        self.durations = {}
+        self.counts = {}
+        self._stack = []
+
+    def reset(self, is_enabled: bool = False) -> None:
+        self.is_enabled = is_enabled
+        self.durations = {}
+        self.counts = {}
+        self._stack = []
+
+    def start(self, phase: str) -> None:
+        if not self.is_enabled:
+            return
+
+        now = time.perf_counter()
+        if self._stack:
+            # pause the phase that contains this one
+            parent = self._stack[-1]
+            self.durations[parent[0]] = self.durations.get(parent[0], 0) + now - parent[1]
+        self._stack.append([phase, now])
+
+    def stop(self) -> None:
+        if not self.is_enabled:
+            return
+
+        now = time.perf_counter()
+        phase, since = self._stack.pop()
+        self.durations[phase] = self.durations.get(phase, 0) + now - since
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+        if self._stack:
+            # resume the phase that contains this one
+            self._stack[-1][1] = now
+
+    def report(self) -> dict:
+        """
+        :return: dict - the total duration (in seconds) and the count of each phase
+        """
+        return {
+            phase: {'duration': round(duration, 6), 'count': self.counts.get(phase, 0)}
+            for phase, duration in sorted(self.durations.items(), key=lambda item: -item[1])
+        }
+
+
+phase_timer = PhaseTimer()
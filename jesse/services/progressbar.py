@@ -13,7 +13,7 @@ class Progressbar:
             raise ValueError('length must be greater than 0')
 
         self._time = time()
-        self._execution_times = DynamicNumpyArray((3, 1), 3)
+        self._execution_times = DynamicNumpyArray((3, 1), max_size=3)
         self.step = step
         self.is_finished = False
 
@@ -7,7 +7,7 @@ import jesse.helpers as jh
 from jesse.config import config
 from jesse.exceptions import CandleNotFoundInDatabase
 from jesse.models import Candle
-from jesse.services.cache import cache
+from jesse.services.candles_cache import candles_cache
 from jesse.services.candle import generate_candle_from_one_minutes
 from jesse.store import store
 
@@ -37,32 +37,7 @@ def load_required_candles(exchange: str, symbol: str, start_date_str: str, finis
     # update candles_count to count from the beginning of the day instead
     short_candles_count = int((pre_finish_date - pre_start_date) / 60_000)
 
-    key = jh.key(exchange, symbol)
-    cache_key = f'{jh.timestamp_to_date(pre_start_date)}-{jh.timestamp_to_date(pre_finish_date)}-{key}'
-    cached_value = cache.get_value(cache_key)
-
-    # if cache exists
-    if cached_value:
-        candles_tuple = cached_value
-    # not cached, get and cache for later calls in the next 5 minutes
-    else:
-        # fetch from database
-        candles_tuple = tuple(
-            Candle.select(
-                Candle.timestamp, Candle.open, Candle.close, Candle.high, Candle.low,
-                Candle.volume
-            ).where(
-                Candle.exchange == exchange,
-                Candle.symbol == symbol,
-                Candle.timeframe == '1m' or Candle.timeframe.is_null(),
-                Candle.timestamp.between(pre_start_date, pre_finish_date)
-            ).order_by(Candle.timestamp.asc()).tuples()
-        )
-
-        # cache it for near future calls
-        cache.set_value(cache_key, candles_tuple, expire_seconds=60 * 60 * 24 * 7)
-
-    candles = np.array(candles_tuple)
+    candles = candles_cache.get_candles(exchange, symbol, pre_start_date, pre_finish_date)
 
     if len(candles) < short_candles_count + 1:
         first_existing_candle = tuple(
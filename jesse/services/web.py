@@ -34,6 +34,9 @@ class BacktestRequestJson(BaseModel):
     export_tradingview: bool
     fast_mode: bool
     benchmark: bool
+    event_mode: bool = False
+    phases_timing: bool = False
+    hooks_profile: bool = False
 
 
 class OptimizationRequestJson(BaseModel):
@@ -59,6 +62,13 @@ class ImportCandlesRequestJson(BaseModel):
     start_date: str
 
 
+class ImportCandlesBatchRequestJson(BaseModel):
+    id: str
+    exchange: str
+    symbols: List[str]
+    start_date: str
+
+
 class ExchangeSupportedSymbolsRequestJson(BaseModel):
     exchange: str
 
@@ -5,9 +5,9 @@ import jesse.services.selectors as selectors
 from jesse.config import config
 from jesse.enums import timeframes
 from jesse.exceptions import RouteNotFound
-from jesse.libs import DynamicNumpyArray
+from jesse.libs import DynamicNumpyArray, CursorNumpyArray
 from jesse.models.Candle import store_candle_into_db
-from jesse.services.candle import generate_candle_from_one_minutes
+from jesse.services.candle import generate_candle_from_one_minutes, generate_bigger_timeframe_candles
 from timeloop import Timeloop
 from datetime import timedelta
 from jesse.services import logger
@@ -18,6 +18,12 @@ class CandlesState:
         self.storage = {}
         self.are_all_initiated = False
         self.initiated_pairs = {}
+        # the forming candle of each bigger timeframe, generated from the closed 1m candles
+        # so far: {key: (index of its first 1m candle, count of closed 1m candles, candle)}
+        self.forming_candles = {}
+        # the 1m candles of the whole session (warmup + trading) of each pair in backtests, and
+        # the number of the warmup ones: {key: (candles, warmup_length)}
+        self.session_candles = {}
 
     def generate_new_candles_loop(self) -> None:
         """
@@ -84,6 +90,9 @@ class CandlesState:
             raise RouteNotFound(symbol, timeframe)
 
     def init_storage(self, bucket_size: int = 1000) -> None:
+        self.forming_candles = {}
+        self.session_candles = {}
+
         for ar in selectors.get_all_routes():
             exchange, symbol = ar['exchange'], ar['symbol']
 
@@ -97,6 +106,45 @@ class CandlesState:
                 total_bigger_timeframe = int((bucket_size / jh.timeframe_to_one_minutes(timeframe)) + 1)
                 self.storage[key] = DynamicNumpyArray((total_bigger_timeframe, 6))
 
+    def init_backtest_storage(self, exchange: str, symbol: str, candles: np.ndarray, keep: int = None) -> np.ndarray:
+        """
+        Backs the 1m storage of the pair by the preloaded trading candles of a backtest (prefixed
+        by the already stored warmup candles), so that adding them during the simulation only
+        moves a cursor forward instead of copying them into a growing DynamicNumpyArray.
+
+        :param exchange: str
+        :param symbol: str
+        :param candles: np.ndarray
+        :param keep: int - if set, only the last "keep" of the already stored 1m candles (and the
+            bigger timeframe candles of the same period) are kept, such as in streamed backtests
+
+        :return: np.ndarray - the trading candles, as a view of the new storage
+        """
+        if not (jh.is_backtesting() or jh.is_optimizing()):
+            raise Exception('init_backtest_storage() is for backtesting or optimizing only')
+
+        warmup_candles = self.get_storage(exchange, symbol, '1m')[:]
+        if keep is not None:
+            warmup_candles = warmup_candles[len(warmup_candles) - min(keep, len(warmup_candles)):]
+            for timeframe in config['app']['considering_timeframes']:
+                if timeframe == '1m':
+                    continue
+                key = jh.key(exchange, symbol, timeframe)
+                bigger_candles = self.storage[key][:]
+                count = min(keep // jh.timeframe_to_one_minutes(timeframe), len(bigger_candles))
+                self.storage[key] = DynamicNumpyArray((max(count, 1), 6))
+                if count:
+                    self.storage[key].append_multiple(bigger_candles[len(bigger_candles) - count:])
+        candles = np.ascontiguousarray(candles, dtype=np.float64)
+        if len(warmup_candles):
+            candles = np.concatenate((warmup_candles, candles))
+
+        self.storage[jh.key(exchange, symbol, '1m')] = CursorNumpyArray(candles, len(warmup_candles) - 1)
+        self.session_candles[jh.key(exchange, symbol)] = (candles, len(warmup_candles))
+        self.forming_candles = {}
+
+        return candles[len(warmup_candles):]
+
     def add_candle(
             self,
             candle: np.ndarray,
@@ -166,6 +214,8 @@ class CandlesState:
 
         # allow updating of the previous candle.
         elif candle[0] < arr[-1][0]:
+            if timeframe == '1m':
+                self._clear_forming_candles(exchange, symbol)
             # loop through the last 20 items in arr to find it. If so, update it.
             for i in range(max(20, len(arr) - 1)):
                 if arr[-i][0] == candle[0]:
@@ -323,6 +373,47 @@ class CandlesState:
         dif = current_1m_count % required_1m_to_complete_count
         return dif, long_key, short_key
 
+    def _clear_forming_candles(self, exchange: str, symbol: str) -> None:
+        # closed 1m candles have been rewritten, so the forming candles have to be generated from scratch
+        for timeframe in config['app']['considering_timeframes']:
+            self.forming_candles.pop(jh.key(exchange, symbol, timeframe), None)
+
+    def get_forming_candle(self, exchange: str, symbol: str, timeframe: str) -> np.ndarray:
+        """
+        Returns the forming candle of a bigger timeframe. Instead of generating it from all of its
+        1m candles on every call, the 1m candles that are closed since the previous call are merged
+        into the cached one; only the last 1m candle (which might still get updated) is merged on
+        every call.
+
+        :param exchange: str
+        :param symbol: str
+        :param timeframe: str
+
+        :return: np.ndarray
+        """
+        dif, long_key, short_key = self.forming_estimation(exchange, symbol, timeframe)
+        short_arr: DynamicNumpyArray = self.storage[short_key]
+        short_count = len(short_arr)
+        first_index = short_count - dif
+        closed_count = short_count - 1
+
+        cached = self.forming_candles.get(long_key)
+        if cached is None or cached[0] != first_index or cached[1] > closed_count:
+            cached = (first_index, first_index, None)
+        _, cached_count, candle = cached
+
+        if closed_count > cached_count:
+            closed_candles = short_arr[cached_count:closed_count]
+            if candle is None:
+                candle = generate_candle_from_one_minutes(timeframe, closed_candles, True)
+            else:
+                candle = _merge_candles(candle, closed_candles)
+        self.forming_candles[long_key] = (first_index, closed_count, candle)
+
+        if candle is None:
+            return short_arr[closed_count].copy()
+        return _merge_candles(candle, short_arr[closed_count:short_count])
+
     # # # # # # # # #
     # # # # # getters
     # # # # # # # # #
@@ -348,24 +439,46 @@ class CandlesState:
             return self.storage[long_key][:long_count]
         # generate forming candle only if NOT in live mode
         elif not jh.is_live():
-            return np.concatenate(
-                (
-                    self.storage[long_key][:long_count],
-                    np.array(
-                        (
-                            generate_candle_from_one_minutes(
-                                timeframe,
-                                self.storage[short_key][short_count - dif:short_count],
-                                True
-                            ),
-                        )
-                    )
-                ), axis=0
-            )
+            arr: DynamicNumpyArray = self.storage[long_key]
+            # the forming candle is written to the (unused) row after the last complete candle,
+            # so that a view can be returned instead of copying the whole history. Hence, the last row
+            # of an array that was returned earlier changes with the forming candle (until it closes)
+            if long_count >= len(arr.array):
+                return np.concatenate(
+                    (arr[:long_count], self.get_forming_candle(exchange, symbol, timeframe)[None, :]), axis=0
+                )
+            arr.array[long_count] = self.get_forming_candle(exchange, symbol, timeframe)
+            return arr.array[:long_count + 1]
         # in live mode, just return the complete candles
         else:
             return self.storage[long_key][:long_count]
 
+    def get_session_candles(self, exchange: str, symbol: str, timeframe: str) -> np.ndarray:
+        """
+        Returns the candles of the whole backtest session (warmup + trading), including the ones
+        that the simulation hasn't reached yet. Hence, it must never be exposed to strategies as is.
+
+        :param exchange: str
+        :param symbol: str
+        :param timeframe: str
+
+        :return: np.ndarray
+        """
+        key = jh.key(exchange, symbol)
+        if key not in self.session_candles:
+            raise ValueError(f'The candles of the session are not available for {key}. It is only available in backtests.')
+
+        candles, warmup_length = self.session_candles[key]
+        if timeframe == '1m':
+            return candles
+
+        # the same as the stored candles: the ones of the warmup are generated since its first 1m
+        # candle (see inject_warmup_candles_to_store()), and the trading ones since the start of trading
+        return np.concatenate((
+            generate_bigger_timeframe_candles(timeframe, candles[:warmup_length]),
+            generate_bigger_timeframe_candles(timeframe, candles[warmup_length:])
+        ))
+
     def get_current_candle(self, exchange: str, symbol: str, timeframe: str) -> np.ndarray:
         # no need to worry for forming candles when timeframe == 1m
         if timeframe == '1m':
@@ -382,6 +495,8 @@ class CandlesState:
 
         # forming candle
         if dif != 0:
+            if not jh.is_live():
+                return self.get_forming_candle(exchange, symbol, timeframe)
             return generate_candle_from_one_minutes(
                 timeframe, self.storage[short_key][short_count - dif:short_count],
                 True
@@ -416,7 +531,22 @@ class CandlesState:
                 len(candles) - ((candles[-1, 0] - arr[-1][0]) / 60000)
             )
             arr[-override_candles:] = candles
+            self._clear_forming_candles(exchange, symbol)
 
         # Otherwise,it's true and error.
         else:
             raise IndexError(f"Could not find the candle with timestamp {jh.timestamp_to_time(candles[0, 0])} in the storage. Last candle's timestamp: {jh.timestamp_to_time(arr[-1][0])}. exchange: {exchange}, symbol: {symbol}")
+
+
+def _merge_candles(candle: np.ndarray, candles: np.ndarray) -> np.ndarray:
+    """
+    Merges the (later) 1m candles into the passed candle
+    """
+    return np.array([
+        candle[0],
+        candle[1],
+        candles[-1][2],
+        max(candle[3], candles[:, 3].max()),
+        min(candle[4], candles[:, 4].min()),
+        candle[5] + candles[:, 5].sum(),
+    ])
@@ -19,7 +19,7 @@ class OrderbookState:
                 'asks': [],
                 'bids': []
             }
-            self.storage[key] = DynamicNumpyArray((60, 2, 50, 2), drop_at=60)
+            self.storage[key] = DynamicNumpyArray((60, 2, 50, 2), max_size=60)
 
     def format_orderbook(self, exchange: str, symbol: str) -> np.ndarray:
         key = jh.key(exchange, symbol)
@@ -16,7 +16,8 @@ class TickersState:
         for ar in selectors.get_all_routes():
             exchange, symbol = ar['exchange'], ar['symbol']
             key = jh.key(exchange, symbol)
-            self.storage[key] = DynamicNumpyArray((60, 5), drop_at=120)
+            # the current ticker and the 120 past ones (see get_past_ticker())
+            self.storage[key] = DynamicNumpyArray((60, 5), max_size=121)
 
     def add_ticker(self, ticker: np.ndarray, exchange: str, symbol: str) -> None:
         key = jh.key(exchange, symbol)
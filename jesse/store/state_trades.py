@@ -15,7 +15,8 @@ class TradesState:
         for ar in selectors.get_all_routes():
             exchange, symbol = ar['exchange'], ar['symbol']
             key = jh.key(exchange, symbol)
-            self.storage[key] = DynamicNumpyArray((60, 6), drop_at=120)
+            # the current trade and the 120 past ones (see get_past_trade())
+            self.storage[key] = DynamicNumpyArray((60, 6), max_size=121)
             self.temp_storage[key] = DynamicNumpyArray((100, 4))
 
     def add_trade(self, trade: np.ndarray, exchange: str, symbol: str) -> None:
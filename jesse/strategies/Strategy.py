@@ -1,6 +1,7 @@
+import inspect
 from abc import ABC, abstractmethod
 from time import sleep
-from typing import List, Dict, Union
+from typing import List, Dict, Union, Callable
 
 import numpy as np
 
@@ -14,6 +15,7 @@ from jesse.services import metrics
 from jesse.services.broker import Broker
 from jesse.store import store
 from jesse.services.cache import cached
+from jesse.indicators import memoization as indicators_memoization
 from jesse.services import notifier
 from jesse.services.color import generate_unique_hex_color
 
@@ -69,7 +71,12 @@ class Strategy(ABC):
 
         self._cached_methods = {}
         self._cached_metrics = {}
+        self._precomputed_indicators = {}
+        # {key: (streaming indicator, exchange, symbol, timeframe)}
+        self._streaming_indicators = {}
         self._current_route_index = None
+        # set by the backtest when the profiling of the hooks is requested
+        self._hooks_profiler = None
 
         # Add cached price
         self._cached_price = None
@@ -980,6 +987,8 @@ class Strategy(ABC):
         
         # Cache the current price at the start of execution
         self._cached_price = self.close
+        indicators_memoization.enable()
+        self._commit_streaming_indicators()
         
         self.before()
         self._check()
@@ -1052,6 +1061,8 @@ class Strategy(ABC):
         for m in self._cached_methods.values():
             m.cache_clear()
 
+        indicators_memoization.clear()
+
     @property
     def current_candle(self) -> np.ndarray:
         """
@@ -1129,7 +1140,8 @@ class Strategy(ABC):
     @property
     def candles(self) -> np.ndarray:
         """
-        Returns candles for current trading route
+        Returns candles for current trading route. It's a view of the store, so
+        its last (forming) candle changes as the simulation goes on; copy() it to keep it.
 
         :return: np.ndarray
         """
@@ -1137,7 +1149,8 @@ class Strategy(ABC):
 
     def get_candles(self, exchange: str, symbol: str, timeframe: str) -> np.ndarray:
         """
-        Get candles by passing exchange, symbol, and timeframe
+        Get candles by passing exchange, symbol, and timeframe. Like self.candles,
+        it's a view of the store; copy() it to keep it.
 
         :param exchange: str
         :param symbol: str
@@ -1147,6 +1160,105 @@ class Strategy(ABC):
         """
         return store.candles.get_candles(exchange, symbol, timeframe)
 
+    def precomputed(
+            self,
+            indicator: Callable,
+            *args,
+            exchange: str = None,
+            symbol: str = None,
+            timeframe: str = None,
+            **kwargs
+    ):
+        """
+        Returns the value of the indicator (with sequential=True) at the current candle. In backtests,
+        the whole series is computed once over the candles of the whole session (warmup + trading)
+        and then read at the index of the current candle, which turns an O(n * window) backtest
+        into O(n) for indicators such as hurst_exponent(), mama() or frama().
+
+        Only use it for indicators that don't look ahead (the value at each candle must only
+        depend on the candles up to it). While the candle of the timeframe is still forming, and
+        outside backtests, it is computed on the spot from the candles so far.
+
+        In streamed backtests, the store only keeps the candles of the warmup before each window,
+        hence the series is computed again for each window over them (the same as the indicator
+        over self.candles). The indicators of long memory, such as the EMA, then differ from the
+        ones of a backtest that isn't streamed.
+
+        Example: self.precomputed(ta.ema, 50, source_type='hl2')
+
+        :param indicator: Callable - an indicator function such as ta.ema
+        :param exchange: str - default: the route's exchange
+        :param symbol: str - default: the route's symbol
+        :param timeframe: str - default: the route's timeframe
+
+        :return: the same as indicator(candles, *args, sequential=True, **kwargs)[-1]
+        """
+        exchange = self.exchange if exchange is None else exchange
+        symbol = self.symbol if symbol is None else symbol
+        timeframe = self.timeframe if timeframe is None else timeframe
+
+        candles = self.get_candles(exchange, symbol, timeframe)
+
+        if jh.is_backtesting() and len(candles):
+            key = (indicator, _hashable(args), _hashable(kwargs), exchange, symbol, timeframe)
+            if key not in self._precomputed_indicators:
+                session_candles = store.candles.get_session_candles(exchange, symbol, timeframe)
+                # bypass the wrappers of the indicators (such as memoization); it's computed only once anyway
+                compute = inspect.unwrap(indicator)
+                self._precomputed_indicators[key] = (
+                    session_candles, compute(session_candles, *args, sequential=True, **kwargs)
+                )
+            session_candles, series = self._precomputed_indicators[key]
+
+            # the current candle must be identical to the session's one of the same timestamp. Otherwise,
+            # it's still forming (or is partially filled) and the precomputed value would be based on its future.
+            # It's looked up by its timestamp since the bigger candles of the warmup and of the trading are
+            # each counted from their own first 1m candle, so their indexes don't line up with the store's
+            index = np.searchsorted(session_candles[:, 0], candles[-1][0])
+            if index < len(session_candles) and np.array_equal(session_candles[index], candles[-1]):
+                return _value_at(series, index, len(session_candles))
+
+        return _value_at(indicator(candles, *args, sequential=True, **kwargs), -1, len(candles))
+
+    def streaming(
+            self,
+            indicator: type,
+            *args,
+            exchange: str = None,
+            symbol: str = None,
+            timeframe: str = None,
+            **kwargs
+    ):
+        """
+        Returns the current value of a streaming indicator (see jesse.indicators.streaming). One of
+        them is kept per route, indicator and parameters, and they are all advanced over the closed
+        candles on every execution of the strategy, so reading them only costs the current candle
+        instead of recomputing the indicator over the whole window.
+
+        Example: self.streaming(StreamingEMA, 50, source_type='hl2')
+
+        :param indicator: type - a streaming indicator class such as StreamingEMA
+        :param exchange: str - default: the route's exchange
+        :param symbol: str - default: the route's symbol
+        :param timeframe: str - default: the route's timeframe
+
+        :return: the same as the last value of the indicator with sequential=True
+        """
+        exchange = self.exchange if exchange is None else exchange
+        symbol = self.symbol if symbol is None else symbol
+        timeframe = self.timeframe if timeframe is None else timeframe
+
+        key = (indicator, _hashable(args), _hashable(kwargs), exchange, symbol, timeframe)
+        if key not in self._streaming_indicators:
+            self._streaming_indicators[key] = (indicator(*args, **kwargs), exchange, symbol, timeframe)
+
+        return self._streaming_indicators[key][0].update(self.get_candles(exchange, symbol, timeframe))
+
+    def _commit_streaming_indicators(self) -> None:
+        # so that the ones which are read only once in a while are never far behind
+        for streaming_indicator, exchange, symbol, timeframe in self._streaming_indicators.values():
+            streaming_indicator.commit(self.get_candles(exchange, symbol, timeframe))
+
     @property
     def metrics(self) -> dict:
         """
@@ -1473,3 +1585,32 @@ class Strategy(ABC):
             raise ValueError('self.min_qty is only available in live modes')
 
         return selectors.get_exchange(self.exchange).vars['precisions'][self.symbol]['min_qty']
+
+
+def _hashable(value):
+    # the arguments of the indicators are part of the key of their precomputed series (or streaming
+    # state), so lists (such as the periods of ema() and rsi()) and arrays are keyed by their contents
+    if isinstance(value, np.ndarray):
+        return _hashable(value.tolist())
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    try:
+        hash(value)
+    except TypeError:
+        raise TypeError(
+            'self.precomputed() and self.streaming() only accept hashable arguments (besides lists, tuples, '
+            f'dicts and arrays), got a value of type {type(value).__name__}'
+        ) from None
+    return value
+
+
+def _value_at(series, index: int, length: int):
+    # indicators with multiple outputs return a namedtuple of series
+    if isinstance(series, tuple):
+        return type(series)(*(_value_at(v, index, length) for v in series))
+    # and the ones of multiple periods (such as ema() and rsi()) a row of series per period
+    if isinstance(series, np.ndarray) and series.ndim > 1 and len(series) != length:
+        return series[..., index]
+    return series[index]
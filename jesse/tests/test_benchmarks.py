@@ -0,0 +1,51 @@
+import numpy as np
+
+from jesse.benchmarks import synthetic_candles, compare_reports
+from jesse.benchmarks import indicators as indicators_benchmark
+
+
+def test_synthetic_candles():
+    candles = synthetic_candles(100)
+
+    assert candles.shape == (100, 6)
+    np.testing.assert_array_equal(candles, synthetic_candles(100))
+    np.testing.assert_array_equal(np.diff(candles[:, 0]), 60_000)
+    assert (candles[:, 3] >= np.maximum(candles[:, 1], candles[:, 2])).all()
+    assert (candles[:, 4] <= np.minimum(candles[:, 1], candles[:, 2])).all()
+
+
+def test_indicators_benchmark():
+    report = indicators_benchmark.run(sizes=[600, 300], repeat=2, names=['ema', 'beta', 'ichimoku_cloud'])
+
+    assert report['config']['sizes'] == [300, 600]
+    assert set(report['results']) == {'ema', 'beta', 'ichimoku_cloud'}
+    for result in report['results'].values():
+        assert result['error'] is None
+        assert result['warmup'] > 0
+        assert set(result['sequential']) == {'300', '600'}
+    # indicators without the sequential parameter are only called one way
+    assert report['results']['ichimoku_cloud']['non_sequential'] == {}
+    assert set(report['results']['ema']['non_sequential']) == {'300', '600'}
+
+    rows = compare_reports(report, report)
+    assert len(rows) == 3 * 3 + 2 * 2
+    assert all(row[3] == 1 for row in rows)
+
+
+def test_backtest_benchmark():
+    from jesse.benchmarks import backtest as backtest_benchmark
+
+    scenarios = backtest_benchmark.scenarios([1, 2], ['1m', '4h'], [False, True], ['light', 'heavy'])
+    assert len(scenarios) == 16
+    assert len({s['name'] for s in scenarios}) == 16
+
+    scenarios = backtest_benchmark.scenarios([2], ['1m'], [False], ['heavy'])
+    report = backtest_benchmark.run(scenarios, days=1, isolated=False)
+
+    result = report['results']['2-symbols-1m-step-heavy']
+    assert result['candles'] == 2 * 1440
+    assert result['trades'] > 0
+    assert result['candles_per_second'] > 0
+    assert result['peak_rss_mb'] > 0
+    assert set(result['seconds']) == {'prepare', 'backtest'}
+    assert result['phases']['strategies_execution']['count'] == 2 * 1440
@@ -0,0 +1,84 @@
+import os
+import pickle
+import time
+
+from jesse.config import config
+from jesse.services.cache import Cache
+
+
+def test_set_and_get_value(tmp_path):
+    cache = Cache(f'{tmp_path}/')
+
+    assert cache.get_value('missing') is False
+
+    cache.set_value('key', {'a': 1})
+    assert cache.get_value('key') == {'a': 1}
+
+    # overwriting a value
+    cache.set_value('key', [1, 2, 3])
+    assert cache.get_value('key') == [1, 2, 3]
+
+    # no temporary files are left behind
+    assert [f for f in os.listdir(tmp_path) if f.endswith('.tmp')] == []
+
+    # another instance (such as of another process) shares the values
+    assert Cache(f'{tmp_path}/').get_value('key') == [1, 2, 3]
+
+
+def test_expired_values_are_removed(tmp_path):
+    cache = Cache(f'{tmp_path}/')
+
+    cache.set_value('key', 1, expire_seconds=-1)
+    assert cache.get_value('key') is False
+    assert not os.path.exists(f'{tmp_path}/key.pickle')
+
+    # the values without an expiration time never expire
+    cache.set_value('forever', 1, expire_seconds=None)
+    assert cache.get_value('forever') == 1
+
+
+def test_the_least_recently_used_values_are_evicted(tmp_path, monkeypatch):
+    cache = Cache(f'{tmp_path}/')
+    value = b'x' * 400_000
+    # room for two of the values
+    monkeypatch.setitem(config['env']['caching'], 'max_size_mb', 1)
+
+    cache.set_value('a', value)
+    time.sleep(0.01)
+    cache.set_value('b', value)
+    time.sleep(0.01)
+    # "a" becomes the most recently used one
+    assert cache.get_value('a') == value
+    time.sleep(0.01)
+    cache.set_value('c', value)
+
+    assert cache.get_value('b') is False
+    assert not os.path.exists(f'{tmp_path}/b.pickle')
+    assert cache.get_value('a') == value
+    assert cache.get_value('c') == value
+
+
+def test_the_pickle_index_is_imported(tmp_path):
+    with open(f'{tmp_path}/key.pickle', 'wb') as f:
+        pickle.dump('value', f)
+    with open(f'{tmp_path}/cache_database.pickle', 'wb') as f:
+        pickle.dump({'key': {
+            'expire_seconds': 60, 'expire_at': time.time() + 60, 'path': f'{tmp_path}/key.pickle'
+        }}, f)
+
+    cache = Cache(f'{tmp_path}/')
+    assert cache.get_value('key') == 'value'
+    assert not os.path.exists(f'{tmp_path}/cache_database.pickle')
+
+
+def test_flush(tmp_path):
+    cache = Cache(f'{tmp_path}/')
+    cache.set_value('a', 1)
+    cache.set_value('b', 2)
+
+    cache.flush()
+
+    assert cache.get_value('a') is False
+    assert cache.get_value('b') is False
+    assert not os.path.exists(f'{tmp_path}/a.pickle')
+    assert not os.path.exists(f'{tmp_path}/b.pickle')
@@ -1,3 +1,5 @@
+import os
+
 from jesse.factories import range_candles
 from jesse.services.candle import *
 import numpy as np
@@ -27,6 +29,22 @@ def test_generate_candle_from_one_minutes():
     assert five_minutes_candle[5] == candles[:, 5].sum()
 
 
+def test_generate_bigger_timeframe_candles():
+    candles = range_candles(23)
+
+    five_minutes_candles = generate_bigger_timeframe_candles('5m', candles)
+
+    # the trailing 3 candles are not enough for a complete 5m candle
+    assert five_minutes_candles.shape == (4, 6)
+    for i in range(4):
+        np.testing.assert_equal(
+            five_minutes_candles[i],
+            generate_candle_from_one_minutes('5m', candles[i * 5:(i + 1) * 5])
+        )
+
+    assert generate_bigger_timeframe_candles('1h', candles).shape == (0, 6)
+
+
 def test_is_bearish():
     c = np.array([1543387200000, 200, 190, 220, 180, 195])
     assert is_bearish(c)
@@ -175,3 +193,297 @@ def test_candle_dict_to_np_array():
         np.array([1660369080000, 2, 3, 4, 1, 10])
     )
 
+
+
+def test_candles_cache(tmp_path, monkeypatch):
+    import arrow
+    from jesse.benchmarks import synthetic_candles
+    from jesse.services.candles_cache import CandlesCache
+
+    # all of January 2021 and a part of February, which is the current month (hence cached partially)
+    database = synthetic_candles(44640 + 20000)
+    imported = [44640 + 10000]
+    fetched = []
+    february = 1612137600000
+    monkeypatch.setattr(arrow, 'utcnow', lambda: arrow.get(february + 60_000 * 20000))
+
+    def fetch(start, finish):
+        fetched.append((start, finish))
+        candles = database[:imported[0]]
+        return candles[(candles[:, 0] >= start) & (candles[:, 0] <= finish)]
+
+    cache = CandlesCache(f'{tmp_path}/')
+    start = 1609459200000 + 60_000 * 1440 * 10
+    finish = february + 60_000 * 5000
+
+    candles = cache.get_candles('Sandbox', 'BTC-USDT', start, finish, fetch)
+    np.testing.assert_equal(candles, fetch(start, finish))
+    # the whole of January, and the requested part of February
+    assert fetched[:2] == [(1609459200000, february - 60_000), (february, finish)]
+    assert sorted(os.listdir(f'{tmp_path}/Sandbox-BTC-USDT')) == ['2021-01.npy', '2021-02.partial.npy']
+
+    # both months are loaded from their blocks from now on
+    fetched.clear()
+    candles = cache.get_candles('Sandbox', 'BTC-USDT', start, finish, fetch)
+    np.testing.assert_equal(candles, database[14400:44640 + 5001])
+    assert fetched == []
+    assert candles.flags.writeable and not isinstance(candles, np.memmap)
+
+    # only the missing gap of February is fetched, and the candles that aren't in the database
+    # are known to be absent from then on
+    candles = cache.get_candles('Sandbox', 'BTC-USDT', february + 60_000 * 5000, february + 60_000 * 15000, fetch)
+    np.testing.assert_equal(candles, database[44640 + 5000:44640 + 10000])
+    assert fetched == [(february + 60_000 * 5001, february + 60_000 * 15000)]
+    fetched.clear()
+    candles = cache.get_candles('Sandbox', 'BTC-USDT', february, february + 60_000 * 15000, fetch)
+    np.testing.assert_equal(candles, database[44640:44640 + 10000])
+    assert fetched == []
+
+    # until they're stored into the database, which forgets their months
+    imported[0] = 44640 + 20000
+    cache.forget('Sandbox', 'BTC-USDT', february + 60_000 * 10000, february + 60_000 * 19999)
+    candles = cache.get_candles('Sandbox', 'BTC-USDT', february, february + 60_000 * 15000, fetch)
+    np.testing.assert_equal(candles, database[44640:44640 + 15001])
+    assert fetched == [(february, february + 60_000 * 15000)]
+
+    fetched.clear()
+    candles = cache.get_candles('Sandbox', 'BTC-USDT', start + 60_000, start + 60_000 * 100, fetch)
+    np.testing.assert_equal(candles, database[14401:14501])
+    assert fetched == []
+
+    # a month that is over is fetched whole, and is complete even without some of its candles
+    monkeypatch.setattr(arrow, 'utcnow', lambda: arrow.get(february + 60_000 * 50000))
+    imported[0] = 44640 + 10000
+    cache.forget('Sandbox', 'BTC-USDT', february, february)
+    fetched.clear()
+    candles = cache.get_candles('Sandbox', 'BTC-USDT', february + 60_000 * 5000, february + 60_000 * 15000, fetch)
+    np.testing.assert_equal(candles, database[44640 + 5000:44640 + 10000])
+    assert fetched == [(february, february + 60_000 * (40320 - 1))]
+    assert sorted(os.listdir(f'{tmp_path}/Sandbox-BTC-USDT')) == ['2021-01.npy', '2021-02.npy']
+    fetched.clear()
+    cache.get_candles('Sandbox', 'BTC-USDT', february, february + 60_000 * 15000, fetch)
+    assert fetched == []
+
+    # only the months of the range
+    cache.forget('Sandbox', 'BTC-USDT', february + 60_000, february + 60_000 * 100)
+    assert os.listdir(f'{tmp_path}/Sandbox-BTC-USDT') == ['2021-01.npy']
+
+    cache.forget('Sandbox', 'BTC-USDT')
+    assert not os.path.exists(f'{tmp_path}/Sandbox-BTC-USDT')
+
+    cache.get_candles('Sandbox', 'BTC-USDT', start, finish, fetch)
+    cache.flush()
+    assert not os.path.exists(f'{tmp_path}')
+
+
+def test_candles_to_copy_binary():
+    import struct
+    import uuid
+    from jesse.models.Candle import _candles_to_copy_binary
+
+    candles = range_candles(3)
+    data = _candles_to_copy_binary('Binance', 'BTC-USDT', '1m', candles)
+
+    assert data[:11] == b'PGCOPY\n\xff\r\n\x00'
+    assert data[-2:] == struct.pack('>h', -1)
+
+    offset = 19
+    for candle in candles:
+        assert struct.unpack_from('>h', data, offset)[0] == 10
+        offset += 2
+        fields = []
+        for _ in range(10):
+            length = struct.unpack_from('>i', data, offset)[0]
+            fields.append(data[offset + 4:offset + 4 + length])
+            offset += 4 + length
+
+        assert uuid.UUID(bytes=fields[0]).version == 4
+        assert struct.unpack('>q', fields[1])[0] == candle[0]
+        assert [struct.unpack('>d', f)[0] for f in fields[2:7]] == list(candle[1:])
+        assert fields[7:] == [b'Binance', b'BTC-USDT', b'1m']
+    assert offset == len(data) - 2
+
+
+def test_storing_candles_forgets_their_cached_months(monkeypatch):
+    import contextlib
+    import importlib
+    from jesse.services.candles_cache import candles_cache
+    from jesse.services.db import database
+    candle_model = importlib.import_module('jesse.models.Candle')
+
+    class FakeDatabase:
+        def atomic(self):
+            return contextlib.nullcontext()
+
+        def cursor(self):
+            return type('Cursor', (), {'execute': lambda *args: None, 'copy_expert': lambda *args: None})()
+
+    monkeypatch.setattr(database, 'db', FakeDatabase())
+    monkeypatch.setattr(candle_model, 'update_coverage', lambda *args: None)
+    monkeypatch.setattr(candle_model, 'update_rollups', lambda *args: None)
+    forgotten = []
+    monkeypatch.setattr(candles_cache, 'forget', lambda *args: forgotten.append(args))
+
+    candles = range_candles(10)
+    # both the new candles and the replaced ones
+    candle_model.store_candles_into_db('Sandbox', 'BTC-USDT', '1m', candles, on_conflict='ignore')
+    assert forgotten == [('Sandbox', 'BTC-USDT', candles[0, 0], candles[-1, 0])]
+    candle_model.store_candles_into_db('Sandbox', 'BTC-USDT', '1m', candles, on_conflict='replace')
+    assert forgotten == [('Sandbox', 'BTC-USDT', candles[0, 0], candles[-1, 0])] * 2
+    # unlike the candles of other timeframes
+    candle_model.store_candles_into_db('Sandbox', 'BTC-USDT', '5m', candles, on_conflict='replace')
+    assert len(forgotten) == 2
+
+
+def test_live_candles_update_the_coverage_and_rollups_once_they_are_closed(monkeypatch):
+    import importlib
+    from jesse.services.candles_cache import candles_cache
+    candle_model = importlib.import_module('jesse.models.Candle')
+
+    class FakeInsert:
+        def on_conflict(self, **kwargs):
+            return self
+
+        def execute(self):
+            pass
+
+    monkeypatch.setattr(candle_model.Candle, 'insert', lambda **kwargs: FakeInsert())
+    monkeypatch.setattr(candle_model, '_last_stored_timestamps', {})
+    coverage, rollups = [], []
+    monkeypatch.setattr(candle_model, 'update_coverage', lambda *args: coverage.append(args[3]))
+    monkeypatch.setattr(candle_model, 'update_rollups', lambda *args: rollups.append((args[2], args[4])))
+    monkeypatch.setattr(candles_cache, 'forget', lambda *args: None)
+
+    # the last 6 minutes of a day and the first 2 of the next one, each of them updated 3 times while it's forming
+    day = 1609459200000 + 86_400_000
+    candles = range_candles(8)
+    candles[:, 0] = day - 6 * 60_000 + np.arange(8) * 60_000
+    for candle in candles:
+        for _ in range(3):
+            candle_model.store_candle_into_db('Sandbox', 'BTC-USDT', '1m', candle, on_conflict='replace')
+
+    # only the closed candles (all but the forming one), once each
+    assert [timestamp for timestamp, _ in rollups] == list(candles[:-1, 0])
+    # 23:54 completes a 5m candle, and 23:59 all of the timeframes
+    assert [timeframes for _, timeframes in rollups if timeframes] == [
+        ('5m',), ('5m', '15m', '1h', '4h', '1D')
+    ]
+    assert rollups[0] == (candles[0, 0], ('5m',))
+    # the coverage of the day once it's over
+    assert coverage == [day - 60_000]
+
+    # an older candle is updated right away
+    candle_model.store_candle_into_db('Sandbox', 'BTC-USDT', '1m', candles[2], on_conflict='replace')
+    assert coverage[-1] == candles[2, 0]
+    assert rollups[-1] == (candles[2, 0], ('5m', '15m', '1h', '4h', '1D'))
+
+
+def test_copy_candles_writer(monkeypatch):
+    import importlib
+    import struct
+    # jesse.models.Candle is also the name of the model that jesse.models exports
+    candle_model = importlib.import_module('jesse.models.Candle')
+
+    candles = range_candles(50)
+    # the output of "COPY (SELECT timestamp, open, close, high, low, volume ...) TO STDOUT (FORMAT binary)"
+    data = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+    for c in candles:
+        data += struct.pack('>hiq', 6, 8, int(c[0]))
+        for value in c[1:]:
+            data += struct.pack('>id', 8, value)
+    data += struct.pack('>h', -1)
+
+    # decode it in small chunks that split the rows, into an array that has to grow
+    monkeypatch.setattr(candle_model, '_COPY_BUFFER_SIZE', 100)
+    writer = candle_model._CopyCandlesWriter(10)
+    for i in range(0, len(data), 33):
+        writer.write(data[i:i + 33])
+    np.testing.assert_equal(writer.result(), candles)
+
+    # fewer candles than the capacity
+    writer = candle_model._CopyCandlesWriter(100)
+    writer.write(data)
+    np.testing.assert_equal(writer.result(), candles)
+
+    # an empty range
+    writer = candle_model._CopyCandlesWriter(10)
+    writer.write(b'PGCOPY\n\xff\r\n\x00' + struct.pack('>iih', 0, 0, -1))
+    assert writer.result().shape == (0, 6)
+
+
+def test_generate_bigger_timeframe_candles_from_other_timeframes():
+    candles = range_candles(240)
+
+    np.testing.assert_equal(
+        generate_bigger_timeframe_candles('1h', generate_bigger_timeframe_candles('15m', candles), '15m'),
+        generate_bigger_timeframe_candles('1h', candles)
+    )
+
+
+def test_rollup_timeframe_for():
+    from jesse.models.CandleRollup import rollup_timeframe_for
+
+    assert rollup_timeframe_for('1m') is None
+    assert rollup_timeframe_for('3m') is None
+    assert rollup_timeframe_for('5m') == '5m'
+    assert rollup_timeframe_for('30m') == '15m'
+    assert rollup_timeframe_for('2h') == '1h'
+    assert rollup_timeframe_for('12h') == '4h'
+    assert rollup_timeframe_for('3D') == '1D'
+
+
+def test_generate_candles_from_db_uses_the_rollups(monkeypatch):
+    import jesse.services.candle as candle_service
+
+    candles = range_candles(2 * 1440)
+    # 2021-01-01T00:00:00+00:00
+    candles[:, 0] = 1609459200000 + np.arange(len(candles)) * 60_000
+    rollups = generate_bigger_timeframe_candles('4h', candles)
+    # one of them is missing, so the 1m candles from there on must be used instead
+    rollups = np.delete(rollups, 7, axis=0)
+    fetched = []
+
+    def fetch_rollups(exchange, symbol, timeframe, start, finish):
+        assert timeframe == '4h'
+        return rollups[(rollups[:, 0] >= start) & (rollups[:, 0] <= finish)]
+
+    def fetch_candles(exchange, symbol, start, finish):
+        fetched.append((start, finish))
+        return candles[(candles[:, 0] >= start) & (candles[:, 0] <= finish)]
+
+    monkeypatch.setattr(candle_service, 'fetch_rollups_from_db', fetch_rollups)
+    monkeypatch.setattr(candle_service, '_fetch_candles_from_db', fetch_candles)
+
+    result = candle_service.generate_candles_from_db('Sandbox', 'BTC-USDT', '12h', candles[0, 0], candles[-1, 0])
+
+    np.testing.assert_equal(result, generate_bigger_timeframe_candles('12h', candles))
+    # only the 1m candles from the missing rollup on were fetched
+    assert fetched == [(candles[0, 0] + 7 * 4 * 3_600_000, candles[-1, 0])]
+
+
+def test_is_imported_reads_the_coverage(monkeypatch):
+    from jesse.modes import import_candles_mode
+
+    day = 1609459200000
+    counted = []
+
+    class Query:
+        def where(self, *args):
+            return self
+
+        def count(self):
+            counted.append(True)
+            return 1000
+
+    monkeypatch.setattr(import_candles_mode.Candle, 'select', lambda *args: Query())
+    coverage = {day: 1440, day + 86_400_000: 500}
+
+    # a window of the complete day
+    assert import_candles_mode._is_imported(coverage, 'Sandbox', 'BTC-USDT', day, day + 999 * 60_000)
+    # a window of days without any candles
+    assert not import_candles_mode._is_imported(coverage, 'Sandbox', 'BTC-USDT', day + 86_400_000 * 2, day + 86_400_000 * 2 + 999 * 60_000)
+    assert counted == []
+
+    # only the windows that overlap a partially imported day are counted in the database
+    assert import_candles_mode._is_imported(coverage, 'Sandbox', 'BTC-USDT', day + 1000 * 60_000, day + 1999 * 60_000)
+    assert counted == [True]
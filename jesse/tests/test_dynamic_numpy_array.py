@@ -1,7 +1,7 @@
 import numpy as np
 import pytest
 
-from jesse.libs import DynamicNumpyArray
+from jesse.libs import DynamicNumpyArray, CursorNumpyArray
 
 
 def test_append():
@@ -102,14 +102,23 @@ def test_array_size_increases():
     a.append(np.array([1, 2, 3, 4, 5, 6]))
     a.append(np.array([7, 8, 9, 10, 11, 12]))
     a.append(np.array([13, 14, 15, 16, 17, 18]))
-    assert a.array.shape == (6, 6)
+    assert a.array.shape == (3, 6)
     assert a.index == 2
 
+    # the size doubles once it's full
     a.append(np.array([19, 20, 21, 22, 23, 24]))
+    assert a.array.shape == (6, 6)
     a.append(np.array([25, 26, 27, 28, 29, 30]))
     a.append(np.array([31, 32, 33, 34, 35, 36]))
-    assert a.array.shape == (9, 6)
-    assert a.index == 5
+    a.append(np.array([37, 38, 39, 40, 41, 42]))
+    assert a.array.shape == (12, 6)
+    assert a.index == 6
+    np.testing.assert_equal(a[:][:, 0], [1, 7, 13, 19, 25, 31, 37])
+
+    a.append_multiple(np.arange(60).reshape(10, 6))
+    assert a.array.shape == (24, 6)
+    assert a.index == 16
+    assert a[-1][0] == 54
 
 
 def test_drop_at():
@@ -127,4 +136,89 @@ def test_drop_at():
     # add 6th item. when it reaches the drop_at limit, it should drop drop_at/2 items
     a.append(np.array([31, 32, 33, 34, 35, 36]))
     assert a[0][0] == 19
+    assert len(a) == 3
+    np.testing.assert_equal(a[:][:, 0], [19, 25, 31])
+
+
+def test_max_size():
+    a = DynamicNumpyArray((4, 2), max_size=4)
+    assert a.array.shape == (8, 2)
+
+    for i in range(3):
+        a.append(np.array([i, i]))
+    assert len(a) == 3
+    np.testing.assert_equal(a[:][:, 0], [0, 1, 2])
+
+    # once it's full, the oldest items are overwritten, and the array is never reallocated
+    array = a.array
+    for i in range(3, 10):
+        a.append(np.array([i, i]))
+    assert a.array is array
+    assert len(a) == 4
+    np.testing.assert_equal(a[:][:, 0], [6, 7, 8, 9])
+    assert np.shares_memory(a[:], array)
+    np.testing.assert_equal(a[-2:][:, 0], [8, 9])
+    assert a[0][0] == 6
+    assert a.get_last_item()[0] == 9
+    assert a.get_past_item(3)[0] == 6
+    with pytest.raises(IndexError):
+        a.get_past_item(4)
+
+    a[-1] = np.array([90, 90])
+    a[0:2] = np.array([[60, 60], [70, 70]])
+    np.testing.assert_equal(a[:][:, 0], [60, 70, 8, 90])
 
+    a.delete(1)
+    np.testing.assert_equal(a[:][:, 0], [60, 8, 90])
+    a.append(np.array([10, 10]))
+    a.append(np.array([11, 11]))
+    np.testing.assert_equal(a[:][:, 0], [8, 90, 10, 11])
+
+    a.append_multiple(np.arange(12).reshape(6, 2))
+    np.testing.assert_equal(a[:][:, 0], [4, 6, 8, 10])
+
+    a.flush()
+    assert len(a) == 0
+    a.append(np.array([1, 1]))
+    np.testing.assert_equal(a[:], [[1, 1]])
+
+
+def test_delete():
+    a = DynamicNumpyArray((10, 2))
+    a.append_multiple(np.array([[1, 1], [2, 2], [3, 3]]))
+    array = a.array
+
+    a.delete(1, axis=0)
+    assert a.array is array
+    assert len(a) == 2
+    np.testing.assert_equal(a[:], [[1, 1], [3, 3]])
+    # the freed slot is zeroed like the rest of the allocation
+    np.testing.assert_equal(a.array[2], [0, 0])
+
+    a.delete(-1)
+    np.testing.assert_equal(a[:], [[1, 1]])
+
+
+def test_cursor_numpy_array():
+    backing = np.arange(24, dtype=np.float64).reshape(4, 6)
+    a = CursorNumpyArray(backing)
+    assert len(a) == 0
+
+    # appending moves the cursor forward over the backing array
+    a.append(backing[0])
+    a.append_multiple(backing[1:3])
+    assert len(a) == 3
+    assert a.array is backing
+    np.testing.assert_equal(a[:], backing[:3])
+    assert np.shares_memory(a[:], backing)
+    assert a[-1][0] == 12
+
+    # past the end of the backing array, it grows like a DynamicNumpyArray
+    a.append(backing[3])
+    a.append(np.array([24, 25, 26, 27, 28, 29]))
+    assert len(a) == 5
+    assert a[-1][0] == 24
+    np.testing.assert_equal(a[:4], np.arange(24).reshape(4, 6))
+
+    a.flush()
+    assert len(a) == 0
@@ -0,0 +1,62 @@
+import numpy as np
+
+import jesse.services.candle as candle_service
+from jesse.services.fill_engine import find_next_fill, sort_execution_orders
+
+
+def test_split_candle_of_the_candle_service_accepts_candles_of_integers():
+    # it's the compiled split_candle(), which only accepts float64 candles and prices
+    bull = np.array([1111, 10, 20, 25, 5, 2222])
+    np.testing.assert_equal(
+        candle_service.split_candle(bull, 15),
+        (np.array([1111, 10, 15, 15, 5, 2222]), np.array([1111, 15, 20, 25, 15, 2222]))
+    )
+
+
+def test_find_next_fill():
+    candles = np.array([
+        [0, 10, 12, 13, 9, 1],
+        [60_000, 12, 15, 16, 11, 1],
+        [120_000, 20, 18, 21, 17, 1],
+    ], dtype=np.float64)
+
+    # nothing gets filled
+    candle_index, _, _, _ = find_next_fill(candles, 0, candles[0].copy(), np.array([30.0, 1.0]))
+    assert candle_index == -1
+
+    # the first order (in the passed order) that falls within the candle gets filled
+    candle_index, order_index, storable, remaining = find_next_fill(
+        candles, 0, candles[0].copy(), np.array([30.0, 15.5, 14.0])
+    )
+    assert candle_index == 1
+    assert order_index == 1
+    np.testing.assert_equal((storable, remaining), candle_service.split_candle(candles[1], 15.5))
+
+    # inactive orders are skipped
+    candle_index, order_index, _, _ = find_next_fill(
+        candles, 0, candles[0].copy(), np.array([np.nan, 14.0])
+    )
+    assert (candle_index, order_index) == (1, 1)
+
+    # candles are extended to include the previous close (the gap between 15 and 20)
+    candle_index, order_index, _, _ = find_next_fill(candles, 0, candles[0].copy(), np.array([16.5]))
+    assert (candle_index, order_index) == (2, 0)
+
+
+def test_sort_execution_orders():
+    # red candle: first up, then down
+    red = np.array([[0, 20, 10, 25, 5, 1]], dtype=np.float64)
+    prices = np.array([8, 22, 20, 12, 24, 30], dtype=np.float64)
+    np.testing.assert_equal(sort_execution_orders(prices, red), [2, 1, 4, 3, 0])
+
+    # green candle: first down, then up
+    green = np.array([[0, 10, 20, 25, 5, 1]], dtype=np.float64)
+    prices = np.array([8, 22, 10, 12, 6, 30], dtype=np.float64)
+    np.testing.assert_equal(sort_execution_orders(prices, green), [2, 0, 4, 3, 1])
+
+    # orders get sorted by the candle they are reached in
+    candles = np.array([
+        [0, 10, 12, 13, 9, 1],
+        [60_000, 12, 15, 16, 11, 1],
+    ], dtype=np.float64)
+    np.testing.assert_equal(sort_execution_orders(np.array([15.5, 9.5]), candles), [1, 0])
@@ -63,6 +63,29 @@ def test_color():
     assert jh.color(msg_text, msg_color) == '\x1b[30mmsg\x1b[0m'
 
 
+def test_compact_candles():
+    candles = np.array([
+        [1609459200000, 100.5, 101.25, 102, 99.75, 12.5],
+        [1609459260000, 101.25, 100, 101.5, 99.5, 3],
+    ])
+    compact = jh.compact_candles(candles)
+
+    assert jh.is_compact_candles(compact)
+    assert not jh.is_compact_candles(candles)
+    assert compact.nbytes == 2 * 28
+    assert compact['timestamp'].dtype == np.int64
+    assert compact[1]['timestamp'] == 1609459260000
+    assert jh.compact_candles(compact) is compact
+
+    expanded = jh.expand_candles(compact)
+    assert expanded.dtype == np.float64
+    np.testing.assert_equal(expanded, candles)
+    assert jh.expand_candles(candles) is candles
+    out = np.zeros((3, 6))
+    jh.expand_candles(compact, out[1:])
+    np.testing.assert_equal(out[1:], candles)
+
+
 def test_convert_number():
     old_max = 119
     old_min = 40
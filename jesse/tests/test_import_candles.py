@@ -1,5 +1,18 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import arrow
+import numpy as np
+import pytest
+
 import jesse.helpers as jh
 import jesse.modes.import_candles_mode as importer
+from jesse.modes.import_candles_mode.drivers.Binance.BinanceMain import BinanceMain
+from jesse.modes.import_candles_mode.pipeline import RateLimiter, fetch_concurrently
+from jesse.services.db import database
 from tests.data import test_candles_0
 
 test_object_candles = []
@@ -76,3 +89,208 @@ def test_more_than_one_set_of_candles_in_the_middle_are_absent():
     assert len(candles) == 7
     assert candles[0]['timestamp'] == start
     assert candles[-1]['timestamp'] == end
+
+
+def _start_fake_exchange(listings: dict = None, gaps: dict = None):
+    """
+    A local server that answers the "klines" requests of the Binance driver with made up 1m
+    candles, up to the current minute and since the listing timestamp of the symbol (if it's in
+    listings), except for the (start, end) range of the symbol in gaps. It keeps the max number
+    of requests it served at once.
+    """
+    listings = {} if listings is None else listings
+    gaps = {} if gaps is None else gaps
+
+    stats = {'requests': 0, 'active': 0, 'max_active': 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                stats['requests'] += 1
+                stats['active'] += 1
+                stats['max_active'] = max(stats['max_active'], stats['active'])
+            # the latency of the exchange
+            time.sleep(0.02)
+            query = parse_qs(urlparse(self.path).query)
+            listing = listings.get(query['symbol'][0], 0)
+            if query['interval'][0] == '1d':
+                data = [[listing, '1', '2', '0.5', '1.5', '10']]
+            else:
+                start = max(int(query['startTime'][0]), listing)
+                finish = min(int(query['endTime'][0]), jh.now_to_timestamp())
+                gap_start, gap_end = gaps.get(query['symbol'][0], (0, -1))
+                data = [
+                    [t, '1', '2', '0.5', '1.5', '10'] for t in range(start, finish + 1, 60_000)
+                    if not gap_start <= t <= gap_end
+                ]
+            body = json.dumps(data).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            with lock:
+                stats['active'] -= 1
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/api', stats
+
+
+@pytest.fixture
+def fake_exchange(monkeypatch):
+    """
+    Starts a fake exchange (see _start_fake_exchange()) as "Fake Exchange" with pages of count
+    candles, on an empty database whose stored candles are kept in the returned list
+    """
+    servers = []
+    stored = []
+    monkeypatch.setattr(importer, 'fetch_coverage', lambda *args: {})
+    monkeypatch.setattr(importer, 'store_candles_list', stored.extend)
+    monkeypatch.setattr(database, 'open_connection', lambda: None)
+    monkeypatch.setattr(database, 'close_connection', lambda: None)
+
+    def start(count: int, listings: dict = None, gaps: dict = None):
+        server, url, stats = _start_fake_exchange(listings, gaps)
+        servers.append(server)
+        driver = BinanceMain(name='Binance Spot', rest_endpoint=url, backup_exchange_class=None)
+        driver.count = count
+        driver.rate_limit_per_second = 200
+        monkeypatch.setitem(importer.drivers, 'Fake Exchange', lambda: driver)
+        return driver, stats, stored
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(100)
+    started_at = time.monotonic()
+    for _ in range(21):
+        limiter.acquire()
+    assert time.monotonic() - started_at >= 0.19
+
+
+def test_fetch_concurrently_keeps_the_order_and_raises_the_errors():
+    def fetch(item):
+        # the later items finish first
+        time.sleep((10 - item) / 1000)
+        if item == 7:
+            raise ValueError('failed')
+        return item * 2
+
+    results = fetch_concurrently(fetch, range(10), 4, RateLimiter(1000, burst=4))
+    assert [next(results) for _ in range(7)] == [(i, i * 2) for i in range(7)]
+    with pytest.raises(ValueError):
+        next(results)
+
+
+def test_import_candles_from_a_local_exchange(fake_exchange):
+    _, stats, stored = fake_exchange(200)
+
+    start = arrow.utcnow().shift(days=-1).floor('day')
+    importer.run('', 'Fake Exchange', 'BTC-USDT', start.format('YYYY-MM-DD'), running_via_dashboard=False)
+
+    timestamps = [c['timestamp'] for c in stored]
+    assert timestamps[0] == start.int_timestamp * 1000
+    assert set(np.diff(timestamps)) == {60_000}
+    assert timestamps[-1] >= jh.now_to_timestamp() - 3 * 60_000
+    assert stats['requests'] == len(range(start.int_timestamp * 1000, jh.now_to_timestamp() + 1, 200 * 60_000))
+    # the pages were fetched concurrently
+    assert stats['max_active'] > 1
+
+
+def test_import_candles_of_several_symbols_from_a_local_exchange(fake_exchange, monkeypatch, capsys):
+    start = arrow.utcnow().shift(days=-3).floor('day')
+    # ETH-USDT is listed after the start date
+    eth_listing = start.shift(days=1).int_timestamp * 1000
+    _, stats, stored = fake_exchange(500, listings={'ETHUSDT': eth_listing})
+    monkeypatch.setattr(jh, 'clear_output', lambda: None)
+
+    symbols = ['BTC-USDT', 'ETH-USDT', 'SOL-USDT']
+    importer.run_batch('', 'Fake Exchange', symbols, start.format('YYYY-MM-DD'), running_via_dashboard=False,
+                       show_progressbar=True)
+
+    for symbol in symbols:
+        timestamps = [c['timestamp'] for c in stored if c['symbol'] == symbol]
+        # the first complete day since the listing (see BinanceMain.get_starting_time())
+        expected_start = eth_listing + 86_400_000 if symbol == 'ETH-USDT' else start.int_timestamp * 1000
+        assert timestamps[0] == expected_start
+        assert set(np.diff(timestamps)) == {60_000}
+        assert timestamps[-1] >= jh.now_to_timestamp() - 3 * 60_000
+    # the symbols shared the fetchers
+    assert stats['max_active'] > 1
+
+    # the progress is reported per symbol
+    progress = capsys.readouterr().out.splitlines()
+    assert {'BTC-USDT: 100%', 'ETH-USDT: 100%', 'SOL-USDT: 100%'} <= {line.split(' - ')[0] for line in progress}
+
+
+def _import_with_a_gap(fake_exchange, import_candles) -> list:
+    start = arrow.utcnow().shift(days=-2).floor('day')
+    # 200 minutes without trades at the start of a page, in the middle of the history, and no
+    # backup exchange to get them from
+    gap_start = start.int_timestamp * 1000 + 500 * 60_000
+    _, _, stored = fake_exchange(500, gaps={'BTCUSDT': (gap_start, gap_start + 199 * 60_000)})
+
+    import_candles(start.format('YYYY-MM-DD'))
+
+    timestamps = [c['timestamp'] for c in stored if c['symbol'] == 'BTC-USDT']
+    assert timestamps[0] == start.int_timestamp * 1000
+    assert set(np.diff(timestamps)) == {60_000}
+    # the gap is filled with the open of the first candle after it
+    gap = [c for c in stored if c['symbol'] == 'BTC-USDT' and gap_start <= c['timestamp'] < gap_start + 200 * 60_000]
+    assert len(gap) == 200
+    assert {c['volume'] for c in gap} == {0}
+    return stored
+
+
+def test_import_candles_fills_a_gap_in_the_history_without_a_backup_exchange(fake_exchange):
+    _import_with_a_gap(fake_exchange, lambda start_date: importer.run(
+        '', 'Fake Exchange', 'BTC-USDT', start_date, running_via_dashboard=False
+    ))
+
+
+def test_import_candles_of_several_symbols_fills_a_gap_in_the_history_without_a_backup_exchange(fake_exchange):
+    stored = _import_with_a_gap(fake_exchange, lambda start_date: importer.run_batch(
+        '', 'Fake Exchange', ['BTC-USDT', 'ETH-USDT'], start_date, running_via_dashboard=False
+    ))
+    assert {c['symbol'] for c in stored} == {'BTC-USDT', 'ETH-USDT'}
+
+
+def test_get_candles_from_backup_exchange_fetches_the_pages_concurrently(fake_exchange, monkeypatch):
+    backup_driver, stats, stored = fake_exchange(100)
+
+    class Query:
+        # the candles of the backup exchange that are stored so far
+        def where(self, *args):
+            return self
+
+        def order_by(self, *args):
+            return self
+
+        def tuples(self):
+            return [
+                (c['timestamp'], c['open'], c['close'], c['high'], c['low'], c['volume'])
+                for c in stored if start_timestamp <= c['timestamp'] <= end_timestamp
+            ]
+
+    monkeypatch.setattr(importer.Candle, 'select', lambda *args: Query())
+
+    start_timestamp = arrow.utcnow().shift(days=-2).floor('day').int_timestamp * 1000 + 300 * 60_000
+    end_timestamp = start_timestamp + 499 * 60_000
+    candles = importer._get_candles_from_backup_exchange(
+        'Fake Exchange', backup_driver, 'BTC-USDT', start_timestamp, end_timestamp
+    )
+
+    assert [c['timestamp'] for c in candles] == list(range(start_timestamp, end_timestamp + 1, 60_000))
+    assert {c['exchange'] for c in candles} == {'Fake Exchange'}
+    # the pages of the whole day of the backup exchange
+    assert stats['requests'] == 1440 // 100 + 1
+    assert stats['max_active'] > 1
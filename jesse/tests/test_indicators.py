@@ -1,6 +1,9 @@
 import numpy as np
 
+import jesse.helpers as jh
 import jesse.indicators as ta
+from jesse.indicators import memoization
+from jesse.indicators.streaming import StreamingEMA, StreamingRSI, StreamingATR, StreamingSupertrend
 from jesse.factories import candles_from_close_prices
 import pytest
 from .data.test_candles_indicators import *
@@ -208,6 +211,11 @@ def test_bollinger_bands():
     assert len(seq_bb.middleband) == len(candles)
     assert len(seq_bb.lowerband) == len(candles)
 
+    # fewer candles than the period
+    short_bb = ta.bollinger_bands(candles[:5], period=20, sequential=True)
+    assert len(short_bb.upperband) == 5
+    assert np.isnan(short_bb.upperband).all()
+
 
 def test_bollinger_bands_width():
     candles = np.array(test_candles_12)
@@ -568,6 +576,14 @@ def test_ema():
     assert seq[-1] == single
     assert np.isnan(ta.ema(candles, 400))
 
+    # multiple periods at once
+    periods = [3, 8, 20, 400]
+    batch = ta.ema(candles, periods, sequential=True)
+    assert batch.shape == (len(periods), len(candles))
+    for i, period in enumerate(periods):
+        np.testing.assert_array_equal(batch[i], ta.ema(candles, period, sequential=True))
+    np.testing.assert_array_equal(ta.ema(candles, periods), batch[:, -1])
+
 
 def test_emd():
     candles = np.array(test_candles_19)
@@ -1591,6 +1607,14 @@ def test_rsi():
     assert len(seq) == len(candles)
     assert seq[-1] == single
 
+    # multiple periods at once
+    periods = [2, 14, 30]
+    batch = ta.rsi(candles, periods, sequential=True)
+    assert batch.shape == (len(periods), len(candles))
+    for i, period in enumerate(periods):
+        np.testing.assert_array_equal(batch[i], ta.rsi(candles, period, sequential=True))
+    np.testing.assert_array_equal(ta.rsi(candles, periods), [ta.rsi(candles, period) for period in periods])
+
 
 def test_rsmk():
     candles = np.array(test_candles_4)
@@ -2369,3 +2393,100 @@ def test_volume():
     assert seq.ma[-1] == single.ma
     assert len(seq.volume) == len(candles)
     assert len(seq.ma) == len(candles)
+
+
+def test_streaming_indicators():
+    candles = np.array(test_candles_19)
+
+    for streaming, indicator, params in [
+        (StreamingEMA(period=8), ta.ema, {'period': 8}),
+        (StreamingEMA(period=8, source_type='hl2'), ta.ema, {'period': 8, 'source_type': 'hl2'}),
+        (StreamingRSI(period=14), ta.rsi, {'period': 14}),
+        (StreamingATR(period=14), ta.atr, {'period': 14}),
+    ]:
+        for i in range(1, len(candles) + 1):
+            current_candles = candles[:i].copy()
+            # the last candle might still be forming
+            if i % 3 == 0:
+                current_candles[-1, 2] = current_candles[-1, 4]
+            np.testing.assert_equal(
+                streaming.update(current_candles),
+                indicator(current_candles, sequential=True, **params)[-1]
+            )
+
+        # rewritten history is recomputed
+        current_candles = candles[:100].copy()
+        current_candles[50, 2] = current_candles[50, 3]
+        assert streaming.update(current_candles) == indicator(current_candles, sequential=True, **params)[-1]
+
+        # so is a window of the candles that moved on, though it's as long as before
+        current_candles = candles[1:101]
+        assert streaming.update(current_candles) == indicator(current_candles, sequential=True, **params)[-1]
+
+
+def test_streaming_indicators_implement_the_state():
+    from jesse.indicators.streaming import StreamingIndicator
+
+    with pytest.raises(TypeError):
+        StreamingIndicator()
+
+
+def test_streaming_supertrend():
+    candles = np.array(test_candles_19)
+    streaming = StreamingSupertrend(period=10, factor=3)
+
+    for i in range(1, len(candles) + 1):
+        current_candles = candles[:i].copy()
+        if i % 3 == 0:
+            current_candles[-1, 2] = current_candles[-1, 4]
+        value = streaming.update(current_candles)
+        assert type(value).__name__ == 'SuperTrend'
+        # supertrend() needs at least "period" candles
+        if i < 10:
+            assert np.isnan(value.trend)
+            continue
+        expected = ta.supertrend(current_candles, period=10, factor=3, sequential=True)
+        assert value.trend == expected.trend[-1]
+        assert value.changed == expected.changed[-1]
+
+
+def test_memoization():
+    candles = np.array(test_candles_19)
+    memoization.reset()
+    memoization.enable()
+
+    single = ta.ema(candles, 8)
+    # keyword arguments are keyed separately
+    assert ta.ema(candles, period=8) == single
+    assert memoization.stats == {'hits': 0, 'misses': 2}
+    assert ta.ema(candles, 8) == single
+    assert memoization.stats == {'hits': 1, 'misses': 2}
+
+    # the cached arrays can't be mutated by the callers
+    seq = ta.ema(candles, 8, sequential=True)
+    seq[-1] = 0
+    assert ta.ema(candles, 8, sequential=True)[-1] == single
+
+    # the forming candle gets updated in place
+    candles[-1, 2] += 10
+    assert ta.ema(candles, 8) != single
+
+    # it's disabled once cleared
+    memoization.clear()
+    ta.ema(candles, 8)
+    ta.ema(candles, 8)
+    assert memoization.stats == {'hits': 2, 'misses': 4}
+
+
+def test_indicators_accept_compact_candles():
+    candles = np.array(test_candles_19)
+    compact = jh.compact_candles(candles)
+    # the float32 OHLCV of the compact candles
+    rounded = jh.expand_candles(compact)
+
+    assert ta.sma(compact, 10) == ta.sma(rounded, 10)
+    np.testing.assert_equal(ta.ema(compact, 8, sequential=True), ta.ema(rounded, 8, sequential=True))
+    np.testing.assert_equal(ta.macd(compact, sequential=True), ta.macd(rounded, sequential=True))
+    # the compare candles, and the candles passed as keywords
+    assert ta.beta(candles=compact, benchmark_candles=compact) == ta.beta(rounded, rounded)
+    assert ta.sma(compact, 10) == pytest.approx(ta.sma(candles, 10), rel=1e-6)
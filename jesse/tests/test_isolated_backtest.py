@@ -1,7 +1,9 @@
+import numpy as np
 import pytest
 import jesse.helpers as jh
 from jesse.factories import candles_from_close_prices
 from jesse.strategies import Strategy
+import jesse.indicators as ta
 from jesse import research
 
 
@@ -345,3 +347,678 @@ def test_passed_candles_are_not_affected_by_running_isolated_backtests():
     research.backtest(config, routes, data_routes, candles)
 
     assert len(candles['Fake Exchange-FAKE-USDT']['candles']) == 10
+
+
+def test_event_mode_generates_the_same_results_as_the_step_simulator():
+    class TestStrategy(Strategy):
+        def should_long(self):
+            return True
+
+        def should_cancel_entry(self):
+            return False
+
+        def go_long(self):
+            self.buy = 1, self.price - 5
+            self.stop_loss = 1, self.price - 15
+            self.take_profit = 1, self.price + 5
+
+    fake_candles = candles_from_close_prices([100 + 20 * np.sin(i / 50) for i in range(2000)])
+    # 2021-01-01T00:00:00+00:00
+    fake_candles[:, 0] = 1609459200000 + np.arange(len(fake_candles)) * 60_000
+    exchange_name = 'Sandbox'
+    symbol = 'BTC-USDT'
+    config = {
+        'starting_balance': 10_000,
+        'fee': 0.001,
+        'type': 'futures',
+        'futures_leverage': 2,
+        'futures_leverage_mode': 'isolated',
+        'exchange': exchange_name,
+        'warm_up_candles': 0
+    }
+    routes = [
+        {'exchange': exchange_name, 'strategy': TestStrategy, 'symbol': symbol, 'timeframe': '15m'},
+    ]
+    data_routes = [
+        {'exchange': exchange_name, 'symbol': symbol, 'timeframe': '5m'},
+    ]
+    candles = {
+        jh.key(exchange_name, symbol): {
+            'exchange': exchange_name,
+            'symbol': symbol,
+            'candles': fake_candles,
+        },
+    }
+
+    step_result = research.backtest(config, routes, data_routes, candles, generate_equity_curve=True)
+    event_result = research.backtest(
+        config, routes, data_routes, candles, generate_equity_curve=True, event_mode=True
+    )
+
+    assert step_result['metrics']['total'] > 0
+    assert event_result['metrics'] == step_result['metrics']
+    assert event_result['equity_curve'] == step_result['equity_curve']
+
+
+def test_streaming_indicators_are_kept_per_route_and_advanced_on_every_execution():
+    import jesse.indicators as ta
+    from jesse.factories import range_candles
+    from jesse.indicators.streaming import StreamingEMA, StreamingRSI
+
+    class TestStrategy(Strategy):
+        def before(self):
+            # each indicator was advanced over the candles closed until this execution
+            for streaming_indicator, exchange, symbol, timeframe in self._streaming_indicators.values():
+                assert streaming_indicator._count == len(self.get_candles(exchange, symbol, timeframe)) - 1
+
+            assert self.streaming(StreamingEMA, 8) == ta.ema(self.candles, 8, sequential=True)[-1]
+            assert self.streaming(StreamingEMA, period=8, source_type='hl2') == \
+                   ta.ema(self.candles, 8, source_type='hl2', sequential=True)[-1]
+            # it's read only once in a while, yet kept up to date
+            if self.index % 10 == 0:
+                np.testing.assert_equal(
+                    self.streaming(StreamingRSI, 14, timeframe='15m'),
+                    ta.rsi(self.get_candles(self.exchange, self.symbol, '15m'), 14, sequential=True)[-1]
+                )
+
+        def should_long(self):
+            return False
+
+        def should_cancel_entry(self):
+            return False
+
+        def go_long(self):
+            pass
+
+        def terminate(self):
+            assert len(self._streaming_indicators) == 3
+
+    exchange_name = 'Sandbox'
+    symbol = 'BTC-USDT'
+    config = {
+        'starting_balance': 10_000,
+        'fee': 0,
+        'type': 'futures',
+        'futures_leverage': 2,
+        'futures_leverage_mode': 'cross',
+        'exchange': exchange_name,
+        'warm_up_candles': 0
+    }
+    routes = [
+        {'exchange': exchange_name, 'strategy': TestStrategy, 'symbol': symbol, 'timeframe': '5m'},
+    ]
+    data_routes = [
+        {'exchange': exchange_name, 'symbol': symbol, 'timeframe': '15m'},
+    ]
+    all_candles = range_candles(1200)
+    candles = {
+        jh.key(exchange_name, symbol): {'exchange': exchange_name, 'symbol': symbol, 'candles': all_candles[200:]},
+    }
+    warmup_candles = {
+        jh.key(exchange_name, symbol): {'exchange': exchange_name, 'symbol': symbol, 'candles': all_candles[:200]},
+    }
+
+    research.backtest(config, routes, data_routes, candles, warmup_candles)
+
+
+def test_indicators_cache_hits_and_misses_are_reported():
+    import jesse.indicators as ta
+
+    class TestStrategy(Strategy):
+        def before(self):
+            self.vars['sma'] = ta.sma(self.candles, 3)
+
+        def should_long(self):
+            return ta.sma(self.candles, 3) > self.vars['sma'] + 1
+
+        def should_cancel_entry(self):
+            return False
+
+        def go_long(self):
+            pass
+
+    exchange_name = 'Sandbox'
+    symbol = 'BTC-USDT'
+    config = {
+        'starting_balance': 10_000,
+        'fee': 0,
+        'type': 'futures',
+        'futures_leverage': 2,
+        'futures_leverage_mode': 'cross',
+        'exchange': exchange_name,
+        'warm_up_candles': 0
+    }
+    routes = [
+        {'exchange': exchange_name, 'strategy': TestStrategy, 'symbol': symbol, 'timeframe': '1m'},
+    ]
+    candles = {
+        jh.key(exchange_name, symbol): {
+            'exchange': exchange_name,
+            'symbol': symbol,
+            'candles': candles_from_close_prices([110, 109, 108, 107, 106, 105, 104, 103, 102, 101]),
+        },
+    }
+
+    result = research.backtest(config, routes, [], candles)
+
+    # computed once per candle by before(), and read from the cache by should_long()
+    assert result['indicators_cache'] == {'hits': 10, 'misses': 10}
+
+
+def test_precomputed_indicators_equal_the_sequential_ones():
+    from functools import wraps
+    import jesse.indicators as ta
+    from jesse.factories import range_candles
+
+    # the indicators' calls on the candles so far, instead of reading the precomputed series
+    fallbacks = []
+
+    def counted(indicator):
+        @wraps(indicator)
+        def wrapper(*args, **kwargs):
+            fallbacks.append(indicator.__name__)
+            return indicator(*args, **kwargs)
+        return wrapper
+
+    ema, rsi = counted(ta.ema), counted(ta.rsi)
+
+    class TestStrategy(Strategy):
+        def before(self):
+            np.testing.assert_equal(self.precomputed(ema, 20), ta.ema(self.candles, 20, sequential=True)[-1])
+            # the forming candles of bigger timeframes are computed on the fly
+            np.testing.assert_equal(
+                self.precomputed(rsi, 14, timeframe='15m'),
+                ta.rsi(self.get_candles(self.exchange, self.symbol, '15m'), 14, sequential=True)[-1]
+            )
+            self.vars['count'] = self.vars.get('count', 0) + 1
+
+        def should_long(self):
+            return False
+
+        def should_cancel_entry(self):
+            return False
+
+        def go_long(self):
+            pass
+
+        def terminate(self):
+            assert self.vars['count'] == 200
+
+    exchange_name = 'Sandbox'
+    symbol = 'BTC-USDT'
+    config = {
+        'starting_balance': 10_000,
+        'fee': 0,
+        'type': 'futures',
+        'futures_leverage': 2,
+        'futures_leverage_mode': 'cross',
+        'exchange': exchange_name,
+        'warm_up_candles': 0
+    }
+    routes = [
+        {'exchange': exchange_name, 'strategy': TestStrategy, 'symbol': symbol, 'timeframe': '5m'},
+    ]
+    data_routes = [
+        {'exchange': exchange_name, 'symbol': symbol, 'timeframe': '15m'},
+    ]
+    all_candles = range_candles(1210)
+    candles = {
+        jh.key(exchange_name, symbol): {
+            'exchange': exchange_name,
+            'symbol': symbol,
+            'candles': all_candles[210:],
+        },
+    }
+    warmup_candles = {
+        jh.key(exchange_name, symbol): {
+            'exchange': exchange_name,
+            'symbol': symbol,
+            'candles': all_candles[:210],
+        },
+    }
+
+    research.backtest(config, routes, data_routes, candles, warmup_candles)
+
+    # the closed 15m candles (at every third 5m one) are read from the precomputed series,
+    # and only the forming ones are computed
+    assert fallbacks.count('ema') == 0
+    assert fallbacks.count('rsi') == 200 - 66
+
+
+def test_precomputed_indicators_of_a_route_whose_warmup_is_not_a_multiple_of_its_timeframe():
+    from functools import wraps
+    import jesse.indicators as ta
+    from jesse.factories import range_candles
+
+    fallbacks = []
+
+    @wraps(ta.ema)
+    def ema(*args, **kwargs):
+        fallbacks.append(True)
+        return ta.ema(*args, **kwargs)
+
+    class TestStrategy(Strategy):
+        def before(self):
+            np.testing.assert_equal(self.precomputed(ema, 20), ta.ema(self.candles, 20, sequential=True)[-1])
+            self.vars['count'] = self.vars.get('count', 0) + 1
+
+        def should_long(self):
+            return False
+
+        def should_cancel_entry(self):
+            return False
+
+        def go_long(self):
+            pass
+
+        def terminate(self):
+            assert self.vars['count'] == 60
+
+    exchange_name = 'Sandbox'
+    symbol = 'BTC-USDT'
+    config = {
+        'starting_balance': 10_000,
+        'fee': 0,
+        'type': 'futures',
+        'futures_leverage': 2,
+        'futures_leverage_mode': 'cross',
+        'exchange': exchange_name,
+        'warm_up_candles': 0
+    }
+    routes = [
+        {'exchange': exchange_name, 'strategy': TestStrategy, 'symbol': symbol, 'timeframe': '15m'},
+    ]
+    all_candles = range_candles(1100)
+    candles = {
+        jh.key(exchange_name, symbol): {'exchange': exchange_name, 'symbol': symbol, 'candles': all_candles[200:]},
+    }
+    warmup_candles = {
+        jh.key(exchange_name, symbol): {'exchange': exchange_name, 'symbol': symbol, 'candles': all_candles[:200]},
+    }
+
+    research.backtest(config, routes, [], candles, warmup_candles)
+
+    # the 200 warmup candles aren't a multiple of 15m, so the store counts the last 5 1m candles of
+    # each 15m one as a forming candle, which isn't in the session's candles and is computed on the spot
+    assert len(fallbacks) == 60
+
+    fallbacks.clear()
+    research.backtest(config, routes, [], candles, {
+        jh.key(exchange_name, symbol): {'exchange': exchange_name, 'symbol': symbol, 'candles': all_candles[5:200]},
+    })
+
+    # while with a multiple of 15m, every call reads the precomputed series
+    assert fallbacks == []
+
+
+def test_precomputed_indicators_of_multiple_periods():
+    import jesse.indicators as ta
+    from jesse.factories import range_candles
+
+    class TestStrategy(Strategy):
+        def before(self):
+            # lists and arrays of periods are keyed by their contents
+            np.testing.assert_equal(
+                self.precomputed(ta.ema, [10, 20]), ta.ema(self.candles, [10, 20], sequential=True)[:, -1]
+            )
+            np.testing.assert_equal(
+                self.precomputed(ta.rsi, np.array([7, 14])), ta.rsi(self.candles, [7, 14], sequential=True)[:, -1]
+            )
+
+        def should_long(self):
+            return False
+
+        def should_cancel_entry(self):
+            return False
+
+        def go_long(self):
+            pass
+
+        def terminate(self):
+            assert len(self._precomputed_indicators) == 2
+
+    exchange_name = 'Sandbox'
+    symbol = 'BTC-USDT'
+    config = {
+        'starting_balance': 10_000,
+        'fee': 0,
+        'type': 'futures',
+        'futures_leverage': 2,
+        'futures_leverage_mode': 'cross',
+        'exchange': exchange_name,
+        'warm_up_candles': 0
+    }
+    routes = [
+        {'exchange': exchange_name, 'strategy': TestStrategy, 'symbol': symbol, 'timeframe': '5m'},
+    ]
+    all_candles = range_candles(1200)
+    candles = {
+        jh.key(exchange_name, symbol): {'exchange': exchange_name, 'symbol': symbol, 'candles': all_candles[200:]},
+    }
+    warmup_candles = {
+        jh.key(exchange_name, symbol): {'exchange': exchange_name, 'symbol': symbol, 'candles': all_candles[:200]},
+    }
+
+    research.backtest(config, routes, [], candles, warmup_candles)
+
+
+def test_precomputed_rejects_unhashable_arguments():
+    from jesse.strategies.Strategy import _hashable
+
+    assert _hashable((np.array([7, 14]), {'source_type': 'hl2'})) == ((7, 14), (('source_type', 'hl2'),))
+    with pytest.raises(TypeError, match='hashable'):
+        _hashable((set(),))
+
+
+def test_phases_timing_is_reported_when_requested():
+    class TestStrategy(Strategy):
+        def should_long(self):
+            return self.index == 1
+
+        def go_long(self):
+            self.buy = 1, self.price - 2
+
+        def update_position(self):
+            self.liquidate()
+
+        def should_cancel_entry(self):
+            return False
+
+    exchange_name = 'Sandbox'
+    symbol = 'BTC-USDT'
+    config = {
+        'starting_balance': 10_000,
+        'fee': 0,
+        'type': 'futures',
+        'futures_leverage': 2,
+        'futures_leverage_mode': 'cross',
+        'exchange': exchange_name,
+        'warm_up_candles': 0
+    }
+    routes = [
+        {'exchange': exchange_name, 'strategy': TestStrategy, 'symbol': symbol, 'timeframe': '5m'},
+    ]
+    data_routes = [
+        {'exchange': exchange_name, 'symbol': symbol, 'timeframe': '15m'},
+    ]
+    candles = {
+        jh.key(exchange_name, symbol): {
+            'exchange': exchange_name,
+            'symbol': symbol,
+            'candles': candles_from_close_prices(list(range(100, 130)) + list(range(130, 100, -1))),
+        },
+    }
+
+    assert 'phases_timing' not in research.backtest(config, routes, data_routes, candles)
+
+    step_result = research.backtest(config, routes, data_routes, candles, generate_phases_timing=True)
+    fast_result = research.backtest(
+        config, routes, data_routes, candles, fast_mode=True, generate_phases_timing=True
+    )
+
+    assert step_result['metrics']['total'] == 1
+    for result in [step_result, fast_result]:
+        timing = result['phases_timing']
+        assert set(timing) == {
+            'other', 'candles_ingestion', 'bigger_timeframes_generation', 'orders_simulation',
+            'strategies_execution', 'active_orders_update', 'market_orders_execution', 'liquidation_checks',
+        }
+        assert all(t['duration'] >= 0 for t in timing.values())
+        assert timing['strategies_execution']['count'] == 12
+    # once per candle in the step simulator and once per 5 candles in the fast one
+    assert step_result['phases_timing']['active_orders_update']['count'] == 60
+    assert fast_result['phases_timing']['active_orders_update']['count'] == 12
+
+
+def test_hooks_profile_is_reported_when_requested():
+    class TestStrategy(Strategy):
+        def should_long(self):
+            return self.index == 1
+
+        def go_long(self):
+            self.buy = 1, self.price
+
+        def update_position(self):
+            if self.price < ta.sma(self.candles, 3):
+                self.liquidate()
+
+        def should_cancel_entry(self):
+            return False
+
+    exchange_name = 'Sandbox'
+    symbol = 'BTC-USDT'
+    config = {
+        'starting_balance': 10_000,
+        'fee': 0,
+        'type': 'futures',
+        'futures_leverage': 2,
+        'futures_leverage_mode': 'cross',
+        'exchange': exchange_name,
+        'warm_up_candles': 0
+    }
+    routes = [
+        {'exchange': exchange_name, 'strategy': TestStrategy, 'symbol': symbol, 'timeframe': '5m'},
+    ]
+    candles = {
+        jh.key(exchange_name, symbol): {
+            'exchange': exchange_name,
+            'symbol': symbol,
+            'candles': candles_from_close_prices(list(range(100, 130)) + list(range(130, 100, -1))),
+        },
+    }
+
+    assert 'hooks_profile' not in research.backtest(config, routes, [], candles)
+
+    for fast_mode in [False, True]:
+        result = research.backtest(config, routes, [], candles, fast_mode=fast_mode, generate_hooks_profile=True)
+
+        assert result['metrics']['total'] == 1
+        profile = result['hooks_profile'][jh.key(exchange_name, symbol, '5m')]
+        assert profile['hooks']['before']['count'] == 12
+        assert profile['hooks']['go_long']['count'] == 1
+        assert profile['hooks']['on_open_position']['count'] == 1
+        assert profile['hooks']['on_close_position']['count'] == 1
+        assert profile['hooks']['update_position']['count'] == profile['indicators']['sma']['count']
+        assert profile['indicators']['sma']['duration'] <= profile['hooks']['update_position']['duration']
+        assert sum(h['duration'] for h in profile['hooks'].values()) == pytest.approx(profile['duration'], abs=1e-5)
+
+
+def test_backtests_accept_compact_candles():
+    class TestStrategy(Strategy):
+        def should_long(self):
+            return self.price > ta.sma(self.candles, 20)
+
+        def should_cancel_entry(self):
+            return False
+
+        def go_long(self):
+            self.buy = 1, self.price
+            self.stop_loss = 1, self.price - 10
+            self.take_profit = 1, self.price + 10
+
+    all_candles = candles_from_close_prices([100 + 20 * np.sin(i / 50) for i in range(2000)])
+    exchange_name = 'Sandbox'
+    symbol = 'BTC-USDT'
+    config = {
+        'starting_balance': 10_000,
+        'fee': 0.001,
+        'type': 'futures',
+        'futures_leverage': 2,
+        'futures_leverage_mode': 'cross',
+        'exchange': exchange_name,
+        'warm_up_candles': 0
+    }
+    routes = [
+        {'exchange': exchange_name, 'strategy': TestStrategy, 'symbol': symbol, 'timeframe': '15m'},
+    ]
+
+    def candles_dict(c: np.ndarray) -> dict:
+        return {jh.key(exchange_name, symbol): {'exchange': exchange_name, 'symbol': symbol, 'candles': c}}
+
+    compact = jh.compact_candles(all_candles)
+    # the same candles, with the precision of the compact ones
+    rounded = jh.expand_candles(compact)
+
+    compact_result = research.backtest(
+        config, routes, [], candles_dict(compact[600:]), candles_dict(compact[:600]), generate_equity_curve=True
+    )
+    result = research.backtest(
+        config, routes, [], candles_dict(rounded[600:]), candles_dict(rounded[:600]), generate_equity_curve=True
+    )
+
+    assert result['metrics']['total'] > 0
+    assert compact_result['metrics'] == result['metrics']
+    assert compact_result['equity_curve'] == result['equity_curve']
+    # the compact candles are not modified
+    np.testing.assert_equal(jh.expand_candles(compact), rounded)
+
+
+def test_streamed_backtests_generate_the_same_results(monkeypatch):
+    from jesse.modes import backtest_mode
+    from jesse.services.candles_stream import CandlesStream
+
+    class TestStrategy(Strategy):
+        def should_long(self):
+            return ta.sma(self.candles, 10) < self.price
+
+        def should_cancel_entry(self):
+            return False
+
+        def go_long(self):
+            self.buy = 1, self.price - 5
+            self.stop_loss = 1, self.price - 15
+            self.take_profit = 1, self.price + 5
+
+    # three days, since the windows are of whole days
+    fake_candles = candles_from_close_prices([100 + 20 * np.sin(i / 50) for i in range(3 * 1440)])
+    # 2021-01-01T00:00:00+00:00
+    fake_candles[:, 0] = 1609459200000 + np.arange(len(fake_candles)) * 60_000
+    exchange_name = 'Sandbox'
+    symbol = 'BTC-USDT'
+    config = {
+        'starting_balance': 10_000,
+        'fee': 0.001,
+        'type': 'futures',
+        'futures_leverage': 2,
+        'futures_leverage_mode': 'isolated',
+        'exchange': exchange_name,
+        'warm_up_candles': 20
+    }
+    routes = [
+        {'exchange': exchange_name, 'strategy': TestStrategy, 'symbol': symbol, 'timeframe': '15m'},
+    ]
+    data_routes = [
+        {'exchange': exchange_name, 'symbol': symbol, 'timeframe': '5m'},
+    ]
+    candles = {
+        jh.key(exchange_name, symbol): {
+            'exchange': exchange_name,
+            'symbol': symbol,
+            'candles': fake_candles,
+        },
+    }
+
+    simulator = backtest_mode.simulator
+    windows = []
+
+    def load(start, finish):
+        windows.append((start, finish))
+        first = (start - fake_candles[0, 0]) // 60_000
+        last = (finish - fake_candles[0, 0]) // 60_000
+        return {
+            jh.key(exchange_name, symbol): {
+                'exchange': exchange_name,
+                'symbol': symbol,
+                'candles': fake_candles[int(first):int(last) + 1].copy(),
+            },
+        }
+
+    def streamed_simulator(trading_candles, *args, **kwargs):
+        stream = CandlesStream(fake_candles[0, 0], fake_candles[-1, 0] + 60_000, 1, load=load)
+        return simulator(stream, *args, **kwargs)
+
+    for mode in ({}, {'fast_mode': True}, {'event_mode': True}):
+        result = research.backtest(config, routes, data_routes, candles, generate_equity_curve=True, **mode)
+
+        windows.clear()
+        monkeypatch.setattr(backtest_mode, 'simulator', streamed_simulator)
+        streamed_result = research.backtest(config, routes, data_routes, candles, generate_equity_curve=True, **mode)
+        monkeypatch.undo()
+
+        assert len(windows) == 3
+        assert result['metrics']['total'] > 0
+        assert streamed_result['metrics'] == result['metrics']
+        assert streamed_result['equity_curve'] == result['equity_curve']
+
+
+def test_precomputed_indicators_of_streamed_backtests(monkeypatch):
+    from jesse.modes import backtest_mode
+    from jesse.services.candles_stream import CandlesStream
+
+    values = []
+
+    class TestStrategy(Strategy):
+        def before(self):
+            value = self.precomputed(ta.ema, 50)
+            # the store only keeps the candles of the warmup before each window, and so does precomputed()
+            np.testing.assert_equal(value, ta.ema(self.candles, 50, sequential=True)[-1])
+            values.append(value)
+
+        def should_long(self):
+            return False
+
+        def should_cancel_entry(self):
+            return False
+
+        def go_long(self):
+            pass
+
+    fake_candles = candles_from_close_prices([100 + 20 * np.sin(i / 50) for i in range(3 * 1440)])
+    # 2021-01-01T00:00:00+00:00
+    fake_candles[:, 0] = 1609459200000 + np.arange(len(fake_candles)) * 60_000
+    exchange_name = 'Sandbox'
+    symbol = 'BTC-USDT'
+    config = {
+        'starting_balance': 10_000,
+        'fee': 0,
+        'type': 'futures',
+        'futures_leverage': 2,
+        'futures_leverage_mode': 'isolated',
+        'exchange': exchange_name,
+        'warm_up_candles': 20
+    }
+    routes = [
+        {'exchange': exchange_name, 'strategy': TestStrategy, 'symbol': symbol, 'timeframe': '15m'},
+    ]
+    candles = {
+        jh.key(exchange_name, symbol): {'exchange': exchange_name, 'symbol': symbol, 'candles': fake_candles},
+    }
+
+    def load(start, finish):
+        first = int((start - fake_candles[0, 0]) // 60_000)
+        last = int((finish - fake_candles[0, 0]) // 60_000)
+        return {
+            jh.key(exchange_name, symbol): {
+                'exchange': exchange_name, 'symbol': symbol, 'candles': fake_candles[first:last + 1].copy()
+            },
+        }
+
+    simulator = backtest_mode.simulator
+
+    def streamed_simulator(trading_candles, *args, **kwargs):
+        stream = CandlesStream(fake_candles[0, 0], fake_candles[-1, 0] + 60_000, 1, load=load)
+        return simulator(stream, *args, **kwargs)
+
+    research.backtest(config, routes, [], candles)
+    whole_values = values.copy()
+
+    values.clear()
+    monkeypatch.setattr(backtest_mode, 'simulator', streamed_simulator)
+    research.backtest(config, routes, [], candles)
+
+    # the first window is the same, while the ones after it only have the candles of the warmup
+    # before them, hence the indicators of long memory (such as the EMA) differ
+    assert len(values) == len(whole_values)
+    first_window = len(values) // 3
+    np.testing.assert_equal(values[:first_window], whole_values[:first_window])
+    assert not np.allclose(values[first_window:], whole_values[first_window:], equal_nan=True)
@@ -160,3 +160,82 @@ def test_can_update_previous_candle():
 
     # assert that the 2nd candle is updated now
     assert store.candles.get_candles('Sandbox', 'BTC-USD', '1m')[-2][2] == new_c2[2]
+
+
+def test_init_backtest_storage():
+    set_up()
+    config['app']['trading_mode'] = 'backtest'
+
+    candles = range_candles(20)
+    store.candles.batch_add_candle(candles[:5], 'Sandbox', 'BTC-USD', '1m', with_generation=False)
+
+    trading_candles = store.candles.init_backtest_storage('Sandbox', 'BTC-USD', candles[5:])
+    np.testing.assert_equal(trading_candles, candles[5:])
+    # the warmup candles are kept
+    np.testing.assert_equal(store.candles.get_candles('Sandbox', 'BTC-USD', '1m'), candles[:5])
+
+    # adding the trading candles only moves the cursor over the same memory
+    store.candles.add_candle(trading_candles[0], 'Sandbox', 'BTC-USD', '1m', with_generation=False)
+    store.candles.add_multiple_1m_candles(trading_candles[1:10], 'Sandbox', 'BTC-USD')
+    stored_candles = store.candles.get_candles('Sandbox', 'BTC-USD', '1m')
+    np.testing.assert_equal(stored_candles, candles[:15])
+    assert np.shares_memory(stored_candles, trading_candles)
+
+
+def test_forming_candle_is_updated_incrementally():
+    set_up()
+
+    candles_to_add = range_candles(9)
+    store.candles.batch_add_candle(candles_to_add[:5], 'Sandbox', 'BTC-USD', '1m')
+    store.candles.add_candle(
+        generate_candle_from_one_minutes('5m', candles_to_add[:5]), 'Sandbox', 'BTC-USD', '5m'
+    )
+
+    for i in range(6, 10):
+        store.candles.add_candle(candles_to_add[i - 1], 'Sandbox', 'BTC-USD', '1m')
+        candles = store.candles.get_candles('Sandbox', 'BTC-USD', '5m')
+        assert len(candles) == 2
+        np.testing.assert_equal(
+            candles[-1], generate_candle_from_one_minutes('5m', candles_to_add[5:i], True)
+        )
+
+    # updating the last 1m candle
+    updated_candle = candles_to_add[8].copy()
+    updated_candle[3] += 100
+    store.candles.add_candle(updated_candle, 'Sandbox', 'BTC-USD', '1m')
+    np.testing.assert_equal(
+        store.candles.get_current_candle('Sandbox', 'BTC-USD', '5m'),
+        generate_candle_from_one_minutes('5m', np.array([*candles_to_add[5:8], updated_candle]), True)
+    )
+
+    # updating an older 1m candle
+    updated_candle = candles_to_add[6].copy()
+    updated_candle[4] -= 100
+    store.candles.add_candle(updated_candle, 'Sandbox', 'BTC-USD', '1m')
+    np.testing.assert_equal(
+        store.candles.get_candles('Sandbox', 'BTC-USD', '5m')[-1],
+        generate_candle_from_one_minutes('5m', store.candles.get_candles('Sandbox', 'BTC-USD', '1m')[5:], True)
+    )
+    assert store.candles.get_candles('Sandbox', 'BTC-USD', '5m')[-1][4] == updated_candle[4]
+
+
+def test_get_candles_returns_a_view_whose_forming_candle_is_updated_in_place():
+    set_up()
+
+    candles_to_add = range_candles(9)
+    store.candles.batch_add_candle(candles_to_add[:5], 'Sandbox', 'BTC-USD', '1m')
+    store.candles.add_candle(
+        generate_candle_from_one_minutes('5m', candles_to_add[:5]), 'Sandbox', 'BTC-USD', '5m'
+    )
+    store.candles.add_candle(candles_to_add[5], 'Sandbox', 'BTC-USD', '1m')
+    kept = store.candles.get_candles('Sandbox', 'BTC-USD', '5m')
+    copied = kept.copy()
+
+    store.candles.add_candle(candles_to_add[6], 'Sandbox', 'BTC-USD', '1m')
+
+    # the array that was returned earlier is a view, hence its forming candle is the new one
+    np.testing.assert_equal(kept, store.candles.get_candles('Sandbox', 'BTC-USD', '5m'))
+    np.testing.assert_equal(kept[-1], generate_candle_from_one_minutes('5m', candles_to_add[5:7], True))
+    # while a copy of it keeps the forming candle of its time, and the closed candles never change
+    np.testing.assert_equal(copied[-1], generate_candle_from_one_minutes('5m', candles_to_add[5:6], True))
+    np.testing.assert_equal(kept[:-1], copied[:-1])